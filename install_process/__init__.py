@@ -2,6 +2,7 @@ from install_process.install import (
     InstallProcess,
     InstallStep,
     InstallSteps,
+    MatrixInstallSteps,
     DisplayStdout,
     setup_install,
 )
@@ -10,6 +11,7 @@ __all__ = [
     "InstallProcess",
     "InstallStep",
     "InstallSteps",
+    "MatrixInstallSteps",
     "DisplayStdout",
     "setup_install",
 ]
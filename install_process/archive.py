@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import concurrent.futures
+import os
+import pathlib
+import stat
+import tarfile
+import threading
+import zipfile
+from typing import BinaryIO, Callable, Union
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional, .tar.zst archives are only supported if it is installed
+    zstandard = None
+
+
+PathLike = Union[str, os.PathLike]
+ProgressCallback = Callable[[int, int], None]
+
+CHUNK_SIZE = 1024 * 1024
+"""Size of the chunks read from an archive member before being written to disk."""
+
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def extract_archive(archive: PathLike,
+                    destination: PathLike,
+                    workers: int | None = None,
+                    progress: ProgressCallback | None = None) -> list[pathlib.Path]:
+    """Extracts a zip or tar (.tar, .tar.gz, .tar.bz2, .tar.xz, .tar.zst) archive, without loading it into memory.
+
+    Zip members are extracted concurrently, each worker reading its own members.
+    Tar archives can only be read sequentially: members are decompressed in the calling thread,
+    and written to disk concurrently.
+
+    Args:
+        archive: path of the archive to extract
+        destination: directory where the archive is extracted (created if it does not exist)
+        workers: maximum number of extraction threads (defaults to ``concurrent.futures.ThreadPoolExecutor``'s default)
+        progress: called with (bytes done, bytes total) while extracting.
+                  For zip archives, bytes are uncompressed bytes; for tar archives, bytes read from the archive file.
+                  Calls are serialized, but may come from any extraction thread.
+
+    Returns:
+        paths of the extracted files, directories and links
+
+    Raises:
+        ValueError: a member would be extracted outside ``destination``,
+                    or an extracted member does not have the expected size
+        zipfile.BadZipFile: a zip member is corrupted (CRC mismatch)
+        tarfile.TarError: the archive is not a zip/tar archive, or is corrupted
+    """
+    archive = pathlib.Path(archive)
+    destination = pathlib.Path(destination)
+    destination.mkdir(parents=True, exist_ok=True)
+    reporter = _ProgressReporter(progress)
+
+    if zipfile.is_zipfile(archive):
+        return _extract_zip(archive, destination, workers, reporter)
+    return _extract_tar(archive, destination, workers, reporter)
+
+
+class _ProgressReporter:
+    """Thread-safe byte counter forwarding progress to a callback."""
+
+    def __init__(self, callback: ProgressCallback | None) -> None:
+        self.callback = callback
+        self.done = 0
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def add(self, size: int) -> None:
+        if self.callback is None:
+            return
+        with self._lock:
+            self.done += size
+            self.callback(self.done, self.total)
+
+    def set_done(self, done: int) -> None:
+        if self.callback is None:
+            return
+        with self._lock:
+            self.done = done
+            self.callback(self.done, self.total)
+
+
+def _target_path(destination: pathlib.Path, member_name: str) -> pathlib.Path:
+    target = (destination / member_name).resolve()
+    root = destination.resolve()
+    if target != root and root not in target.parents:
+        raise ValueError(f"Archive member {member_name} would be extracted outside of {destination}")
+    return target
+
+
+def _extract_zip(archive: pathlib.Path,
+                 destination: pathlib.Path,
+                 workers: int | None,
+                 reporter: _ProgressReporter) -> list[pathlib.Path]:
+    with zipfile.ZipFile(archive) as zip_file:
+        infos = zip_file.infolist()
+
+    extracted: list[pathlib.Path] = []
+    files: list[tuple[zipfile.ZipInfo, pathlib.Path]] = []
+    for info in infos:
+        target = _target_path(destination, info.filename)
+        if info.is_dir():
+            target.mkdir(parents=True, exist_ok=True)
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            files.append((info, target))
+        extracted.append(target)
+    reporter.total = sum(info.file_size for info, _ in files)
+
+    local = threading.local()
+    handles: list[zipfile.ZipFile] = []
+    handles_lock = threading.Lock()
+
+    def extract_member(info: zipfile.ZipInfo, target: pathlib.Path) -> None:
+        # zipfile serializes reads done through a same ZipFile object: give each worker its own
+        if not hasattr(local, "zip_file"):
+            local.zip_file = zipfile.ZipFile(archive)
+            with handles_lock:
+                handles.append(local.zip_file)
+
+        written = 0
+        # CRC is checked by zipfile when the end of the member is reached
+        with local.zip_file.open(info) as source, open(target, "wb") as output:
+            while chunk := source.read(CHUNK_SIZE):
+                output.write(chunk)
+                written += len(chunk)
+                reporter.add(len(chunk))
+        if written != info.file_size:
+            raise ValueError(f"Archive member {info.filename} has size {written}, expected {info.file_size}")
+
+        mode = (info.external_attr >> 16) & 0o777
+        if mode:
+            os.chmod(target, mode)
+
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(extract_member, info, target) for info, target in files]
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+    finally:
+        for handle in handles:
+            handle.close()
+
+    return extracted
+
+
+class _CountingReader:
+    """File object wrapper counting the bytes read from an archive file."""
+
+    def __init__(self, raw: BinaryIO, reporter: _ProgressReporter) -> None:
+        self.raw = raw
+        self.reporter = reporter
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.raw.read(size)
+        self.reporter.add(len(data))
+        return data
+
+
+class _OutputFile:
+    """A file being written by several write tasks, closed once the last pending task is done."""
+
+    def __init__(self, path: pathlib.Path, mode: int, mtime: float) -> None:
+        self.path = path
+        self.mtime = mtime
+        self.fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), mode)
+        self._pending = 1  # held by the reader until all the member chunks are submitted
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            self._pending += 1
+
+    def release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+            last = self._pending == 0
+        if last:
+            os.close(self.fd)
+            os.utime(self.path, (self.mtime, self.mtime))
+
+
+def _extract_tar(archive: pathlib.Path,
+                 destination: pathlib.Path,
+                 workers: int | None,
+                 reporter: _ProgressReporter) -> list[pathlib.Path]:
+    reporter.total = archive.stat().st_size
+
+    with open(archive, "rb") as raw:
+        magic = raw.read(len(_ZSTD_MAGIC))
+        raw.seek(0)
+        counting_reader = _CountingReader(raw, reporter)
+
+        if magic == _ZSTD_MAGIC:
+            if zstandard is None:
+                raise ValueError(f"{archive} is a zstandard archive: install the zstandard package to extract it")
+            with zstandard.ZstdDecompressor().stream_reader(counting_reader, closefd=False) as zstd_reader:
+                extracted = _extract_tar_stream(zstd_reader, "r|", destination, workers)
+        else:
+            extracted = _extract_tar_stream(counting_reader, "r|*", destination, workers)
+
+    # the archive trailing padding may not be read
+    reporter.set_done(reporter.total)
+    return extracted
+
+
+def _extract_tar_stream(fileobj: BinaryIO,
+                        mode: str,
+                        destination: pathlib.Path,
+                        workers: int | None) -> list[pathlib.Path]:
+    extracted: list[pathlib.Path] = []
+    # os.pwrite lets chunks of a same member be written in any order (not available on Windows)
+    concurrent_writes = hasattr(os, "pwrite")
+    workers = workers or min(32, (os.cpu_count() or 1) + 4)
+    # bounds the memory used by chunks waiting to be written
+    in_flight = threading.BoundedSemaphore(workers * 4)
+
+    def write_chunk(output: _OutputFile, chunk: bytes, offset: int) -> None:
+        try:
+            view = memoryview(chunk)
+            while view:
+                written = os.pwrite(output.fd, view, offset)
+                view = view[written:]
+                offset += written
+        finally:
+            in_flight.release()
+            output.release()
+
+    with tarfile.open(fileobj=fileobj, mode=mode) as tar, \
+            concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures: list[concurrent.futures.Future] = []
+        # extraction filters are available from Python 3.12 (and security backports)
+        member_filter = getattr(tarfile, "data_filter", None)
+        if member_filter:
+            tar.extraction_filter = member_filter
+        for member in tar:
+            if member_filter:
+                member = member_filter(member, str(destination))
+            target = _target_path(destination, member.name)
+            extracted.append(target)
+
+            if member.isdir():
+                target.mkdir(parents=True, exist_ok=True)
+                continue
+            if not member.isfile():
+                # links, devices, etc.
+                tar.extract(member, destination, set_attrs=False)
+                continue
+
+            target.parent.mkdir(parents=True, exist_ok=True)
+            output = _OutputFile(target, stat.S_IMODE(member.mode) or 0o644, member.mtime)
+            written = 0
+            try:
+                source = tar.extractfile(member)
+                while chunk := source.read(CHUNK_SIZE):
+                    if concurrent_writes:
+                        in_flight.acquire()
+                        output.acquire()
+                        futures.append(executor.submit(write_chunk, output, chunk, written))
+                    else:
+                        os.write(output.fd, chunk)
+                    written += len(chunk)
+            finally:
+                output.release()
+            if written != member.size:
+                raise ValueError(f"Archive member {member.name} has size {written}, expected {member.size}")
+
+            # surface write errors as soon as possible
+            pending_futures = []
+            for future in futures:
+                if future.done():
+                    future.result()
+                else:
+                    pending_futures.append(future)
+            futures = pending_futures
+
+        for future in futures:
+            future.result()
+
+    return extracted
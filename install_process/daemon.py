@@ -0,0 +1,290 @@
+"""Long-lived install daemon, serving install requests over a local Unix socket.
+
+The daemon keeps your install process loaded: requests skip interpreter startup, imports, and install process setup.
+Requests targeting distinct install steps run concurrently, and the install process source files are reloaded when
+they change.
+
+Start the daemon with ``setup_install`` ``--daemon`` option, and send requests using this module:
+
+.. code-block:: bash
+
+    python -m my_environment_setup --daemon /run/my_environment_setup.sock &
+    python -m install_process.daemon /run/my_environment_setup.sock -i install -t Database
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import copy
+import functools
+import importlib
+import io
+import json
+import os
+import pathlib
+import runpy
+import socket
+import socketserver
+import sys
+import threading
+import time
+from typing import Any, Iterator, Sequence
+
+import install_process
+from install_process.install import Config, DisplayStdout, InstallProcess, InstallStep
+
+
+ACTIONS = ("install", "uninstall", "plan", "status")
+
+
+class InstallDaemon:
+    """Serves install, uninstall, plan & status requests for an install process, over a Unix socket.
+
+    Requests are JSON objects (one per line): ``{"action": "install", "step": ["Database.*"], "verbose": false}``,
+    answered by a JSON object: ``{"ok": true, "output": "..."}`` (``"error"`` is also set if request failed).
+    Inputs declared by install steps are never asked: they are provided by the answers file of the daemon
+    configuration, or by the environment variables of the daemon.
+    """
+
+    def __init__(self,
+                 your_install_process: type[InstallProcess],
+                 socket_path: str | os.PathLike,
+                 prologue: InstallStep | None = None,
+                 epilogue: InstallStep | None = None,
+                 config: Config | None = None) -> None:
+        """
+        Args:
+            your_install_process: your installation process
+            socket_path: path of the Unix socket to serve requests on
+            prologue: install steps to add before your installation process ones
+            epilogue: install steps to add after your installation process ones
+            config: configuration of the requests runs (default configuration if not set), requests possibly
+                enabling verbose output
+        """
+        if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+            raise ValueError("Install daemon requires Unix sockets, which are not available on this platform")
+
+        self.socket_path = pathlib.Path(socket_path)
+        self.prologue = prologue
+        self.epilogue = epilogue
+        self.config = config or Config()
+
+        self.process_class = your_install_process
+        self._process_module = your_install_process.__module__
+        self._process_file = pathlib.Path(sys.modules[self._process_module].__file__).resolve()
+        self._sources: dict[pathlib.Path, float] = {}
+        self._source_modules: dict[pathlib.Path, str] = {}
+        self._load()
+
+        self.started = time.time()
+        self.requests_count = 0
+        self.reloads_count = 0
+        self._running: dict[int, tuple[str, str | list[str], set[str]]] = {}
+        self._reloading = False
+        self._condition = threading.Condition()
+        self._server: socketserver.BaseServer | None = None
+
+    def serve_forever(self) -> None:
+        """Serves requests until ``shutdown`` is called."""
+        self.socket_path.unlink(missing_ok=True)
+        previous_umask = os.umask(0o077)  # only the daemon user may send requests
+        try:
+            self._server = _Server(str(self.socket_path), _RequestHandler)
+        finally:
+            os.umask(previous_umask)
+        self._server.install_daemon = self
+
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            self.socket_path.unlink(missing_ok=True)
+
+    def shutdown(self) -> None:
+        """Stops serving requests (call it from another thread than ``serve_forever``)."""
+        if self._server is not None:
+            self._server.shutdown()
+
+    def handle(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Handles a request, and returns its response."""
+        action = request.get("action")
+        if action not in ACTIONS:
+            return {"ok": False, "error": f"Unknown action {action!r}, expected one of {', '.join(ACTIONS)}"}
+        if action == "status":
+            return {"ok": True, **self.status()}
+
+        output = io.StringIO()
+        try:
+            self._reload_if_changed()
+            with self._condition:
+                self.requests_count += 1
+                process_class = self.process_class
+
+            config = copy.copy(self.config)
+            config.verbose = config.verbose or bool(request.get("verbose"))
+            config.interactive = False
+            config.only_show_names = action == "plan"
+            process = process_class(request.get("step", ""), config=config)
+            process._add_steps(self.prologue, self.epilogue)
+            process.display = DisplayStdout(output, context=process.context)
+
+            # plans do not install anything, so they never wait for other requests
+            steps = set() if action == "plan" else {step.name() for step in process._launched_steps()}
+            with self._request_running(action, request.get("step", ""), steps):
+                if action == "uninstall":
+                    process.uninstall()
+                else:
+                    process.install()
+        except Exception as error:
+            return {"ok": False, "error": f"{error.__class__.__qualname__}: {error}", "output": output.getvalue()}
+        return {"ok": True, "output": output.getvalue()}
+
+    def status(self) -> dict[str, Any]:
+        """Daemon status."""
+        with self._condition:
+            running = [{"action": action, "step": step} for action, step, _ in self._running.values()]
+            return {
+                "pid": os.getpid(),
+                "install_process": self.process_class.__qualname__,
+                "uptime": time.time() - self.started,
+                "requests": self.requests_count,
+                "reloads": self.reloads_count,
+                "running": running,
+            }
+
+    @contextlib.contextmanager
+    def _request_running(self, action: str, step: str | list[str], steps: set[str]) -> Iterator[None]:
+        """Waits until no running request shares install steps with this one."""
+        entry = object()
+        with self._condition:
+            self._condition.wait_for(lambda: not self._reloading and not any(
+                steps & other_steps for _, _, other_steps in self._running.values()
+            ))
+            self._running[id(entry)] = (action, step, steps)
+        try:
+            yield
+        finally:
+            with self._condition:
+                del self._running[id(entry)]
+                self._condition.notify_all()
+
+    def _sources_changed(self) -> bool:
+        for path, mtime in self._sources.items():
+            try:
+                if path.stat().st_mtime != mtime:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    def _reload_if_changed(self) -> None:
+        if not self._sources_changed():
+            return
+
+        with self._condition:
+            self._condition.wait_for(lambda: not self._reloading)
+            self._reloading = True
+            try:
+                self._condition.wait_for(lambda: not self._running)
+                if self._sources_changed():
+                    self._load(reload=True)
+                    self.reloads_count += 1
+            finally:
+                self._reloading = False
+                self._condition.notify_all()
+
+    def _load(self, reload: bool = False) -> None:
+        """(Re)loads the install process, and records its source files."""
+        if reload:
+            for path, module_name in self._source_modules.items():
+                if path != self._process_file and module_name in sys.modules:
+                    importlib.reload(sys.modules[module_name])
+
+            if self._process_module == "__main__":
+                # the __main__ module cannot be reloaded: run it again, without triggering its __main__ part
+                namespace = runpy.run_path(str(self._process_file), run_name="__install_daemon__")
+            else:
+                namespace = vars(importlib.reload(sys.modules[self._process_module]))
+            first_name, *other_names = self.process_class.__qualname__.split(".")
+            self.process_class = functools.reduce(getattr, other_names, namespace[first_name])
+
+        # also checks the install process is valid
+        process = self.process_class()
+        classes = [self.process_class] + [step.__class__ for step in process._launched_steps()]
+
+        package_dir = pathlib.Path(install_process.__file__).resolve().parent
+        self._source_modules = {self._process_file: self._process_module}
+        for cls in classes:
+            module_file = getattr(sys.modules.get(cls.__module__), "__file__", None)
+            if module_file and package_dir not in pathlib.Path(module_file).resolve().parents:
+                self._source_modules.setdefault(pathlib.Path(module_file).resolve(), cls.__module__)
+        self._sources = {path: path.stat().st_mtime for path in self._source_modules}
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _Server(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+        install_daemon: InstallDaemon
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError as error:
+            response = {"ok": False, "error": f"Invalid request: {error}"}
+        else:
+            response = self.server.install_daemon.handle(request)
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+def send_request(socket_path: str | os.PathLike,
+                 action: str,
+                 step: str | Sequence[str] = "",
+                 verbose: bool = False) -> dict[str, Any]:
+    """Sends a request to an install daemon, and returns its response.
+
+    Args:
+        socket_path: path of the install daemon Unix socket
+        action: ``"install"``, ``"uninstall"``, ``"plan"`` (only shows install step names) or ``"status"``
+        step: name(s) or pattern(s) of the install steps to launch (see ``InstallProcess``). If empty, all steps
+            are launched
+        verbose: if True, output all install messages
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(os.fspath(socket_path))
+        step = step if isinstance(step, str) else list(step)
+        client.sendall(json.dumps({"action": action, "step": step, "verbose": verbose}).encode() + b"\n")
+        with client.makefile("rb") as response:
+            return json.loads(response.readline())
+
+
+def main() -> None:
+    """Command line to send requests to an install daemon."""
+    args_parser = argparse.ArgumentParser(description="Send a request to an install daemon")
+    args_parser.add_argument('socket', help='Path of the install daemon Unix socket')
+    args_parser.add_argument('-i', '--install_type', help='Request type',
+                             choices=['install', 'uninstall', 'reinstall', 'plan', 'status'],
+                             default='install', required=False)
+    args_parser.add_argument('-v', '--verbose', help='If set, output all install messages',
+                             default=False, action="store_true", required=False)
+    args_parser.add_argument('-t', '--step_to_launch',
+                             help="Names of the InstallStep (or InstallSteps) to launch: exact names, glob patterns "
+                                  "(Database.*) or regular expressions prefixed with 're:'. "
+                                  "If not set, all steps are launched",
+                             nargs='+', action='extend', default=[], required=False)
+    args = args_parser.parse_args()
+
+    actions = ["uninstall", "install"] if args.install_type == "reinstall" else [args.install_type]
+    for action in actions:
+        response = send_request(args.socket, action, args.step_to_launch, args.verbose)
+        if action == "status":
+            print(json.dumps({key: value for key, value in response.items() if key != "ok"}, indent=4))
+        print(response.get("output", ""), end="")
+        if not response["ok"]:
+            print(response["error"], file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import concurrent.futures
+import contextlib
+import ctypes
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable, Hashable, Iterable, Iterator
+
+
+POLICIES = ("fail", "continue")
+"""What an install process does when an install step exceeds its deadline: fail, or continue with the next steps."""
+
+ABANDON_GRACE = 0.5
+"""Time (in seconds) given to the thread of an expired install step to end once terminated, before it is abandoned."""
+
+
+class DeadlineExceeded(ValueError):
+    """An install step (or the install process) did not end before its deadline."""
+
+
+_critical: dict[int, int] = {}
+"""Number of nested critical sections run by each thread (see ``critical``)."""
+
+_interrupted: set[int] = set()
+"""Threads a ``DeadlineExceeded`` was raised in, which may not have got it yet."""
+
+_deferred: set[int] = set()
+"""Threads terminated while running a critical section: ``DeadlineExceeded`` is raised once it ends."""
+
+_critical_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def critical() -> Iterator[None]:
+    """Runs code which must not be interrupted by a ``Watchdog`` (acquiring/releasing host locks, recording
+    manifests): an install step terminated meanwhile gets its ``DeadlineExceeded`` once the critical section ends."""
+    thread = threading.get_ident()
+    with _critical_lock:
+        if thread in _interrupted:
+            # not raised yet: raised once the critical section ends
+            _clear_in_thread(thread)
+            _interrupted.discard(thread)
+            _deferred.add(thread)
+        _critical[thread] = _critical.get(thread, 0) + 1
+    try:
+        yield
+    finally:
+        with _critical_lock:
+            _critical[thread] -= 1
+            deferred = not _critical[thread] and thread in _deferred
+            if not _critical[thread]:
+                del _critical[thread]
+                _deferred.discard(thread)
+        if deferred:
+            raise DeadlineExceeded("Deadline exceeded while running a critical section")
+
+
+class Deadline:
+    """A running install step, watched by a ``Watchdog``."""
+
+    __slots__ = ("key", "lineage", "thread", "leaf", "expires", "expired")
+
+    def __init__(self, key: Hashable, lineage: tuple[Hashable, ...], leaf: bool, timeout: float | None) -> None:
+        self.key = key
+        self.lineage = lineage
+        """Keys of the install step and of the groups it belongs to."""
+
+        self.thread = threading.get_ident()
+        self.leaf = leaf
+        self.expires = None if timeout is None else time.monotonic() + timeout
+        self.expired = False
+        """Whether the install step was terminated because its deadline expired."""
+
+
+class Watchdog:
+    """Terminates the install steps which do not end before their deadline, in background.
+
+    On expiry, the shell commands run by the install step (with the install steps it contains) are killed with their
+    subprocess tree, and a ``DeadlineExceeded`` is raised in the threads running them. Python code blocked in a system
+    call (``time.sleep``, socket reads, locks, etc.) only gets the exception once the call returns: see
+    ``run_bounded`` to stop waiting for it.
+    """
+
+    def __init__(self) -> None:
+        self._deadlines: list[Deadline] = []
+        self._shells: dict[int, subprocess.Popen] = {}
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._watch_forever, name="deadline-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+
+    def watch(self,
+              key: Hashable,
+              timeout: float | None,
+              lineage: Iterable[Hashable] = (),
+              leaf: bool = True) -> Deadline:
+        """The current thread starts running an install step, which must end within ``timeout`` seconds (if set).
+
+        Args:
+            key: install step key
+            timeout: deadline of the install step, in seconds
+            lineage: keys of the groups the install step belongs to
+            leaf: whether the install step is not a group of install steps
+        """
+        deadline = Deadline(key, (key, *lineage), leaf, timeout)
+        with self._condition:
+            self._deadlines.append(deadline)
+            if deadline.expires is not None:
+                self._condition.notify_all()
+        return deadline
+
+    def unwatch(self, deadline: Deadline) -> None:
+        """The install step of ``deadline`` ended: a ``DeadlineExceeded`` it did not get yet is cleared, unless the
+        install steps still running in its thread are also terminated."""
+        with self._condition:
+            self._deadlines.remove(deadline)
+            expired_keys = {other.key for other in self._deadlines if other.expired}
+            terminated = any(expired_keys.intersection(other.lineage) for other in self._deadlines
+                             if other.thread == deadline.thread)
+            if not terminated:
+                with _critical_lock:
+                    if deadline.thread in _interrupted:
+                        _clear_in_thread(deadline.thread)
+                        _interrupted.discard(deadline.thread)
+                    _deferred.discard(deadline.thread)
+
+    def shell_started(self, process: subprocess.Popen) -> None:
+        """The current thread waits on a shell command."""
+        with self._condition:
+            self._shells[threading.get_ident()] = process
+
+    def shell_ended(self) -> None:
+        with self._condition:
+            self._shells.pop(threading.get_ident(), None)
+
+    def _watch_forever(self) -> None:
+        with self._condition:
+            while not self._stopped:
+                now = time.monotonic()
+                for deadline in self._deadlines:
+                    if deadline.expires is not None and deadline.expires <= now and not deadline.expired:
+                        self._terminate(deadline)
+                expires = [deadline.expires for deadline in self._deadlines
+                           if deadline.expires is not None and not deadline.expired]
+                self._condition.wait(None if not expires else max(min(expires) - now, 0))
+
+    def _terminate(self, expired: Deadline) -> None:
+        """Kills the shell commands of the install step of ``expired``, and interrupts the threads running it."""
+        expired.expired = True
+        innermost: dict[int, Deadline] = {}
+        for deadline in self._deadlines:
+            if expired.key in deadline.lineage:
+                innermost[deadline.thread] = deadline  # deadlines of a thread are nested
+
+        for thread, deadline in innermost.items():
+            shell = self._shells.get(thread)
+            if shell is not None:
+                kill_tree(shell)
+            # threads waiting on install steps running in other threads are released once those fail
+            if deadline.leaf or deadline is expired:
+                _interrupt(thread)
+
+
+def run_bounded(function: Callable[[], None], timeout: float, name: str) -> bool:
+    """Runs ``function`` in a new thread, waiting for it at most ``timeout`` seconds (plus ``ABANDON_GRACE``, for the
+    thread to end once terminated by a ``Watchdog``).
+
+    Exceptions raised by ``function`` are raised again.
+
+    Returns:
+        whether ``function`` ended in time: if not, its thread (blocked in Python code, which cannot be interrupted)
+        is abandoned, and keeps running in background
+    """
+    result: concurrent.futures.Future = concurrent.futures.Future()
+
+    def run() -> None:
+        try:
+            function()
+        except BaseException as error:
+            result.set_exception(error)
+        else:
+            result.set_result(None)
+
+    threading.Thread(target=run, name=name, daemon=True).start()
+    done, _ = concurrent.futures.wait([result], timeout + ABANDON_GRACE)
+    if not done:
+        return False
+    result.result()
+    return True
+
+
+def kill_tree(process: subprocess.Popen) -> None:
+    """Kills ``process`` and all its descendants (``process`` only, where ``/proc`` is not available)."""
+    pids = [process.pid, *_descendants(process.pid)]
+    try:
+        process.kill()
+    except OSError:
+        pass
+    for pid in pids[1:]:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass  # ended since
+
+
+def _descendants(pid: int) -> list[int]:
+    """Pids of the descendants of process ``pid`` (empty if ``/proc`` is not available)."""
+    if not sys.platform.startswith("linux"):
+        return []
+    children: dict[int, list[int]] = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", "rb") as stat_file:
+                stat = stat_file.read()
+        except OSError:
+            continue  # ended since
+        # the command name may contain spaces & parentheses: fields are after its last parenthesis
+        parent = int(stat[stat.rindex(b")") + 2:].split()[1])
+        children.setdefault(parent, []).append(int(name))
+
+    descendants = []
+    pending = [pid]
+    while pending:
+        for child in children.get(pending.pop(), []):
+            descendants.append(child)
+            pending.append(child)
+    return descendants
+
+
+def _interrupt(thread: int) -> None:
+    """Raises ``DeadlineExceeded`` in ``thread``, as soon as it runs Python code outside critical sections."""
+    with _critical_lock:
+        if thread in _critical:
+            _deferred.add(thread)
+        else:
+            _raise_in_thread(thread, DeadlineExceeded)
+            _interrupted.add(thread)
+
+
+def _raise_in_thread(thread: int, exception: type[BaseException]) -> None:
+    """Raises ``exception`` in ``thread``, as soon as it runs Python code."""
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(thread), ctypes.py_object(exception))
+
+
+def _clear_in_thread(thread: int) -> None:
+    """Clears the exception raised in ``thread`` by ``_raise_in_thread``, if it did not get it yet."""
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(thread), ctypes.py_object())
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import concurrent.futures
+import hashlib
+import mmap
+import os
+import pathlib
+import urllib.parse
+import urllib.request
+from typing import BinaryIO, Union
+
+from install_process.archive import ProgressCallback, _ProgressReporter
+
+
+PathLike = Union[str, os.PathLike]
+
+CHUNK_SIZE = 1024 * 1024
+"""Size of the chunks read from the source before being hashed & written to disk."""
+
+PARALLEL_THRESHOLD = 64 * 1024 * 1024
+"""Sources bigger than this size are fetched using parallel ranged reads, when possible."""
+
+TIMEOUT = 60
+"""Timeout (in seconds) of HTTP connections."""
+
+
+def hash_file(path: PathLike, algorithm: str = "sha256") -> str:
+    """Hashes a local file through memory-mapped I/O.
+
+    Args:
+        path: file to hash
+        algorithm: any ``hashlib`` algorithm
+
+    Returns:
+        file hex digest
+    """
+    hasher = hashlib.new(algorithm)
+    with open(path, "rb") as file:
+        # empty files cannot be mapped
+        if os.fstat(file.fileno()).st_size:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                hasher.update(mapped)
+    return hasher.hexdigest()
+
+
+def fetch(source: PathLike,
+          destination: PathLike,
+          checksum: str | None = None,
+          algorithm: str = "sha256",
+          workers: int | None = None,
+          progress: ProgressCallback | None = None,
+          parallel_threshold: int = PARALLEL_THRESHOLD) -> str:
+    """Copies a local file, or downloads an HTTP(S) resource, verifying its checksum.
+
+    Data is hashed while it is streamed, so the copy is never read back.
+    Sources bigger than ``parallel_threshold`` are fetched using parallel ranged reads (if the HTTP server supports
+    ranges), then hashed through memory-mapped I/O.
+    Data is written next to ``destination`` and only moved to ``destination`` once verified.
+
+    Args:
+        source: local path, ``file://`` URL, or ``http(s)://`` URL
+        destination: path of the fetched file
+        checksum: expected hex digest. If ``destination`` already exists with this checksum, nothing is fetched.
+        algorithm: any ``hashlib`` algorithm
+        workers: maximum number of parallel ranged reads (``1`` disables parallel ranged reads)
+        progress: called with (bytes done, bytes total) while fetching. Calls are serialized,
+                  but may come from any fetching thread.
+        parallel_threshold: minimal size (in bytes) of a source fetched using parallel ranged reads
+
+    Returns:
+        hex digest of the fetched file
+
+    Raises:
+        ValueError: the fetched file does not match ``checksum``
+    """
+    destination = pathlib.Path(destination)
+    if checksum and destination.is_file() and hash_file(destination, algorithm) == checksum.lower():
+        return checksum.lower()
+
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    partial = destination.with_name(f"{destination.name}.part")
+    reporter = _ProgressReporter(progress)
+    source = _Source(source)
+
+    try:
+        size, ranges_supported = source.size()
+        reporter.total = size or 0
+        if size and size >= parallel_threshold and ranges_supported and workers != 1:
+            _fetch_ranges(source, partial, size, workers, reporter)
+            digest = hash_file(partial, algorithm)
+        else:
+            digest = _fetch_stream(source, partial, algorithm, reporter)
+
+        if checksum and digest != checksum.lower():
+            raise ValueError(f"Checksum mismatch for {source}: expected {checksum.lower()}, got {digest}")
+        os.replace(partial, destination)
+    finally:
+        partial.unlink(missing_ok=True)
+
+    return digest
+
+
+class _Source:
+    """Local file or HTTP resource to fetch."""
+
+    def __init__(self, source: PathLike) -> None:
+        self.name = os.fspath(source)
+        parsed = urllib.parse.urlparse(self.name)
+        self.url = self.name if parsed.scheme in ("http", "https") else ""
+        if parsed.scheme == "file":
+            self.path = pathlib.Path(urllib.request.url2pathname(parsed.path))
+        else:
+            self.path = pathlib.Path(self.name)
+
+    def __str__(self) -> str:
+        return self.name
+
+    def size(self) -> tuple[int | None, bool]:
+        """Size of the source (if known), and whether ranged reads are supported."""
+        if not self.url:
+            return self.path.stat().st_size, True
+
+        with urllib.request.urlopen(urllib.request.Request(self.url, method="HEAD"), timeout=TIMEOUT) as response:
+            length = response.headers.get("Content-Length")
+            ranges_supported = response.headers.get("Accept-Ranges", "").lower() == "bytes"
+        return (int(length) if length else None), ranges_supported
+
+    def open(self, start: int = 0, end: int | None = None) -> BinaryIO:
+        """Opens the source for reading, from byte ``start`` to byte ``end`` (excluded)."""
+        if not self.url:
+            file = open(self.path, "rb")
+            file.seek(start)
+            return file
+
+        request = urllib.request.Request(self.url)
+        if end is not None:
+            request.add_header("Range", f"bytes={start}-{end - 1}")
+        response = urllib.request.urlopen(request, timeout=TIMEOUT)
+        if end is not None and response.status != 206:
+            response.close()
+            raise ValueError(f"{self.url} does not support ranged reads")
+        return response
+
+
+def _fetch_stream(source: _Source, partial: pathlib.Path, algorithm: str, reporter: _ProgressReporter) -> str:
+    hasher = hashlib.new(algorithm)
+    buffer = bytearray(CHUNK_SIZE)
+    view = memoryview(buffer)
+    with source.open() as input_file, open(partial, "wb") as output_file:
+        while read := input_file.readinto(buffer):
+            hasher.update(view[:read])
+            output_file.write(view[:read])
+            reporter.add(read)
+    return hasher.hexdigest()
+
+
+def _fetch_ranges(source: _Source,
+                  partial: pathlib.Path,
+                  size: int,
+                  workers: int | None,
+                  reporter: _ProgressReporter) -> None:
+    workers = workers or min(32, (os.cpu_count() or 1) + 4)
+    range_size = max(CHUNK_SIZE, -(-size // workers))
+
+    with open(partial, "wb") as output_file:
+        output_file.truncate(size)
+
+    def fetch_range(start: int, end: int) -> None:
+        with source.open(start, end) as input_file, open(partial, "r+b") as output_file:
+            output_file.seek(start)
+            remaining = end - start
+            while remaining:
+                chunk = input_file.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise ValueError(f"{source} ended before byte {end}")
+                output_file.write(chunk)
+                remaining -= len(chunk)
+                reporter.add(len(chunk))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(fetch_range, start, min(start + range_size, size))
+                   for start in range(0, size, range_size)]
+        for future in concurrent.futures.as_completed(futures):
+            future.result()
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import contextlib
+import os
+import pathlib
+import sqlite3
+import statistics
+import threading
+import time
+from typing import Any, Hashable, Iterable, Iterator, Union
+
+
+PathLike = Union[str, os.PathLike]
+
+
+class TimingHistory:
+    """Durations of the last runs of install steps, stored in a small SQLite file (keyed by install step name)."""
+
+    def __init__(self, path: PathLike, max_runs: int = 10) -> None:
+        """
+        Args:
+            path: path of the SQLite file (created if it does not exist)
+            max_runs: number of runs kept for each install step
+        """
+        self.path = pathlib.Path(path)
+        self.max_runs = max_runs
+
+    def record(self, durations: Iterable[tuple[str, str, float]]) -> None:
+        """Records (install step name, ``"install"`` or ``"uninstall"``, duration in seconds) runs, at once."""
+        durations = list(durations)
+        if not durations:
+            return
+
+        now = time.time()
+        with self._connect() as connection:
+            connection.executemany("INSERT INTO durations (step, action, duration, ended) VALUES (?, ?, ?, ?)",
+                                   [(step, action, duration, now) for step, action, duration in durations])
+            for step, action in {(step, action) for step, action, _ in durations}:
+                connection.execute("DELETE FROM durations WHERE step = ? AND action = ? AND rowid NOT IN ("
+                                   "SELECT rowid FROM durations WHERE step = ? AND action = ? "
+                                   "ORDER BY ended DESC, rowid DESC LIMIT ?)",
+                                   (step, action, step, action, self.max_runs))
+
+    def estimates(self, action: str) -> dict[str, float]:
+        """Estimated duration (median of the last runs) of each install step having a history, by name."""
+        if not self.path.exists():
+            return {}
+
+        durations: dict[str, list[float]] = {}
+        with self._connect() as connection:
+            for step, duration in connection.execute("SELECT step, duration FROM durations WHERE action = ?",
+                                                     (action,)):
+                durations.setdefault(step, []).append(duration)
+        return {step: statistics.median(step_durations) for step, step_durations in durations.items()}
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with contextlib.closing(sqlite3.connect(self.path, timeout=30)) as connection:
+            with connection:  # single transaction
+                connection.execute("CREATE TABLE IF NOT EXISTS durations "
+                                   "(step TEXT NOT NULL, action TEXT NOT NULL, duration REAL NOT NULL, "
+                                   "ended REAL NOT NULL)")
+                connection.execute("CREATE INDEX IF NOT EXISTS durations_step ON durations (step, action)")
+                yield connection
+
+
+class ProgressEstimator:
+    """Estimates the progress & remaining time of an install process run, weighting each install step by its
+    historical duration.
+
+    Only leaf install steps (not groups of install steps) are weighted: pass them all to the estimator, then
+    report them as they run.
+    """
+
+    def __init__(self, history: TimingHistory, steps: Iterable[Any], action: str) -> None:
+        """
+        Args:
+            history: timing history of install steps
+            steps: leaf install steps of the run (anything having a ``name()`` method)
+            action: ``"install"`` or ``"uninstall"``
+        """
+        self.history = history
+        self.action = action
+        estimates = history.estimates(action)
+        self._steps = list(dict.fromkeys(steps))
+        self._names = {step: step.name() for step in self._steps}
+        self._known = any(name in estimates for name in self._names.values())
+        # steps without history are assumed to last as long as a typical step
+        default = statistics.median(estimates.values()) if estimates else 1.0
+        self._weights = {step: estimates.get(name, default) for step, name in self._names.items()}
+        self._started: dict[Hashable, float] = {}
+        self._fractions: dict[Hashable, float] = {}
+        self._finished: set[Hashable] = set()
+        self._durations: dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+
+    def start(self, step: Hashable) -> None:
+        """``step`` starts."""
+        if step in self._weights:
+            with self._lock:
+                self._started[step] = time.perf_counter()
+
+    def update(self, step: Hashable, done: float, total: float) -> None:
+        """``step`` reports its progress: ``done`` out of ``total`` units of work."""
+        if step in self._weights and total:
+            self._fractions[step] = min(done / total, 1.0)
+
+    def end(self, step: Hashable, duration: float) -> None:
+        """``step`` is done, after ``duration`` seconds (recorded in the history when the estimator is saved)."""
+        if step in self._weights:
+            with self._lock:
+                self._finished.add(step)
+                self._durations[step] = duration
+
+    def skip(self, steps: Iterable[Hashable]) -> None:
+        """``steps`` will not run (skipped, or failed): their duration is not recorded."""
+        with self._lock:
+            self._finished.update(step for step in steps if step in self._weights)
+
+    def fraction(self) -> float:
+        """Estimated fraction of the run which is done."""
+        total = sum(self._weights.values())
+        if not total:
+            return 1.0
+        with self._lock:
+            remaining = sum(self._step_remaining(step, now=time.perf_counter(), extrapolate=False)
+                            for step in self._steps if step not in self._finished)
+        return max(0.0, 1.0 - remaining / total)
+
+    def remaining(self) -> float | None:
+        """Estimated remaining time of the run, in seconds (None if no install step has a history yet)."""
+        if not self._known:
+            return None
+        now = time.perf_counter()
+        with self._lock:
+            return sum(self._step_remaining(step, now) for step in self._steps if step not in self._finished)
+
+    def save(self) -> None:
+        """Records the durations of the install steps which are done in the history."""
+        with self._lock:
+            durations = [(self._names[step], self.action, duration) for step, duration in self._durations.items()]
+            self._durations = {}
+        self.history.record(durations)
+
+    def _step_remaining(self, step: Hashable, now: float, extrapolate: bool = True) -> float:
+        weight = self._weights[step]
+        if step not in self._started:
+            return weight
+
+        fraction = self._fractions.get(step)
+        if fraction is None:
+            return max(weight - (now - self._started[step]), 0.0)
+        if extrapolate and fraction > 0:
+            # the step reports its progress: its remaining time is extrapolated from its current pace
+            elapsed = now - self._started[step]
+            return elapsed * (1 - fraction) / fraction
+        return weight * (1 - fraction)
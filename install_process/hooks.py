@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import os
+import pathlib
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Union
+
+
+PathLike = Union[str, os.PathLike]
+
+EVENTS = {
+    "process_start": "An install process starts: ``process``, ``action``.",
+    "process_end": "An install process ends: ``process``, ``action``, ``duration``, ``error`` (None if succeeded).",
+    "step_start": "An install step starts: ``process``, ``step``, ``action``.",
+    "step_end": "An install step is done: ``process``, ``step``, ``action``, ``duration``.",
+    "step_skip": "An install step is skipped by its condition: ``process``, ``step``, ``action``, ``duration``.",
+    "step_fail": "An install step fails: ``process``, ``step``, ``action``, ``duration``, ``error``.",
+    "condition_start": "An install step condition starts being checked: ``process``, ``step``, ``action``.",
+    "condition_end": "An install step condition was checked: ``process``, ``step``, ``action``, ``duration``, "
+                     "``result``.",
+    "shell_start": "A shell command starts: ``process``, ``step``, ``cmd``.",
+    "shell_end": "A shell command ends: ``process``, ``step``, ``cmd``, ``duration``, ``returncode`` (None if timed "
+                 "out), ``usage`` (``install_process.resources.ResourceUsage``, None if not available).",
+}
+"""Events which can be observed, and the keyword arguments their callbacks are called with.
+
+``action`` is ``"install"`` or ``"uninstall"`` (or ``"reinstall"`` for process events of a pipelined reinstall), and
+``duration`` is in seconds.
+"""
+
+
+class Hooks:
+    """Registry of callbacks observing install process lifecycle events (see ``EVENTS``).
+
+    When no callback is registered, observing events costs a single truth test.
+
+    Examples:
+
+        >>> def on_step_end(step, duration, **_) -> None:
+        ...     print(f"{step.name()} took {duration:.1f}s")
+        ...
+        ... Config.hooks.register("step_end", on_step_end)
+    """
+
+    def __init__(self) -> None:
+        self._callbacks: dict[str, list[Callable[..., None]]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._callbacks)
+
+    def register(self, event: str, callback: Callable[..., None]) -> None:
+        """Calls ``callback`` with the event keyword arguments each time ``event`` occurs."""
+        if event not in EVENTS:
+            raise ValueError(f"Unknown event {event}, expected one of {', '.join(EVENTS)}")
+        self._callbacks = {**self._callbacks, event: self._callbacks.get(event, []) + [callback]}
+
+    def unregister(self, event: str, callback: Callable[..., None]) -> None:
+        """Stops calling ``callback`` when ``event`` occurs."""
+        callbacks = [registered for registered in self._callbacks.get(event, []) if registered != callback]
+        others = {name: registered for name, registered in self._callbacks.items() if name != event}
+        # callbacks are never modified in place, so that events can be emitted while callbacks are (un)registered
+        self._callbacks = {**others, event: callbacks} if callbacks else others
+
+    def copy(self) -> Hooks:
+        """Registry with the callbacks registered so far (callbacks registered later are not shared)."""
+        hooks = Hooks()
+        hooks._callbacks = self._callbacks
+        return hooks
+
+    def emit(self, event: str, **data: Any) -> None:
+        """Calls callbacks registered for ``event``."""
+        for callback in self._callbacks.get(event, ()):
+            callback(**data)
+
+
+class PrometheusExporter:
+    """Writes Prometheus text-format metrics about install processes to a file, after each install process run.
+
+    The file can be collected by the node exporter textfile collector, for example.
+
+    Examples:
+
+        >>> PrometheusExporter("/var/lib/node_exporter/install_process.prom").register(Config.hooks)
+    """
+
+    def __init__(self, path: PathLike) -> None:
+        self.path = pathlib.Path(path)
+        self._lock = threading.Lock()
+        self._step_durations: dict[tuple[str, str, str], float] = {}
+        self._step_runs: dict[tuple[str, str, str, str], int] = {}
+        self._process_durations: dict[tuple[str, str], float] = {}
+        self._process_runs: dict[tuple[str, str, str], int] = {}
+        self._process_timestamps: dict[tuple[str, str], float] = {}
+
+    def register(self, hooks: Hooks) -> PrometheusExporter:
+        hooks.register("step_end", self._on_step_end)
+        hooks.register("step_skip", self._on_step_skip)
+        hooks.register("step_fail", self._on_step_fail)
+        hooks.register("process_end", self._on_process_end)
+        return self
+
+    def _on_step_end(self, process: Any, step: Any, action: str, duration: float, **_: Any) -> None:
+        self._record_step(process, step, action, duration, "done")
+
+    def _on_step_skip(self, process: Any, step: Any, action: str, duration: float, **_: Any) -> None:
+        self._record_step(process, step, action, duration, "skipped")
+
+    def _on_step_fail(self, process: Any, step: Any, action: str, duration: float, **_: Any) -> None:
+        self._record_step(process, step, action, duration, "failed")
+
+    def _record_step(self, process: Any, step: Any, action: str, duration: float, outcome: str) -> None:
+        key = (_process_name(process), step.name(), action)
+        with self._lock:
+            self._step_durations[key] = duration
+            self._step_runs[key + (outcome,)] = self._step_runs.get(key + (outcome,), 0) + 1
+
+    def _on_process_end(self, process: Any, action: str, duration: float, error: BaseException | None,
+                        **_: Any) -> None:
+        key = (_process_name(process), action)
+        outcome = "done" if error is None else "failed"
+        with self._lock:
+            self._process_durations[key] = duration
+            self._process_runs[key + (outcome,)] = self._process_runs.get(key + (outcome,), 0) + 1
+            self._process_timestamps[key] = time.time()
+            self.write()
+
+    def render(self) -> str:
+        """Metrics, in Prometheus text format."""
+        lines: list[str] = []
+
+        def metric(name: str, kind: str, help_text: str, values: dict[tuple[str, ...], float],
+                   labels: tuple[str, ...]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for label_values, value in sorted(values.items()):
+                label_text = ",".join(f'{label}="{_escape(label_value)}"'
+                                      for label, label_value in zip(labels, label_values))
+                lines.append(f"{name}{{{label_text}}} {value}")
+
+        metric("install_process_step_duration_seconds", "gauge",
+               "Duration of the last run of the install step.",
+               self._step_durations, ("process", "step", "action"))
+        metric("install_process_step_runs_total", "counter",
+               "Number of runs of the install step, by outcome (done, skipped, failed).",
+               self._step_runs, ("process", "step", "action", "outcome"))
+        metric("install_process_step_failures_total", "counter",
+               "Number of failed runs of the install step.",
+               {key[:3]: runs for key, runs in self._step_runs.items() if key[3] == "failed"},
+               ("process", "step", "action"))
+        metric("install_process_duration_seconds", "gauge",
+               "Duration of the last run of the install process.",
+               self._process_durations, ("process", "action"))
+        metric("install_process_runs_total", "counter",
+               "Number of runs of the install process, by outcome (done, failed).",
+               self._process_runs, ("process", "action", "outcome"))
+        metric("install_process_last_run_timestamp_seconds", "gauge",
+               "Time of the end of the last run of the install process.",
+               self._process_timestamps, ("process", "action"))
+        return "\n".join(lines) + "\n"
+
+    def write(self) -> None:
+        """Writes metrics to the file (atomically, so that collectors never read a partial file)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(file_descriptor, "w", encoding="utf-8") as temp_file:
+                temp_file.write(self.render())
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+
+def _process_name(process: Any) -> str:
+    return process.__class__.__qualname__ if process is not None else ""
+
+
+def _escape(label_value: str) -> str:
+    return label_value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+from typing import Callable, Iterable, Mapping, Union
+
+
+PathLike = Union[str, os.PathLike]
+
+ACTIONS = ("install", "uninstall")
+"""Actions inputs may be required by."""
+
+ENV_PREFIX = "INSTALL_PROCESS_"
+"""Prefix of the environment variables providing input values (``INSTALL_PROCESS_USER_NAME`` for ``user_name``)."""
+
+
+class Input:
+    """An input required by an install step (user name, password, etc.), collected before the install process starts.
+
+    Input values come from the answers file, environment variables, or are asked to the user up front, so that
+    install steps never wait for the user partway through (install steps run in parallel, unattended runs).
+
+    Examples:
+
+        >>> class CreateUser(InstallStep):
+        ...     USER_NAME = Input("user_name", "Enter user name: ", default="admin")
+        ...     PASSWORD = Input("user_password", "Enter user password: ", secret=True, actions=["install"])
+        ...     inputs = [USER_NAME, PASSWORD]
+        ...     def install(self) -> None:
+        ...         '''Create user'''
+        ...         self.shell(f"useradd {self.answer(self.USER_NAME)}")
+    """
+
+    def __init__(self,
+                 name: str,
+                 prompt: str,
+                 secret: bool = False,
+                 default: str | None = None,
+                 actions: Iterable[str] = ACTIONS) -> None:
+        """
+        Args:
+            name: input name, shared by all install steps requiring the same input
+            prompt: message displayed when asking the input value to the user
+            secret: if set, the input value is asked as a password (not echoed)
+            default: value used if the input value is not provided (the user may still change it)
+            actions: actions (``"install"``, ``"uninstall"``) requiring the input: it is only collected up front
+                for them (it is still collected on first use by other actions)
+        """
+        self.name = name
+        self.prompt = prompt
+        self.secret = secret
+        self.default = default
+        self.actions = tuple(actions)
+        unknown = set(self.actions).difference(ACTIONS)
+        if unknown:
+            raise ValueError(f"Unknown action(s) {', '.join(sorted(unknown))} for input {name}, "
+                             f"expected {' or '.join(ACTIONS)}")
+
+    @property
+    def env_var(self) -> str:
+        """Environment variable providing the input value."""
+        return ENV_PREFIX + re.sub(r"\W", "_", self.name).upper()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}({self.name!r})"
+
+
+def load_answers(path: PathLike) -> dict[str, str]:
+    """Input values of an answers file: a JSON object, by input name."""
+    with open(path, encoding="utf-8") as answers_file:
+        answers = json.load(answers_file)
+    if not isinstance(answers, dict):
+        raise ValueError(f"Answers file {os.fspath(path)} must contain a JSON object, by input name")
+    return {name: str(value) for name, value in answers.items()}
+
+
+def collect(inputs: Iterable[Input],
+            answers: Mapping[str, str] | None = None,
+            ask: Callable[[Input], str] | None = None,
+            environ: Mapping[str, str] | None = None) -> dict[str, str]:
+    """Collects the values of ``inputs``, by input name (inputs sharing a name are collected once).
+
+    Values are taken from ``answers``, then from environment variables, then asked to the user using ``ask``
+    (an empty answer takes the default value). Without ``ask``, default values are used.
+
+    Raises:
+        ValueError: listing the inputs without value
+    """
+    answers = answers or {}
+    environ = os.environ if environ is None else environ
+    values: dict[str, str] = {}
+    missing: dict[str, Input] = {}
+    for input_ in inputs:
+        if input_.name in values or input_.name in missing:
+            continue
+        if input_.name in answers:
+            values[input_.name] = answers[input_.name]
+        elif input_.env_var in environ:
+            values[input_.name] = environ[input_.env_var]
+        elif ask is not None:
+            value = ask(input_)
+            if value or input_.default is None:
+                values[input_.name] = value
+            else:
+                values[input_.name] = input_.default
+        elif input_.default is not None:
+            values[input_.name] = input_.default
+        else:
+            missing[input_.name] = input_
+
+    if missing:
+        raise ValueError(f"No value for input(s) {', '.join(missing)}: provide them using an answers file or "
+                         f"environment variables ({', '.join(input_.env_var for input_ in missing.values())})")
+    return values
@@ -3,19 +3,52 @@ from __future__ import annotations
 import abc
 import argparse
 import concurrent.futures
+import contextlib
 import copy
 import ctypes
+import fnmatch
 import getpass
 import inspect
 import io
+import os
+import pathlib
+import re
 import shutil
 import subprocess
 import sys
 import textwrap
-from typing import TextIO
+import threading
+import time
+from typing import Any, Callable, ContextManager, Iterator, Sequence, TextIO
+
+from install_process.archive import extract_archive
+from install_process.deadlines import POLICIES, DeadlineExceeded, Watchdog, critical, run_bounded
+from install_process.fetch import fetch
+from install_process.history import ProgressEstimator, TimingHistory
+from install_process.hooks import Hooks
+from install_process.inputs import Input, collect, load_answers
+from install_process.locks import HostLock, hold
+from install_process.logs import tail
+from install_process.manifest import Manifest, hold_roots, snapshot
+from install_process.outputs import Output, OutputStore
+from install_process.packages import PackageBatch, PackageManager, default_package_managers
+from install_process.prefetch import Prefetch, Prefetcher
+from install_process.queries import QueryCache
+from install_process import resources
+from install_process.resources import ResourceUsage
+from install_process.scheduling import Scheduling
+from install_process.shells import RecordingShell, ReplayShell, ShellBackend
+from install_process.sampler import StackSampler
 
 
 class Config:
+    """Configuration of an install process run.
+
+    Each install process gets its own configuration, so that several install processes can run concurrently.
+    Class attributes are the default configuration values.
+
+    Subclass it to add your own per-run settings (target prefix, etc.), available to install steps as ``self.config``.
+    """
 
     verbose = False
     """Display the output of shell commands."""
@@ -29,10 +62,101 @@ class Config:
     process_name = ""
     """Name of the step/steps to launch. If empty string, launch all steps."""
 
+    hooks = Hooks()
+    """Callbacks observing install process lifecycle events (see ``install_process.hooks``). Each configuration gets
+    its own copy of the callbacks registered here, so that callbacks registered on a configuration only observe the
+    install processes it configures."""
+
+    log_dir: str | os.PathLike | None = None
+    """If set, shell commands outputs of the install steps opting in (see ``InstallStep.log_shell``) are written to a
+    log file per install step, in this directory."""
+
+    resource_report = False
+    """Display the resources used by the shell commands of each install step, at the end of install/uninstall."""
+
+    profile: str | os.PathLike | None = None
+    """If set, stacks of the running install steps are sampled, and written to this collapsed stack (flame graph)
+    file."""
+
+    hang_timeout: float | None = None
+    """If set, warn when an install step makes no progress for this many seconds."""
+
+    deadline: float | None = None
+    """If set, maximum duration (in seconds) of install/uninstall: install steps still running are then terminated,
+    and install/uninstall fails. Install steps then run in another thread than the main thread (see
+    ``InstallStep.deadline``)."""
+
+    deadline_policy = "fail"
+    """What to do when an install step exceeds its deadline (see ``InstallStep.deadline``): ``"fail"``, or
+    ``"continue"`` with the next install steps."""
+
+    rollback = False
+    """If install fails, uninstall the install steps completed during this install."""
+
+    answers: str | os.PathLike | None = None
+    """If set, JSON file providing the values of the inputs declared by install steps, by input name."""
+
+    interactive = True
+    """Ask the user the values of inputs not provided by the answers file or environment variables
+    (default values are used otherwise)."""
+
+    outputs: str | os.PathLike | None = None
+    """If set, JSON file the outputs published by install steps are persisted to, and reused from by later runs."""
+
+    manifest_dir: str | os.PathLike | None = None
+    """If set, install steps declaring ``manifest_roots`` record the files & directories they create to a manifest
+    per install step in this directory, and their uninstall deletes exactly them (see ``install_process.manifest``)."""
+
+    shell_backend = ShellBackend()
+    """Runs the shell commands of install steps: ``RecordingShell`` records them, ``ReplayShell`` replays recorded
+    ones without running anything (see ``install_process.shells``)."""
+
+    def __init__(self,
+                 verbose: bool | None = None,
+                 only_show_names: bool | None = None,
+                 root_required: bool | None = None,
+                 process_name: str | None = None,
+                 hooks: Hooks | None = None,
+                 log_dir: str | os.PathLike | None = None,
+                 resource_report: bool | None = None,
+                 profile: str | os.PathLike | None = None,
+                 hang_timeout: float | None = None,
+                 deadline: float | None = None,
+                 deadline_policy: str | None = None,
+                 rollback: bool | None = None,
+                 answers: str | os.PathLike | None = None,
+                 interactive: bool | None = None,
+                 outputs: str | os.PathLike | None = None,
+                 manifest_dir: str | os.PathLike | None = None,
+                 shell_backend: ShellBackend | None = None) -> None:
+        """Unset parameters take the default (class attribute) values."""
+        self.verbose = self.verbose if verbose is None else verbose
+        self.only_show_names = self.only_show_names if only_show_names is None else only_show_names
+        self.root_required = self.root_required if root_required is None else root_required
+        self.process_name = self.process_name if process_name is None else process_name
+        self.hooks = self.hooks.copy() if hooks is None else hooks
+        self.log_dir = self.log_dir if log_dir is None else log_dir
+        self.resource_report = self.resource_report if resource_report is None else resource_report
+        self.profile = self.profile if profile is None else profile
+        self.hang_timeout = self.hang_timeout if hang_timeout is None else hang_timeout
+        self.deadline = self.deadline if deadline is None else deadline
+        self.deadline_policy = self.deadline_policy if deadline_policy is None else deadline_policy
+        if self.deadline_policy not in POLICIES:
+            raise ValueError(f"Unknown deadline policy {self.deadline_policy!r}, expected one of {', '.join(POLICIES)}")
+        self.rollback = self.rollback if rollback is None else rollback
+        self.answers = self.answers if answers is None else answers
+        self.interactive = self.interactive if interactive is None else interactive
+        self.outputs = self.outputs if outputs is None else outputs
+        self.manifest_dir = self.manifest_dir if manifest_dir is None else manifest_dir
+        self.shell_backend = self.shell_backend if shell_backend is None else shell_backend
+
 
 class Context:
     """Current installation execution context."""
 
+    __slots__ = ("current_step", "step_count", "index", "eta", "sampler", "branch", "selection", "answers",
+                 "outputs", "host_locks", "watchdog", "queries")
+
     def __init__(self):
         self.current_step = 0
         """Number of the current install/uninstall step being run."""
@@ -43,10 +167,72 @@ class Context:
         self.index = 0
         """Level of imbrication of the install/uninstall step being run."""
 
+        self.eta: ProgressEstimator | None = None
+        """Estimates the progress & remaining time of the install/uninstall (if install steps timing history is
+        enabled)."""
+
+        self.sampler: StackSampler | None = None
+        """Samples the stacks of the running install steps (if profiling or hang detection is enabled)."""
+
+        self.branch: tuple[tuple[int, int], ...] = ()
+        """Parallel groups of install steps (id of the group, index of the install step in the group) the install
+        step being run belongs to, outermost first."""
+
+        self.selection: StepSelection | None = None
+        """Install steps to launch (all install steps if None)."""
+
+        self.answers: dict[str, str] = {}
+        """Values of the inputs declared by the install steps to launch, by input name."""
+
+        self.outputs = OutputStore()
+        """Outputs published by install steps."""
+
+        self.host_locks: tuple[str, ...] = ()
+        """Names of the host locks held by the groups of install steps the install step being run belongs to."""
+
+        self.watchdog: Watchdog | None = None
+        """Terminates the install steps exceeding their deadline (if the install process or an install step to launch
+        has a deadline)."""
+
+        self.queries = QueryCache()
+        """Results of the read-only shell commands run by install steps (see ``InstallStep.shell`` ``cache``)."""
+
+
+class StepSelection:
+    """Install steps selected to be launched, among the install steps of an install process.
+
+    Groups of install steps containing selected install steps are launched without checking their condition, and
+    only launch the selected install steps, keeping their order and parallel grouping.
+    """
+
+    __slots__ = ("selected", "needed")
+
+    def __init__(self, selected: set[int], needed: set[int]) -> None:
+        self.selected = selected
+        """Ids of the selected install steps (groups of install steps are selected with all their install steps)."""
+
+        self.needed = needed
+        """Ids of the selected install steps, and of the groups of install steps containing selected install steps."""
+
+    def steps(self, steps: list[InstallStep]) -> list[InstallStep]:
+        """Install steps to launch among ``steps``."""
+        return [step for step in steps if id(step) in self.needed]
+
+    def total_steps(self, step: InstallStep) -> int:
+        """Number of steps launched by ``step``."""
+        if id(step) not in self.needed:
+            return 0
+        if id(step) in self.selected or not isinstance(step, InstallSteps):
+            return step.total_steps()
+        total = sum(self.total_steps(child) for child in step._steps)
+        return total if isinstance(step, _ParallelInstallSteps) else total + 1
+
 
 class Display(abc.ABC):
     """Defines how install steps are displayed."""
 
+    __slots__ = ()
+
     @abc.abstractmethod
     def print(self, msg: str) -> None:
         """Display an install message"""
@@ -103,6 +289,15 @@ class Display(abc.ABC):
     def begin_all(self, msg: str) -> None:
         """Setup display for the entire install process."""
 
+    def shell_log(self, path: str) -> None:
+        """Display the path of the log file a shell command output was written to."""
+
+    def progress(self, done: int, total: int, msg: str = "") -> None:
+        """Display the progress of a long operation inside an install step (extraction, download, etc.)."""
+
+    def step_progress(self, done: int, total: int) -> None:
+        """Display the progress reported by a long install step."""
+
 
 class DisplayStdout(Display):
     """Default stdout display."""
@@ -119,6 +314,8 @@ class DisplayStdout(Display):
 
     terminal_width = shutil.get_terminal_size()[0]
 
+    __slots__ = ("stdout", "context")
+
     def __init__(self, stdout: TextIO | None = None, context: Context | None = None) -> None:
         self.stdout = stdout or sys.stdout
         self.context = context or Context()
@@ -186,11 +383,19 @@ class DisplayStdout(Display):
         print(msg, file=self.stdout, end="")
 
     def step_new(self, msg: str) -> None:
-        print(self._format_msg(f"[{self.context.current_step}/{self.context.step_count}] {msg}",
+        print(self._format_msg(f"[{self.context.current_step}/{self.context.step_count}{self._eta()}] {msg}",
                                self.context.index,
                                color=self.BOLD),
               file=self.stdout)
 
+    def _eta(self) -> str:
+        """Overall progress & remaining time, if estimated."""
+        if self.context.eta is None:
+            return ""
+        remaining = self.context.eta.remaining()
+        eta = f", ETA {_format_duration(remaining)}" if remaining is not None else ""
+        return f" {self.context.eta.fraction():.0%}{eta}"
+
     def step_end(self, msg: str) -> None:
         print(self._format_msg(msg,
                                self.context.index,
@@ -232,6 +437,56 @@ class DisplayStdout(Display):
                                color=self.UNDERLINE + self.BOLD, ),
               file=self.stdout)
 
+    def shell_log(self, path: str) -> None:
+        print(self._format_msg(f"Full output: {path}",
+                               self.context.index + 1,
+                               color=self.GREY),
+              file=self.stdout)
+
+    def progress(self, done: int, total: int, msg: str = "") -> None:
+        percent = done * 100 // total if total else 100
+        print(self._format_msg(f"{msg}: {percent}% ({_format_size(done)} / {_format_size(total)})",
+                               self.context.index + 1,
+                               color=self.GREY),
+              file=self.stdout)
+
+    def step_progress(self, done: int, total: int) -> None:
+        percent = done * 100 // total if total else 100
+        eta = self._eta()
+        print(self._format_msg(f"{percent}% ({done} / {total}){f' - overall{eta}' if eta else ''}",
+                               self.context.index + 1,
+                               color=self.GREY),
+              file=self.stdout)
+
+
+def collect_inputs(inputs: list[Input], config: Config, display: Display) -> dict[str, str]:
+    """Collects the values of ``inputs`` from the answers file & environment variables, asking the user the
+    others using ``display`` (if interactive)."""
+    def ask(input_: Input) -> str:
+        prompt = input_.prompt if input_.default is None else f"{input_.prompt}[{input_.default}] "
+        return display.get_password(prompt) if input_.secret else display.get_input(prompt)
+
+    answers = load_answers(config.answers) if config.answers is not None else {}
+    return collect(inputs, answers, ask if config.interactive else None)
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = round(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m{seconds % 60:02}s"
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02}m"
+
+
+def _format_size(size: float) -> str:
+    if size < 1024:
+        return f"{size} B"
+    for unit in ("KiB", "MiB", "GiB", "TiB"):
+        size /= 1024
+        if size < 1024 or unit == "TiB":
+            return f"{size:.1f} {unit}"
+
 
 class InstallStep(abc.ABC):
     r"""An installation step, giving details on how to install a simple element of your
@@ -270,12 +525,74 @@ class InstallStep(abc.ABC):
         ...     def uninstall(self) -> None:
         ...         '''Remove dependencies'''
         ...         shutil.rmtree(self.MY_PROJECT_DIR, ignore_errors=True)
+
+        Packages can also be declared using the ``packages`` class attribute: packages declared by all install steps
+        are then installed using a single package manager invocation (see ``InstallProcess.package_managers``):
+
+        >>> class InstallPythonDependencies(InstallStep):
+        ...     packages = {"pip": ["pytest", "sphinx", "ruff"]}
+        ...     def install(self) -> None:
+        ...         '''Install dependencies'''
+        ...     def uninstall(self) -> None:
+        ...         '''Remove dependencies'''
     """
 
+    packages: dict[str, list[str]] = {}
+    """Packages required by this install step, by package manager name (``"pip"``, ``"apt"``, ...)."""
+
+    prefetch: list[Prefetch] = []
+    """Resources required by this install step, fetched in background as soon as the install process starts."""
+
+    inputs: list[Input] = []
+    """Inputs required by this install step, collected before the install process starts (see ``answer``)."""
+
+    outputs: list[Output] = []
+    """Outputs published by this install step (see ``publish``): install steps reading them wait until they are
+    published."""
+
+    locks: list[HostLock] = []
+    """Host locks held while this install step is installed/uninstalled, shared with the other install processes of
+    the host (see ``install_process.locks``)."""
+
+    scheduling: Scheduling | None = None
+    """CPU & I/O priorities (and resource limits) of the shell commands of this install step
+    (see ``install_process.scheduling``)."""
+
+    watch_paths: list[str | os.PathLike] = []
+    """Files & directories consumed by this install step: in watch mode, this install step is re-run when they change
+    (see ``install_process.watch``)."""
+
+    depends_on: list[type[InstallStep]] | None = None
+    """Install steps this install step depends on: in pipelined reinstall (see ``InstallProcess.reinstall``), it is
+    uninstalled before them, and installed after them. If None, it depends on the install steps before it in the install
+    process (``[]`` for an install step depending on no other)."""
+
+    deadline: float | None = None
+    """If set, maximum duration (in seconds) of this install step install/uninstall: its shell commands are then killed,
+    and it fails (or is abandoned, see ``Config.deadline_policy``). Enforced when run by an install process, the install
+    step then running in its own thread, abandoned if blocked (see ``install_process.deadlines.run_bounded``): APIs
+    restricted to the main thread (such as ``signal.signal``) cannot be used by the install step, and an abandoned
+    install step keeps running in background."""
+
+    log_shell: bool = False
+    """If True and ``Config.log_dir`` is set, outputs of the shell commands of this install step are written straight
+    to its log file (see ``log_path``) rather than returned (see ``shell`` ``log`` parameter)."""
+
+    manifest_roots: list[str | os.PathLike] = []
+    """Directories this install step creates files & directories in: if ``Config.manifest_dir`` is set, they are
+    recorded at install (comparing snapshots of these directories), and deleted at uninstall
+    (see ``install_process.manifest``)."""
+
+    # install steps may be generated by tens of thousands: keep instances compact
+    __slots__ = ("_display", "_father", "_context", "_config", "_progress_decile")
+
     def __init__(self) -> None:
-        self._display = DisplayStdout()
+        # display, context & config are resolved through the father, unless set
+        self._display: Display | None = None
         self._father: InstallStep | None = None
-        self._context = Context()
+        self._context: Context | None = None
+        self._config: Config | None = None
+        self._progress_decile = -1
 
     @abc.abstractmethod
     def install(self) -> None:
@@ -304,57 +621,257 @@ class InstallStep(abc.ABC):
     def name(self) -> str:
         """Install step name"""
         try:
-            father_name = self.father.name()
+            return self.father._child_name(self)
         except AttributeError:
             return f"{self.__class__.__qualname__}"
 
-        if father_name:
-            return f"{father_name}.{self.__class__.__qualname__}"
-        return f"{self.__class__.__qualname__}"
-
-    def shell(self, cmd: str, check_error: bool = True, timeout: float = None) -> str:
+    def shell(self,
+              cmd: str,
+              check_error: bool = True,
+              timeout: float = None,
+              log: bool | None = None,
+              cache: bool = False) -> str:
         """Executes a shell command and returns its output.
 
+        If ``log`` and ``Config.log_dir`` are set, shell command output is written straight to the install step log
+        file instead (see ``log_path``): only its last lines are displayed.
+
         Args:
             cmd: shell cmd to execute
             check_error: if True, check if the shell cmd fails (and raises and Exception if it does fail)
             timeout: raises and Exception if shell cmd still runs after [timeout] seconds
+            log: if True, shell cmd output is written to the install step log file if ``Config.log_dir`` is set
+                (``log_shell`` if None)
+            cache: if True, shell cmd is a read-only query: it is run once per install process run, its result being
+                shared by all install steps (output is returned, never logged). See ``invalidate_queries``.
 
         Returns:
-            shell cmd output
+            shell cmd output (empty if it was written to the install step log file)
         """
-        if Config.verbose:
-            self.display.shell_cmd(cmd)
-
-        result = subprocess.run(
-            cmd,
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            timeout=timeout,
-            text=True,
-        )
-        output = result.stdout.strip()
-
-        if output and Config.verbose:
-            self.display.shell_output(output)
-
-        if check_error:
-            try:
-                result.check_returncode()
-            except subprocess.CalledProcessError:
-                if not Config.verbose:
-                    self.display.shell_output(output)
-                raise
+        scheduling = self.scheduling
+        if cache:
+            log_path = None
+            (returncode, output), cached = self.context.queries.run(cmd, lambda: self._run_shell(cmd, timeout, None))
+            if self.config.verbose:
+                self.display.shell_cmd(f"{cmd}    (cached)" if cached else cmd)
+        else:
+            if self.config.verbose:
+                self.display.shell_cmd(cmd if scheduling is None else f"{cmd}    ({scheduling})")
+            log_path = self.log_path if (self.log_shell if log is None else log) else None
+            returncode, output = self._run_shell(cmd, timeout, log_path)
+
+        failed = check_error and returncode != 0
+        if log_path is not None:
+            if failed:
+                self.display.shell_output(tail(log_path, lines=20))
+            if failed or self.config.verbose:
+                self.display.shell_log(os.fspath(log_path))
+        else:
+            if output and self.config.verbose:
+                self.display.shell_output(output)
+            if failed and not self.config.verbose:
+                self.display.shell_output(output)
+
+        if failed:
+            raise subprocess.CalledProcessError(returncode, cmd, output)
 
         return output
 
+    def invalidate_queries(self, *cmds: str) -> None:
+        """Forgets the results of the ``cmds`` queries (of all queries if none is given), after changing what they
+        report (installing packages, starting services, etc.): they will be run again.
+
+        See ``shell`` ``cache`` parameter.
+        """
+        self.context.queries.invalidate(cmds or None)
+
+    def _run_shell(self, cmd: str, timeout: float | None, log_path: pathlib.Path | None) -> tuple[int, str]:
+        """Runs a shell command (writing its output to ``log_path`` if set), and returns its return code & output."""
+        scheduling = self.scheduling
+        run_cmd = cmd if scheduling is None else scheduling.wrap(cmd)
+        for command in scheduling.missing() if scheduling is not None else []:
+            self.display.warn(f"{command} command is not installed: scheduling ({scheduling}) of {cmd} is only "
+                              f"partially applied")
+        sampler = self.context.sampler
+        watchdog = self.context.watchdog
+        on_start = sampler.shell_started if sampler else None
+        if watchdog is not None:
+            callbacks = [callback for callback in (on_start, watchdog.shell_started) if callback is not None]
+
+            def on_start(process: subprocess.Popen) -> None:
+                for callback in callbacks:
+                    callback(process)
+        backend = self.config.shell_backend
+        hooks = self.config.hooks
+        if hooks:
+            process = self._install_process()
+            hooks.emit("shell_start", process=process, step=self, cmd=cmd)
+            start = time.perf_counter()
+        returncode = usage = None
+        try:
+            if log_path is not None:
+                output = ""
+                on_tail = self.display.shell_output if self.config.verbose else None
+                returncode, usage = backend.run_logged(run_cmd, log_path, timeout, on_tail=on_tail, on_start=on_start)
+            else:
+                returncode, output, usage = backend.run(run_cmd, timeout, on_start=on_start)
+                output = output.strip()
+        finally:
+            if sampler is not None:
+                sampler.shell_ended()
+            if watchdog is not None:
+                watchdog.shell_ended()
+            if hooks:
+                hooks.emit("shell_end", process=process, step=self, cmd=cmd,
+                           duration=time.perf_counter() - start, returncode=returncode, usage=usage)
+        if usage is not None:
+            install_process = self._install_process()
+            if install_process is not None:
+                install_process._add_resource_usage(self, usage)
+        return returncode, output
+
+    @property
+    def log_path(self) -> pathlib.Path | None:
+        """Log file of this install step shell commands (None if ``Config.log_dir`` is not set)."""
+        if self.config.log_dir is None:
+            return None
+        return pathlib.Path(self.config.log_dir) / f"{self.name() or self.__class__.__qualname__}.log"
+
+    @property
+    def manifest(self) -> Manifest | None:
+        """Manifest of the files & directories created by this install step (None if ``Config.manifest_dir`` is not
+        set, or if this install step declares no ``manifest_roots``)."""
+        if self.config.manifest_dir is None or not self.manifest_roots:
+            return None
+        name = self.name() or self.__class__.__qualname__
+        return Manifest(pathlib.Path(self.config.manifest_dir) / f"{name}.manifest")
+
+    def extract(self,
+                archive: str | os.PathLike,
+                destination: str | os.PathLike,
+                workers: int | None = None) -> list[pathlib.Path]:
+        """Extracts a zip or tar archive, displaying the extraction progress.
+
+        Archive members are streamed (the archive is never loaded into memory), and extracted concurrently.
+        See ``install_process.archive.extract_archive`` for supported formats.
+
+        Args:
+            archive: path of the archive to extract
+            destination: directory where the archive is extracted (created if it does not exist)
+            workers: maximum number of extraction threads
+
+        Returns:
+            paths of the extracted files, directories and links
+        """
+        return extract_archive(archive, destination, workers,
+                               progress=self._progress_callback(f"Extracting {pathlib.Path(archive).name}"))
+
+    def fetch(self,
+              source: str | os.PathLike,
+              destination: str | os.PathLike,
+              checksum: str | None = None,
+              algorithm: str = "sha256",
+              workers: int | None = None) -> str:
+        """Copies a local file or downloads an HTTP(S) resource, verifying its checksum,
+        and displaying the fetch progress.
+
+        Data is hashed while it is streamed, and big sources are fetched using parallel ranged reads.
+        If ``destination`` already exists with the expected ``checksum``, nothing is fetched.
+        See ``install_process.fetch.fetch`` for details.
+
+        Args:
+            source: local path, ``file://`` URL, or ``http(s)://`` URL
+            destination: path of the fetched file
+            checksum: expected hex digest (raises a ValueError if the fetched file does not match)
+            algorithm: any ``hashlib`` algorithm
+            workers: maximum number of parallel ranged reads
+
+        Returns:
+            hex digest of the fetched file
+        """
+        return fetch(source, destination, checksum, algorithm, workers,
+                     progress=self._progress_callback(f"Fetching {pathlib.PurePath(os.fspath(source)).name}"))
+
+    def answer(self, input_: Input | str) -> str:
+        """Value of an input declared by this install step (see ``inputs``), by input or input name.
+
+        Values are collected before the install process starts. Install steps run on their own collect their
+        inputs on first use.
+        """
+        name = input_ if isinstance(input_, str) else input_.name
+        answers = self.context.answers
+        if name not in answers:
+            declared = [declared for declared in self.inputs if declared.name == name]
+            if not declared:
+                raise ValueError(f"Input {name} is not declared by {self.name()}")
+            answers.update(collect_inputs(declared, self.config, self.display))
+        return answers[name]
+
+    def publish(self, output: Output, value: Any) -> None:
+        """Publishes the value of an output declared by this install step (see ``outputs``), for later install steps.
+
+        Raises:
+            ValueError: if the output is not declared, or if the value is not of the output type
+        """
+        if output not in self.outputs:
+            raise ValueError(f"Output {output.name} is not declared by {self.name()}")
+        self.context.outputs.publish(output, value)
+
+    def output(self, output: Output, timeout: float | None = None) -> Any:
+        """Value of an output published by another install step, waiting until it is published if the install step
+        publishing it runs in parallel.
+
+        Raises:
+            ValueError: if the output was not published (or after ``timeout`` seconds), or if the install step
+                publishing it runs after this install step
+        """
+        return self.context.outputs.get(output, timeout, reader=self.name(), branch=self.context.branch)
+
+    def progress(self, done: int, total: int) -> None:
+        """Reports the progress of this install step: ``done`` out of ``total`` units of work
+        (files, packages, etc.).
+
+        Progress is displayed every 10%, and used to estimate the remaining time of the install process.
+        """
+        if self.context.eta is not None:
+            self.context.eta.update(self, done, total)
+        if self.context.sampler is not None:
+            self.context.sampler.activity()
+        decile = done * 10 // total if total else 10
+        if decile != self._progress_decile:
+            self._progress_decile = decile
+            self.display.step_progress(done, total)
+
+    def _progress_callback(self, msg: str) -> Callable[[int, int], None]:
+        """Progress callback displaying progress every 10%."""
+        last_decile = -1
+
+        def report(done: int, total: int) -> None:
+            nonlocal last_decile
+            if self.context.eta is not None:
+                self.context.eta.update(self, done, total)
+            if self.context.sampler is not None:
+                self.context.sampler.activity()
+            decile = done * 10 // total if total else 10
+            if decile != last_decile:
+                last_decile = decile
+                self.display.progress(done, total, msg)
+
+        return report
+
     @property
     def display(self) -> Display:
+        """Display of this install step (display of its father, unless set)."""
+        if self._display is not None:
+            return self._display
+        father = self.father
+        if father is not None:
+            return father.display
+        self._display = DisplayStdout(context=self.context)
         return self._display
 
     @display.setter
-    def display(self, display: Display) -> None:
+    def display(self, display: Display | None) -> None:
         self._display = display
 
     @property
@@ -367,12 +884,33 @@ class InstallStep(abc.ABC):
 
     @property
     def context(self) -> Context:
+        """Execution context of this install step (context of its father, unless set)."""
+        if self._context is not None:
+            return self._context
+        father = self.father
+        if father is not None:
+            return father.context
+        self._context = Context()
         return self._context
 
     @context.setter
-    def context(self, context: Context) -> None:
+    def context(self, context: Context | None) -> None:
         self._context = context
-        self._display.context = context
+
+    @property
+    def config(self) -> Config:
+        """Configuration of the install process run (configuration of its father unless set,
+        default configuration if not run by an install process)."""
+        if self._config is not None:
+            return self._config
+        father = self.father
+        if father is not None:
+            return father.config
+        return Config()
+
+    @config.setter
+    def config(self, config: Config | None) -> None:
+        self._config = config
 
     def _process_install(self) -> None:
         """Do not overwrite method when defining a new install step.
@@ -380,18 +918,12 @@ class InstallStep(abc.ABC):
         Notes:
             Handles display & config for install
         """
-        if Config.only_show_names:
+        if self.config.only_show_names:
             self.display.step_new(f"{self.install.__doc__}    {self.name()}")
             return
 
         self.display.step_new(self.install.__doc__)
-
-        if not self.install_condition():
-            self.display.step_skip(self.install_condition.__doc__)
-            return
-
-        self.install()
-        self.display.step_end("done.")
+        self._run("install")
 
     def _process_uninstall(self) -> None:
         """Do not overwrite method when defining a new install step.
@@ -399,23 +931,286 @@ class InstallStep(abc.ABC):
         Notes:
             Handles display & config for uninstall
         """
-        if Config.only_show_names:
+        if self.config.only_show_names:
             self.display.step_new(f"{self.uninstall.__doc__}    {self.name()}")
             return
 
         self.display.step_new(self.uninstall.__doc__)
+        self._run("uninstall")
+
+    def _run(self, action: str, expired: list[DeadlineExceeded] | None = None) -> None:
+        """Checks the install/uninstall condition, then installs/uninstalls (once step start is displayed).
+
+        Args:
+            action: ``"install"`` or ``"uninstall"``
+            expired: if set, this run is bounded by ``_run_bounded``: the deadline expiry is added to ``expired``,
+                to be handled by ``_run_bounded``
 
-        if not self.uninstall_condition():
-            self.display.step_skip(self.uninstall_condition.__doc__)
+        Notes:
+            Emits step & condition lifecycle events (see ``install_process.hooks``)
+        """
+        watchdog = self.context.watchdog
+        if watchdog is not None and self.deadline is not None and expired is None:
+            self._run_bounded(action)
             return
 
-        self.uninstall()
+        condition = self.install_condition if action == "install" else self.uninstall_condition
+        hooks = self.config.hooks
+        if hooks:
+            process = self._install_process()
+            hooks.emit("step_start", process=process, step=self, action=action)
+        eta = self.context.eta
+        if eta is not None:
+            eta.start(self)
+        sampler = self.context.sampler
+        if sampler is not None:
+            sampler.step_started(self, leaf=not isinstance(self, InstallSteps))
+        if watchdog is not None:
+            deadline = watchdog.watch(id(self), self.deadline, self._lineage(), leaf=not isinstance(self, InstallSteps))
+        start = time.perf_counter()
+
+        try:
+            if hooks:
+                hooks.emit("condition_start", process=process, step=self, action=action)
+                condition_start = time.perf_counter()
+            condition_met = condition()
+            if hooks:
+                hooks.emit("condition_end", process=process, step=self, action=action,
+                           duration=time.perf_counter() - condition_start, result=condition_met)
+
+            if not condition_met:
+                self._skip(condition)
+                if action == "install":
+                    self._withdraw_packages()
+                if eta is not None:
+                    eta.skip(step for _, step in self._get_child())
+                if hooks:
+                    hooks.emit("step_skip", process=process, step=self, action=action,
+                               duration=time.perf_counter() - start)
+                return
+
+            if action == "install":
+                with self._hold_locks():
+                    self._prepare_install()
+                    with self._recording_manifest():
+                        self.install()
+            else:
+                with self._hold_locks():
+                    self.uninstall()
+                    self._remove_manifest()
+                self._require_packages(uninstall=True)
+        except BaseException as raised:
+            error = raised
+            timed_out = watchdog is not None and deadline.expired
+            if timed_out:
+                error = DeadlineExceeded(f"{self.name()} did not end within its deadline of {self.deadline}s")
+                if expired is not None:
+                    expired.append(error)
+                    return
+            if hooks:
+                hooks.emit("step_fail", process=process, step=self, action=action,
+                           duration=time.perf_counter() - start, error=error)
+            if not timed_out:
+                raise
+            if self.config.deadline_policy != "continue":
+                raise error from None
+            self.display.error(f"{error}: abandoned")
+            return
+        finally:
+            if watchdog is not None:
+                watchdog.unwatch(deadline)
+            if sampler is not None:
+                sampler.step_ended()
+            self._outputs_done()
+
+        if eta is not None:
+            eta.end(self, time.perf_counter() - start)
+        if action == "install" and self.config.rollback and not isinstance(self, InstallSteps):
+            process = self._install_process()
+            if process is not None:
+                process._completed_steps.append((self, self.context.branch))
         self.display.step_end("done.")
+        if hooks:
+            hooks.emit("step_end", process=process, step=self, action=action, duration=time.perf_counter() - start)
+
+    def _run_bounded(self, action: str) -> None:
+        """Installs/uninstalls in another thread, which is abandoned if it does not end within the deadline of this
+        install step (Python code blocked in a system call cannot be interrupted)."""
+        start = time.perf_counter()
+        index = self.context.index
+        expired: list[DeadlineExceeded] = []
+        if run_bounded(lambda: self._run(action, expired), self.deadline, self.name()):
+            if not expired:
+                return
+            error = expired[0]
+        else:
+            error = DeadlineExceeded(f"{self.name()} did not end within its deadline of {self.deadline}s")
+            # outputs of an abandoned install step will never be published, and its install steps are not displayed
+            # anymore
+            self._outputs_done()
+            self.context.index = index
+
+        hooks = self.config.hooks
+        if hooks:
+            hooks.emit("step_fail", process=self._install_process(), step=self, action=action,
+                       duration=time.perf_counter() - start, error=error)
+        if self.config.deadline_policy != "continue":
+            raise error from None
+        self.display.error(f"{error}: abandoned")
+
+    def _outputs_done(self) -> None:
+        """This install step (with its install steps) will not publish its outputs anymore."""
+        outputs = self.context.outputs
+        if outputs.pending:
+            outputs.done(id(self))
+            if isinstance(self, InstallSteps):
+                # outputs of install steps which did not run (skipped group) will never be published
+                for _, step in self._get_child():
+                    outputs.done(id(step))
+
+    def _skip(self, condition: Callable[[], bool]) -> None:
+        """Displays the install/uninstall is skipped, because ``condition`` is not met."""
+        self.display.step_skip(condition.__doc__)
+
+    def _lineage(self) -> tuple[int, ...]:
+        """Ids of the groups of install steps this install step belongs to, innermost first."""
+        lineage = []
+        step = self.father
+        while step is not None:
+            lineage.append(id(step))
+            step = step.father
+        return tuple(lineage)
+
+    def _hold_locks(self) -> ContextManager[None]:
+        """Holds the host locks declared by this install step (install steps of a group holding a lock do not
+        acquire it again)."""
+        if not self.locks:
+            return contextlib.nullcontext()
+        return self._holding_locks([lock for lock in self.locks if lock.name not in self.context.host_locks])
+
+    @contextlib.contextmanager
+    def _holding_locks(self, locks: list[HostLock]) -> Iterator[None]:
+        held = self.context.host_locks
+
+        def on_wait(lock: HostLock) -> None:
+            # displayed by the install process: output of parallel install steps is only displayed once they are done
+            process = self._install_process()
+            display = self.display if process is None else process.display
+            display.msg(f"{self.name()}: waiting for host lock {lock.name} ({'shared' if lock.shared else 'exclusive'})")
+
+        with hold(locks, on_wait):
+            self.context.host_locks = held + tuple(lock.name for lock in locks)
+            try:
+                yield
+            finally:
+                self.context.host_locks = held
+
+    def _recording_manifest(self) -> ContextManager[None]:
+        """Records the files & directories created meanwhile in ``manifest_roots`` to this install step manifest."""
+        manifest = self.manifest
+        if manifest is None:
+            return contextlib.nullcontext()
+        return self._recording(manifest)
+
+    @contextlib.contextmanager
+    def _recording(self, manifest: Manifest) -> Iterator[None]:
+        # install steps running in parallel would record each other's files
+        with hold_roots(self.manifest_roots, id(self), self._lineage()):
+            before = snapshot(self.manifest_roots)
+            try:
+                yield
+            finally:
+                # recorded even if install fails (or its deadline expires): uninstall (or rollback) deletes what was
+                # created
+                with critical():
+                    manifest.record(snapshot(self.manifest_roots) - before)
+
+    def _remove_manifest(self) -> None:
+        """Deletes the files & directories recorded in this install step manifest."""
+        manifest = self.manifest
+        if manifest is None:
+            return
+        removed = manifest.remove()
+        if self.config.verbose:
+            self.display.msg(f"Removed {removed} file(s) & directories recorded in {manifest.path}")
+
+    def _install_process(self) -> InstallProcess | None:
+        """Install process this install step belongs to, if any."""
+        step = self
+        while step.father is not None:
+            step = step.father
+        return step if isinstance(step, InstallProcess) else None
+
+    def _prepare_install(self) -> None:
+        """Makes sure everything declared by this install step is ready before install."""
+        self._wait_prefetched()
+        self._require_packages()
+
+    def _wait_prefetched(self) -> None:
+        """Waits for resources declared by this install step to be fetched (fetching them now if required)."""
+        if not self.prefetch:
+            return
+
+        process = self._install_process()
+        prefetcher = process._prefetcher if process else None
+        for resource in self.prefetch:
+            if prefetcher is None:
+                fetch(resource.source, resource.destination, resource.checksum, resource.algorithm,
+                      progress=self._progress_callback(f"Fetching {resource.destination.name}"))
+                continue
+            if not prefetcher.done(resource):
+                self.display.msg(f"Waiting for {resource.destination.name} to be fetched")
+            prefetcher.wait(resource)
+
+    def _require_packages(self, uninstall: bool = False) -> None:
+        """Makes sure packages declared by this install step are installed (or uninstalled).
+
+        Notes:
+            When run by an install process, packages are installed at once by the install process package batch,
+            and uninstall of packages is postponed to the end of the install process uninstall.
+        """
+        if not self.packages:
+            return
+
+        process = self._install_process()
+        batch = process._package_batch if process else None
+        if uninstall and batch is not None and not batch.uninstall:
+            # uninstall half of a pipelined reinstall: packages stay installed
+            return
+        standalone = batch is None
+        if standalone:
+            batch = PackageBatch((process or InstallProcess).package_managers, {self: self.packages}, uninstall)
+
+        failures = batch.require(self, self.shell)
+        if standalone and uninstall:
+            batch.flush(self.shell)
+            failures = batch.failures(self)
+
+        for manager_name, error in failures:
+            raise ValueError(f"Packages of {self.name()} could not be "
+                             f"{'uninstalled' if uninstall else 'installed'} using {manager_name}: {error}") from error
+
+    def _withdraw_packages(self) -> None:
+        """Packages declared by this install step (with its install steps) are not installed by the install process
+        package batch, as it is skipped."""
+        process = self._install_process()
+        batch = process._package_batch if process else None
+        if batch is not None and not batch.uninstall:
+            batch.withdraw(step for _, step in self._get_child())
 
     def _get_child(self) -> list[tuple[str, InstallStep]]:
 
         return [(self.name(), self)]
 
+    def _clone(self) -> InstallStep:
+        """Copy of this install step, so that install processes do not share install step instances.
+
+        The copy resolves its display, context & config through its (new) father.
+        """
+        clone = copy.copy(self)
+        clone._display = clone._context = clone._config = None
+        return clone
+
     def __or__(self, other: InstallStep) -> _ParallelInstallSteps:
         parallel_step = _ParallelInstallSteps()
         parallel_step._steps = [self, other]
@@ -449,8 +1244,10 @@ class InstallSteps(InstallStep):
 
     steps: list[InstallStep] = None
 
+    __slots__ = ("_steps",)
+
     def __init__(self) -> None:
-        self._steps = self.steps if self.steps else []
+        self._steps = [step._clone() for step in self.steps] if self.steps else []
         for step in self._steps:
             step.father = self
         super().__init__()
@@ -462,11 +1259,14 @@ class InstallSteps(InstallStep):
         Notes:
             Handles steps install
         """
+        index = self.context.index
         self.context.index += 1
-        for step in self._steps:
-            self.context.current_step += 1
-            step._process_install()
-        self.context.index -= 1
+        try:
+            for step in self._launched():
+                self.context.current_step += 1
+                step._process_install()
+        finally:
+            self.context.index = index
 
     def uninstall(self) -> None:
         """Do not overwrite method when defining install steps,
@@ -475,66 +1275,67 @@ class InstallSteps(InstallStep):
         Notes:
             Handles steps uninstall
         """
+        index = self.context.index
         self.context.index += 1
-        for step in reversed(self._steps):
-            self.context.current_step += 1
-            step._process_uninstall()
-        self.context.index -= 1
+        try:
+            for step in reversed(self._launched()):
+                self.context.current_step += 1
+                step._process_uninstall()
+        finally:
+            self.context.index = index
 
     def total_steps(self) -> int:
         return sum(step.total_steps() for step in self._steps) + 1
 
-    @property
-    def display(self) -> Display:
-        return self._display
-
-    @display.setter
-    def display(self, display: Display) -> None:
-        self._display = display
-        for step in self._steps:
-            step.display = display
-
-    @property
-    def context(self) -> Context:
-        return self._context
-
-    @context.setter
-    def context(self, context: Context) -> None:
-        self._context = context
-        for step in self._steps:
-            step.context = context
-
     def _process_install(self) -> None:
-        if Config.only_show_names:
+        if self.config.only_show_names:
             self.display.step_new(f"Install # {self.__doc__}    {self.name()}")
             self.install()
             return
 
         self.display.step_new(f"Install # {self.__doc__}")
-
-        if not self.install_condition():
-            self.display.step_skip(self.install_condition.__doc__)
-            self.context.current_step += self.total_steps()
+        if self._partially_selected():
+            self.install()
+            self.display.step_end("done.")
             return
-
-        self.install()
-        self.display.step_end("done.")
+        self._run("install")
 
     def _process_uninstall(self) -> None:
-        if Config.only_show_names:
+        if self.config.only_show_names:
             self.display.step_new(f"Uninstall # {self.__doc__}    {self.name()}")
             self.uninstall()
             return
 
         self.display.step_new(f"Uninstall # {self.__doc__}")
-
-        if not self.uninstall_condition():
-            self.display.step_skip(self.uninstall_condition.__doc__)
-            self.context.current_step += self.total_steps()
+        if self._partially_selected():
+            self.uninstall()
+            self.display.step_end("done.")
             return
-
-        self.uninstall()
-        self.display.step_end("done.")
+        self._run("uninstall")
+
+    def _skip(self, condition: Callable[[], bool]) -> None:
+        super()._skip(condition)
+        self.context.current_step += self.total_steps()
+
+    def _launched(self) -> list[InstallStep]:
+        """Install steps of this group to launch."""
+        selection = self.context.selection
+        return self._steps if selection is None else selection.steps(self._steps)
+
+    def _runnable_package_steps(self) -> Iterator[InstallStep]:
+        """Install steps of this group to launch declaring packages, whose install condition (and the install
+        conditions of the groups between) is met (see ``InstallProcess.check_package_conditions``)."""
+        for step in self._launched():
+            if isinstance(step, InstallSteps):
+                if isinstance(step, _ParallelInstallSteps) or step._partially_selected() or step.install_condition():
+                    yield from step._runnable_package_steps()
+            elif step.packages and step.install_condition():
+                yield step
+
+    def _partially_selected(self) -> bool:
+        """Whether only some install steps of this group are selected: the group condition is then not checked."""
+        selection = self.context.selection
+        return selection is not None and id(self) not in selection.selected
 
     def _get_child(self) -> list[tuple[str, InstallStep]]:
         child: list[tuple[str, InstallStep]] = [(self.name(), self)]
@@ -542,47 +1343,69 @@ class InstallSteps(InstallStep):
             child.extend(step._get_child())
         return child
 
+    def _child_name(self, step: InstallStep) -> str:
+        """Name of ``step``, one of the install steps of this group."""
+        name = self.name()
+        if name:
+            return f"{name}.{step.__class__.__qualname__}"
+        return f"{step.__class__.__qualname__}"
+
+    def _clone(self) -> InstallSteps:
+        clone = super()._clone()
+        clone._steps = [step._clone() for step in self._steps]
+        for step in clone._steps:
+            step.father = clone
+        return clone
+
 
 class _ParallelInstallSteps(InstallSteps):
+    __slots__ = ()
+
     def install(self) -> None:
         with concurrent.futures.ThreadPoolExecutor() as executor:
             future_steps: list[tuple[concurrent.futures.Future, InstallStep]] = []
             previous_step_count = 0
-            for step in self._steps:
+            for index, step in enumerate(self._launched()):
                 self.context.current_step += previous_step_count
-                step.display = DisplayStdout(io.StringIO())
                 step.context = copy.copy(self.context)
-                previous_step_count = step.total_steps()
+                step.context.branch = self.context.branch + ((id(self), index),)
+                step.display = DisplayStdout(io.StringIO(), context=step.context)
+                previous_step_count = self._total_steps(step)
                 future_steps.append((executor.submit(step._process_install), step))
             for future, step in future_steps:
                 future.result()
                 self.display.print(step.display.stdout.getvalue())
-                step.display = DisplayStdout()
+                step.display = step.context = None
 
     def uninstall(self) -> None:
         with concurrent.futures.ThreadPoolExecutor() as executor:
             future_steps: list[tuple[concurrent.futures.Future, InstallStep]] = []
             previous_step_count = 0
-            for step in reversed(self._steps):
+            for step in reversed(self._launched()):
                 self.context.current_step += previous_step_count
-                step.display = DisplayStdout(io.StringIO())
                 step.context = copy.copy(self.context)
-                previous_step_count = step.total_steps()
+                step.display = DisplayStdout(io.StringIO(), context=step.context)
+                previous_step_count = self._total_steps(step)
                 future_steps.append((executor.submit(step._process_uninstall), step))
             for future, step in future_steps:
                 future.result()
                 self.display.print(step.display.stdout.getvalue())
-                step.display = DisplayStdout()
+                step.display = step.context = None
 
     def total_steps(self) -> int:
         return sum(step.total_steps() for step in self._steps)
 
+    def _total_steps(self, step: InstallStep) -> int:
+        """Number of steps launched by ``step``, one of the install steps of this group."""
+        selection = self.context.selection
+        return step.total_steps() if selection is None else selection.total_steps(step)
+
     def _process_install(self) -> None:
-        self.display.step_new_parallel(" | ".join(step.__class__.__qualname__ for step in self._steps))
+        self.display.step_new_parallel(" | ".join(step.__class__.__qualname__ for step in self._launched()))
         self.install()
 
     def _process_uninstall(self) -> None:
-        self.display.step_new_parallel(" | ".join(step.__class__.__qualname__ for step in self._steps))
+        self.display.step_new_parallel(" | ".join(step.__class__.__qualname__ for step in self._launched()))
         self.uninstall()
 
     @property
@@ -594,6 +1417,12 @@ class _ParallelInstallSteps(InstallSteps):
         for step in self._steps:
             step.father = father
 
+    def _clone(self) -> _ParallelInstallSteps:
+        # steps of a parallel group keep the father of the group
+        clone = InstallStep._clone(self)
+        clone._steps = [step._clone() for step in self._steps]
+        return clone
+
     def __or__(self, other: InstallStep) -> _ParallelInstallSteps:
         if isinstance(other, _ParallelInstallSteps):
             self._steps.extend(other._steps)
@@ -602,6 +1431,128 @@ class _ParallelInstallSteps(InstallSteps):
         return self
 
 
+class MatrixInstallSteps(InstallSteps):
+    """An install step run once per parameter (database instance, user account, etc.), runs being parallel.
+
+    Define the install step using the ``step`` class attribute, and its parameters using the ``parameters`` class
+    attribute: each run gets its parameter as ``self.parameter``, and is named after the matrix and the parameter key
+    (``Databases[db07]``), so that a single run may be targeted using ``-t``.
+
+    Examples:
+
+        >>> class CreateDatabase(InstallStep):
+        ...     def install(self) -> None:
+        ...         '''Create database'''
+        ...         self.shell(f"createdb {self.parameter}")
+        ...     # ...
+        ...
+        ... class Databases(MatrixInstallSteps):
+        ...     '''Databases'''
+        ...     step = CreateDatabase
+        ...     parameters = [f"db{index:02}" for index in range(60)]
+        ...     max_workers = 8
+    """
+
+    step: type[InstallStep] = None
+    """Install step run for each parameter (if it declares ``__slots__``, they must include ``"parameter"``)."""
+
+    parameters: list[Any] = []
+    """Parameters the install step is run with."""
+
+    max_workers: int | None = None
+    """Maximum number of parallel runs (``concurrent.futures.ThreadPoolExecutor`` default if None)."""
+
+    __slots__ = ()
+
+    def __init__(self) -> None:
+        InstallStep.__init__(self)
+        self._steps = []
+        keys: set[str] = set()
+        for parameter in self.parameters:
+            key = self.key(parameter)
+            if key in keys:
+                raise ValueError(f"Parameters of {self.__class__.__qualname__} must have distinct keys, "
+                                 f"{key} is duplicated")
+            keys.add(key)
+            step = self.step()
+            step.parameter = parameter
+            step.father = self
+            self._steps.append(step)
+
+    def key(self, parameter: Any) -> str:
+        """Overwrite method to name runs after a part of their parameter (the parameter itself by default)."""
+        return str(parameter)
+
+    def install(self) -> None:
+        """Do not overwrite method when defining matrix install steps,
+        use the ``step`` & ``parameters`` class attributes instead.
+
+        Notes:
+            Runs the install step for each parameter, in parallel
+        """
+        if self.config.only_show_names:
+            super().install()
+            return
+        self._run_parallel("install", self._launched())
+
+    def uninstall(self) -> None:
+        """Do not overwrite method when defining matrix install steps,
+        use the ``step`` & ``parameters`` class attributes instead.
+
+        Notes:
+            Runs the install step uninstall for each parameter, in parallel
+        """
+        if self.config.only_show_names:
+            super().uninstall()
+            return
+        self._run_parallel("uninstall", list(reversed(self._launched())))
+
+    def _run_parallel(self, action: str, steps: list[InstallStep]) -> None:
+        """Runs ``steps``, displaying the status of each run once it ends (with its output if it failed,
+        or in verbose mode).
+
+        Raises:
+            ValueError: if some runs failed, once all runs ended
+        """
+        failures: list[tuple[InstallStep, Exception]] = []
+        with concurrent.futures.ThreadPoolExecutor(self.max_workers) as executor:
+            future_steps: dict[concurrent.futures.Future, InstallStep] = {}
+            for index, step in enumerate(steps):
+                self.context.current_step += 1
+                step.context = copy.copy(self.context)
+                step.context.index += 1
+                step.context.branch = self.context.branch + ((id(self), index),)
+                step.display = DisplayStdout(io.StringIO(), context=step.context)
+                self.context.current_step += self._total_steps(step) - 1
+                run = step._process_install if action == "install" else step._process_uninstall
+                future_steps[executor.submit(run)] = step
+
+            for done, future in enumerate(concurrent.futures.as_completed(future_steps), start=1):
+                step = future_steps[future]
+                error = future.exception()
+                if error is not None and not isinstance(error, Exception):
+                    raise error  # interrupted
+                if error is not None or self.config.verbose:
+                    self.display.print(step.display.stdout.getvalue())
+                status = "done." if error is None else f"failed: {error.__class__.__qualname__}: {error}"
+                self.display.msg(f"[{done}/{len(steps)}] {self.key(step.parameter)} {status}")
+                if error is not None:
+                    failures.append((step, error))
+                step.display = step.context = None
+
+        if failures:
+            keys = ", ".join(sorted(self.key(step.parameter) for step, _ in failures))
+            raise ValueError(f"{len(failures)}/{len(steps)} runs of {self.name()} failed: {keys}") from failures[0][1]
+
+    def _total_steps(self, step: InstallStep) -> int:
+        """Number of steps launched by ``step``, one of the runs of this matrix."""
+        selection = self.context.selection
+        return step.total_steps() if selection is None else selection.total_steps(step)
+
+    def _child_name(self, step: InstallStep) -> str:
+        return f"{self.name()}[{self.key(step.parameter)}]"
+
+
 class InstallProcess(InstallSteps):
     """The required collection of installation steps.
 
@@ -631,53 +1582,261 @@ class InstallProcess(InstallSteps):
         ...     setup_install(SetupPythonEnv)
     """
 
-    def __init__(self, install_step_name: str = "") -> None:
+    package_managers: dict[str, PackageManager] = default_package_managers()
+    """Package managers used to install the packages declared by install steps, by name."""
+
+    check_package_conditions = False
+    """If True, install conditions of the install steps declaring packages (and of their groups) are checked before
+    the install starts, so that packages of install steps which will be skipped are never installed.
+    These install conditions are then checked twice, and must not depend on earlier install steps.
+    Otherwise, packages of all install steps to launch are installed at the first barrier, except those of install
+    steps already skipped."""
+
+    prefetch_workers = 4
+    """Maximum number of resources prefetched concurrently."""
+
+    prefetch_bandwidth: float | None = None
+    """Maximum bandwidth (in bytes per second) used to prefetch resources, if set."""
+
+    timing_history: str | os.PathLike | None = None
+    """Path of the SQLite file recording install steps durations, used to display the remaining install time.
+    Disabled if None."""
+
+    __slots__ = ("_package_batch", "_prefetcher", "_steps_dict", "_resource_usage", "_resource_lock",
+                 "_completed_steps")
+
+    def __init__(self,
+                 install_step_name: str | Sequence[str] = "",
+                 config: Config | None = None,
+                 from_step: str = "",
+                 until_step: str = "") -> None:
+        """
+        Args:
+            install_step_name: name(s) or pattern(s) of the install steps to launch (all steps are launched if empty):
+                exact install step names, glob patterns (``Database.*``), or regular expressions prefixed with ``re:``
+            config: configuration of the install process runs (default configuration if not set)
+            from_step: if set, name of the first install step to launch (in install order)
+            until_step: if set, name of the last install step to launch (in install order, with its install steps)
+        """
         super().__init__()
-        self._isntall_step_name = install_step_name
+        self._package_batch: PackageBatch | None = None
+        self._prefetcher: Prefetcher | None = None
+        self._resource_usage: dict[str, ResourceUsage] = {}
+        self._resource_lock = threading.Lock()
+        self._completed_steps: list[tuple[InstallStep, tuple[tuple[int, int], ...]]] = []
         self._steps_dict = {child_name: child_step for child_name, child_step in self._get_child()}
-        if self._isntall_step_name and self._isntall_step_name not in self._steps_dict:
-            raise ValueError(f"Test step {self._isntall_step_name} does not exist in {self.__class__.__qualname__}")
+        targets = [install_step_name] if isinstance(install_step_name, str) else list(install_step_name)
 
         self.context = Context()
+        self.context.selection = self._select([target for target in targets if target], from_step, until_step)
         self.display = DisplayStdout(context=self.context)
+        self.config = config or Config()
 
     def install(self) -> None:
-        self.display.begin_all(self.__class__.__doc__)
-        self._check_root()
-        self.prologue()
-
-        if self._isntall_step_name:
-            self.context.current_step = 1
-            self.context.index += 1
-            self.context.step_count = self._steps_dict[self._isntall_step_name].total_steps()
-            self._steps_dict[self._isntall_step_name]._process_install()
-            self.context.index -= 1
-        else:
-            self.context.current_step = 0
-            self.context.step_count = self.total_steps() - 1
-            super().install()
-
-        self.display.step_end("done.")
-        self.epilogue()
+        with self._process_events("install"), self._rollback_on_failure():
+            self.display.begin_all(self.__class__.__doc__)
+            self._check_root()
+            self._resource_usage = {}
+            self.context.queries = QueryCache()
+            self._collect_inputs("install")
+            self._start_outputs()
+            self._package_batch = self._new_package_batch(uninstall=False)
+            self._start_prefetch()
+            self._start_eta("install")
+            self._start_sampler()
+            try:
+                self.prologue()
+
+                self.context.current_step = 0
+                self.context.step_count = self._total_launched_steps() - 1
+                def install() -> None:
+                    if self.check_package_conditions:
+                        self._admit_packages()
+                    InstallSteps.install(self)
+
+                self._enforcing_deadlines(install)
+            finally:
+                self._package_batch = None
+                self._stop_prefetch()
+                self._stop_eta()
+                self._stop_sampler()
+
+            self.display.step_end("done.")
+            self._display_resource_report()
+            self.epilogue()
 
     def uninstall(self) -> None:
-        self.display.begin_all(self.__class__.__doc__)
-        self._check_root()
-        self.prologue()
-
-        if self._isntall_step_name:
-            self.context.current_step = 1
-            self.context.index += 1
-            self.context.step_count = self._steps_dict[self._isntall_step_name].total_steps()
-            self._steps_dict[self._isntall_step_name]._process_uninstall()
+        with self._process_events("uninstall"):
+            self.display.begin_all(self.__class__.__doc__)
+            self._check_root()
+            self._resource_usage = {}
+            self.context.queries = QueryCache()
+            self._collect_inputs("uninstall")
+            self._start_outputs()
+            self.prologue()
+
+            self._package_batch = self._new_package_batch(uninstall=True)
+            self._start_eta("uninstall")
+            self._start_sampler()
+            try:
+                self.context.current_step = 0
+                self.context.step_count = self._total_launched_steps() - 1
+                def uninstall() -> None:
+                    InstallSteps.uninstall(self)
+                    self._uninstall_packages()
+
+                self._enforcing_deadlines(uninstall)
+            finally:
+                self._package_batch = None
+                self._stop_eta()
+                self._stop_sampler()
+
+            self.display.step_end("done.")
+            self._display_resource_report()
+            self.epilogue()
+
+    def reinstall(self, pipelined: bool = False) -> None:
+        """Uninstalls, then installs.
+
+        Args:
+            pipelined: if set, each subtree (install step of the install process, or member of a parallel group of
+                the install process) is uninstalled then installed right away, independent subtrees being reinstalled
+                concurrently: a subtree depends on the subtrees before it, unless it declares its own ``depends_on``.
+                Packages are kept installed.
+        """
+        if not pipelined or self.config.only_show_names:
+            self.uninstall()
+            self.install()
+            return
+
+        with self._process_events("reinstall"):
+            self.display.begin_all(self.__class__.__doc__)
+            self._check_root()
+            self._resource_usage = {}
+            self.context.queries = QueryCache()
+            self._collect_inputs("uninstall", "install")
+            self._start_outputs()
+            self._package_batch = self._new_package_batch(uninstall=False)
+            self._start_prefetch()
+            self._start_sampler()
+            try:
+                self.prologue()
+
+                self.context.current_step = 0
+                self.context.step_count = 2 * (self._total_launched_steps() - 1)
+                # install conditions cannot be checked ahead of the uninstall: packages of all install steps to launch
+                # are installed at the first barrier
+                self._package_batch.admit(self._launched_steps())
+                self._enforcing_deadlines(self._reinstall_subtrees)
+            finally:
+                self._package_batch = None
+                self._stop_prefetch()
+                self._stop_sampler()
+
+            self.display.step_end("done.")
+            self._display_resource_report()
+            self.epilogue()
+
+    def _reinstall_subtrees(self) -> None:
+        """Reinstalls subtrees as soon as possible: a subtree is uninstalled once the subtrees depending on it are
+        uninstalled, and installed once the subtrees it depends on are installed.
+
+        Raises:
+            ValueError: if subtrees depend on each other in a cycle
+        """
+        subtrees: list[InstallStep] = []
+        dependencies: dict[int, list[InstallStep]] = {}
+        for step in self._launched():
+            members = step._launched() if isinstance(step, _ParallelInstallSteps) else [step]
+            for member in members:
+                # by default, subtrees keep the install process order (members of parallel groups being concurrent),
+                # even with the subtrees before them declaring their own dependencies
+                dependencies[id(member)] = list(subtrees)
+            subtrees.extend(members)
+        for subtree in subtrees:
+            if subtree.depends_on is not None:
+                dependencies[id(subtree)] = [other for other in subtrees
+                                             if other is not subtree and isinstance(other, tuple(subtree.depends_on))]
+        dependents: dict[int, list[InstallStep]] = {id(subtree): [] for subtree in subtrees}
+        for subtree in subtrees:
+            for dependency in dependencies[id(subtree)]:
+                dependents[id(dependency)].append(subtree)
+        self._check_dependency_cycles(subtrees, dependencies)
+
+        # install steps are numbered as if all subtrees were uninstalled, then installed
+        uninstall_offsets: dict[int, int] = {}
+        offset = self.context.current_step
+        for subtree in subtrees:
+            uninstall_offsets[id(subtree)] = offset
+            offset += self._total_steps(subtree)
+        install_offset = offset - self.context.current_step
+
+        uninstalled: set[int] = set()
+        installed: set[int] = set()
+        failures: list[BaseException] = []
+        self.context.index += 1
+        try:
+            with concurrent.futures.ThreadPoolExecutor() as executor:
+                running: dict[concurrent.futures.Future, tuple[InstallStep, str]] = {}
+
+                def submit_ready() -> None:
+                    for index, subtree in enumerate(subtrees):
+                        key = id(subtree)
+                        if any(step is subtree for step, _ in running.values()) or key in installed:
+                            continue
+                        if key not in uninstalled:
+                            if all(id(dependent) in uninstalled for dependent in dependents[key]):
+                                subtree.context = copy.copy(self.context)
+                                subtree.context.branch = self.context.branch + ((id(self), index),)
+                                subtree.context.current_step = uninstall_offsets[key] + 1
+                                subtree.display = DisplayStdout(io.StringIO(), context=subtree.context)
+                                running[executor.submit(subtree._process_uninstall)] = (subtree, "uninstall")
+                        elif all(id(dependency) in installed for dependency in dependencies[key]):
+                            subtree.context.current_step = uninstall_offsets[key] + install_offset + 1
+                            running[executor.submit(subtree._process_install)] = (subtree, "install")
+
+                submit_ready()
+                while running:
+                    done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        subtree, action = running.pop(future)
+                        error = future.exception()
+                        if error is not None:
+                            failures.append(error)
+                        elif action == "uninstall":
+                            uninstalled.add(id(subtree))
+                        else:
+                            installed.add(id(subtree))
+                        if action == "uninstall" and error is None and not failures:
+                            continue  # output is displayed once installed
+                        self.display.print(subtree.display.stdout.getvalue())
+                        subtree.display = subtree.context = None
+                    if not failures:
+                        submit_ready()
+        finally:
             self.context.index -= 1
-        else:
-            self.context.current_step = 0
-            self.context.step_count = self.total_steps() - 1
-            super().uninstall()
 
-        self.display.step_end("done.")
-        self.epilogue()
+        if failures:
+            raise failures[0]
+
+    @staticmethod
+    def _check_dependency_cycles(subtrees: list[InstallStep], dependencies: dict[int, list[InstallStep]]) -> None:
+        """Raises a ValueError if subtrees depend on each other in a cycle."""
+        resolved: set[int] = set()
+        remaining = list(subtrees)
+        while remaining:
+            ready = [subtree for subtree in remaining
+                     if all(id(dependency) in resolved for dependency in dependencies[id(subtree)])]
+            if not ready:
+                names = ", ".join(subtree.name() for subtree in remaining)
+                raise ValueError(f"Install steps depend on each other in a cycle: {names}")
+            resolved.update(id(subtree) for subtree in ready)
+            remaining = [subtree for subtree in remaining if id(subtree) not in resolved]
+
+    def _total_steps(self, step: InstallStep) -> int:
+        """Number of steps launched by ``step``, one of the subtrees of this install process."""
+        selection = self.context.selection
+        return step.total_steps() if selection is None else selection.total_steps(step)
 
     def prologue(self) -> None:
         """Any kind of operation to execute before install/uninstall
@@ -690,8 +1849,372 @@ class InstallProcess(InstallSteps):
     def name(self) -> str:
         return ""
 
+    def _add_steps(self, prologue: InstallStep | None = None, epilogue: InstallStep | None = None) -> None:
+        """Adds install steps before/after the install process steps."""
+        if prologue:
+            self._steps = [prologue._clone()] + self._steps
+        if epilogue:
+            self._steps = self._steps + [epilogue._clone()]
+        for step in self._steps:
+            step.father = self
+
+    @contextlib.contextmanager
+    def _process_events(self, action: str) -> Iterator[None]:
+        """Emits install process lifecycle events around install/uninstall (not when only showing step names)."""
+        hooks = self.config.hooks
+        if not hooks or self.config.only_show_names:
+            yield
+            return
+
+        hooks.emit("process_start", process=self, action=action)
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as error:
+            hooks.emit("process_end", process=self, action=action, duration=time.perf_counter() - start, error=error)
+            raise
+        hooks.emit("process_end", process=self, action=action, duration=time.perf_counter() - start, error=None)
+
+    @contextlib.contextmanager
+    def _rollback_on_failure(self) -> Iterator[None]:
+        """Rolls back the install steps completed during the install if it fails (if rollback is enabled)."""
+        # list.append is atomic: install steps run in parallel record their completion without lock
+        self._completed_steps = []
+        try:
+            yield
+        except Exception:
+            if self.config.rollback and self._completed_steps:
+                self._rollback()
+            raise
+        finally:
+            self._completed_steps = []
+
+    def _rollback(self) -> None:
+        """Uninstalls the install steps completed during the install, in reverse completion order.
+
+        Install steps completed by different members of a parallel group are uninstalled concurrently.
+        Uninstall conditions are not checked: completed install steps are known to be installed.
+        Failures are displayed, and do not stop the rollback.
+        """
+        completed = self._completed_steps[::-1]
+        self.display.begin_all(f"Rollback of {len(completed)} install step(s)")
+        self.context.current_step = 0
+        self.context.step_count = len(completed)
+        self.context.index = 1
+        self._package_batch = self._new_package_batch(uninstall=True, launched=[step for step, _ in completed])
+        try:
+            failures = self._rollback_steps(completed, 0, self.display, self.context)
+            try:
+                self._uninstall_packages()
+            except ValueError as error:
+                failures.append(error)
+        finally:
+            self._package_batch = None
+            self.context.index = 0
+
+        if failures:
+            self.display.error(f"Rollback incomplete: {len(failures)} failure(s)")
+        else:
+            self.display.step_end("rolled back.")
+
+    def _rollback_steps(self,
+                        completed: list[tuple[InstallStep, tuple[tuple[int, int], ...]]],
+                        depth: int,
+                        display: Display,
+                        context: Context) -> list[Exception]:
+        """Rolls back ``completed`` install steps (in reverse completion order), parallel group members of the
+        ``depth`` nesting level concurrently. Returns the rollback failures."""
+        failures: list[Exception] = []
+        start = 0
+        while start < len(completed):
+            step, branch = completed[start]
+            if len(branch) <= depth:
+                failures.extend(self._rollback_step(step, display, context))
+                start += 1
+                continue
+
+            # install steps completed by the same parallel group are contiguous: the group waits for all its members
+            group_id = branch[depth][0]
+            end = start
+            while end < len(completed) and len(completed[end][1]) > depth and completed[end][1][depth][0] == group_id:
+                end += 1
+            members: dict[int, list[tuple[InstallStep, tuple[tuple[int, int], ...]]]] = {}
+            for entry in completed[start:end]:
+                members.setdefault(entry[1][depth][1], []).append(entry)
+
+            with concurrent.futures.ThreadPoolExecutor() as executor:
+                future_displays: list[tuple[concurrent.futures.Future, DisplayStdout]] = []
+                for member_completed in members.values():
+                    member_context = copy.copy(context)
+                    member_display = DisplayStdout(io.StringIO(), context=member_context)
+                    future_displays.append((executor.submit(self._rollback_steps, member_completed, depth + 1,
+                                                            member_display, member_context), member_display))
+                    context.current_step += len(member_completed)
+                for future, member_display in future_displays:
+                    failures.extend(future.result())
+                    display.print(member_display.stdout.getvalue())
+            start = end
+        return failures
+
+    def _rollback_step(self, step: InstallStep, display: Display, context: Context) -> list[Exception]:
+        context.current_step += 1
+        step.display, step.context = display, context
+        try:
+            step.display.step_new(step.uninstall.__doc__)
+            try:
+                with step._hold_locks():
+                    step.uninstall()
+                    step._remove_manifest()
+                    step._require_packages(uninstall=True)
+            except Exception as error:
+                step.display.error(f"{step.name()} could not be rolled back: {error}")
+                return [error]
+            step.display.step_end("rolled back.")
+            return []
+        finally:
+            step.display = step.context = None
+
+    def resource_usage(self) -> dict[str, ResourceUsage]:
+        """Resources used by the shell commands of each install step during the last install/uninstall,
+        by install step name (empty if not supported on this platform)."""
+        with self._resource_lock:
+            return dict(self._resource_usage)
+
+    def _add_resource_usage(self, step: InstallStep, usage: ResourceUsage) -> None:
+        name = step.name() or step.__class__.__qualname__
+        with self._resource_lock:
+            self._resource_usage.setdefault(name, ResourceUsage()).add(usage)
+
+    def _display_resource_report(self) -> None:
+        if not self.config.resource_report or self.config.only_show_names:
+            return
+
+        self.display.print(f"{resources.format_report(self.resource_usage().items())}\n")
+
+    def _collect_inputs(self, *actions: str) -> None:
+        """Collects the values of the inputs declared by the install steps to launch and required by ``actions``,
+        before install/uninstall."""
+        if self.config.only_show_names:
+            return
+
+        inputs = [input_ for step in self._launched_steps() for input_ in step.inputs
+                  if set(actions).intersection(input_.actions)]
+        self.context.answers = collect_inputs(inputs, self.config, self.display) if inputs else {}
+
+    def _start_outputs(self) -> None:
+        """New output store, expecting the outputs of the install steps to launch."""
+        self.context.outputs = OutputStore(self.config.outputs)
+        branches = self._branches()
+        for step in self._launched_steps():
+            if step.outputs:
+                self.context.outputs.expect(id(step), step.outputs, branches.get(id(step), ()), step.name())
+
+    def _branches(self) -> dict[int, tuple[tuple[int, int], ...]]:
+        """Branch (see ``Context.branch``) each install step to launch runs in, by install step id."""
+        branches: dict[int, tuple[tuple[int, int], ...]] = {}
+
+        def visit(group: InstallSteps, branch: tuple[tuple[int, int], ...]) -> None:
+            parallel = isinstance(group, (_ParallelInstallSteps, MatrixInstallSteps))
+            for index, step in enumerate(group._launched()):
+                branches[id(step)] = branch + ((id(group), index),) if parallel else branch
+                if isinstance(step, InstallSteps):
+                    visit(step, branches[id(step)])
+
+        visit(self, self.context.branch)
+        return branches
+
+    def _launched_steps(self) -> list[InstallStep]:
+        """Install steps to launch (all steps, or the selected steps)."""
+        selection = self.context.selection
+        return [step for _, step in self._get_child() if selection is None or id(step) in selection.selected]
+
+    def _total_launched_steps(self) -> int:
+        selection = self.context.selection
+        return self.total_steps() if selection is None else selection.total_steps(self)
+
+    def _select(self, targets: list[str], from_step: str = "", until_step: str = "") -> StepSelection | None:
+        """Selects the install steps matching ``targets`` names/patterns, in the ``from_step``/``until_step`` range
+        (None if all install steps are selected)."""
+        if not targets and not from_step and not until_step:
+            return None
+
+        children = self._get_child()
+        names = [name for name, _ in children]
+        candidates: set[int] = set() if targets else {id(step) for _, step in children}
+        for target in targets:
+            matching = self._match(names, target)
+            if not matching:
+                raise ValueError(f"Test step {target} does not exist in {self.__class__.__qualname__}")
+            for name in matching:
+                candidates.update(id(step) for _, step in self._steps_dict[name]._get_child())
+
+        # install steps in the range, in install order (the last one with its install steps)
+        for bound in (from_step, until_step):
+            if bound and bound not in self._steps_dict:
+                raise ValueError(f"Test step {bound} does not exist in {self.__class__.__qualname__}")
+        start = names.index(from_step) if from_step else 0
+        end = len(children)
+        if until_step:
+            end = names.index(until_step) + len(self._steps_dict[until_step]._get_child())
+            if end <= start:
+                raise ValueError(f"Test step {until_step} is before {from_step} in {self.__class__.__qualname__}")
+        candidates.intersection_update(id(step) for _, step in children[start:end])
+
+        # groups of install steps are selected if all their install steps are selected
+        selected = {id(step) for _, step in children
+                    if all(id(child) in candidates for _, child in step._get_child())}
+        needed: set[int] = set()
+
+        def add_needed(step: InstallStep) -> bool:
+            is_needed = id(step) in selected
+            for child in step._steps if isinstance(step, InstallSteps) else []:
+                is_needed = add_needed(child) or is_needed
+            if is_needed:
+                needed.add(id(step))
+            return is_needed
+
+        add_needed(self)
+        return StepSelection(selected, needed)
+
+    @staticmethod
+    def _match(names: list[str], pattern: str) -> list[str]:
+        """Install step names matching ``pattern``: an exact name, a glob pattern, or a regular expression prefixed
+        with ``re:``."""
+        if pattern.startswith("re:"):
+            regex = re.compile(pattern[len("re:"):])
+            return [name for name in names if regex.fullmatch(name)]
+        if pattern in names:
+            return [pattern]
+        return [name for name in names if fnmatch.fnmatchcase(name, pattern)]
+
+    def _start_prefetch(self) -> None:
+        """Starts fetching resources declared by the install steps to launch, in background."""
+        if self.config.only_show_names:
+            return
+
+        resources = [resource for step in self._launched_steps() for resource in step.prefetch]
+        if resources:
+            self._prefetcher = Prefetcher(self.prefetch_workers, self.prefetch_bandwidth)
+            self._prefetcher.start(resources)
+
+    def _stop_prefetch(self) -> None:
+        if self._prefetcher is not None:
+            self._prefetcher.shutdown()
+            self._prefetcher = None
+
+    def _start_eta(self, action: str) -> None:
+        """Starts estimating the remaining time of the install/uninstall, using install steps timing history."""
+        if self.timing_history is None or self.config.only_show_names:
+            return
+
+        leaf_steps = [step for step in self._launched_steps() if not isinstance(step, InstallSteps)]
+        self.context.eta = ProgressEstimator(TimingHistory(self.timing_history), leaf_steps, action)
+
+    def _stop_eta(self) -> None:
+        """Records durations of the install steps which were run in the timing history."""
+        if self.context.eta is not None:
+            self.context.eta.save()
+            self.context.eta = None
+
+    def _start_sampler(self) -> None:
+        """Starts sampling the stacks of the running install steps, if profiling or hang detection is enabled."""
+        if (self.config.profile is None and self.config.hang_timeout is None) or self.config.only_show_names:
+            return
+
+        self.context.sampler = StackSampler(hang_timeout=self.config.hang_timeout, on_hang=self._warn_hanging)
+        self.context.sampler.start()
+
+    def _warn_hanging(self, step: InstallStep, report: str) -> None:
+        # displayed by the install process: output of parallel install steps is only displayed once they are done
+        first_line, *other_lines = report.splitlines()
+        self.display.warn(first_line)
+        for line in other_lines:
+            self.display.msg(line)
+
+    def _stop_sampler(self) -> None:
+        """Stops sampling, and writes the collapsed stack file (if profiling is enabled)."""
+        if self.context.sampler is not None:
+            self.context.sampler.stop()
+            if self.config.profile is not None:
+                self.context.sampler.write(self.config.profile)
+            self.context.sampler = None
+
+    def _enforcing_deadlines(self, run: Callable[[], None]) -> None:
+        """Runs ``run``, terminating the install steps exceeding their deadline, and the install process if it exceeds
+        its own (if any: ``run`` is then abandoned if it does not end in time, see ``install_process.deadlines``)."""
+        if ((self.config.deadline is None and not any(step.deadline is not None for step in self._launched_steps()))
+                or self.config.only_show_names):
+            run()
+            return
+
+        watchdog = Watchdog()
+        watchdog.start()
+        self.context.watchdog = watchdog
+        exceeded = DeadlineExceeded(f"{self.__class__.__qualname__} did not end within its deadline of "
+                                    f"{self.config.deadline}s")
+
+        def watched() -> None:
+            deadline = watchdog.watch(id(self), self.config.deadline, leaf=False)
+            try:
+                run()
+            except BaseException:
+                if deadline.expired:
+                    raise exceeded from None
+                raise
+            finally:
+                watchdog.unwatch(deadline)
+
+        try:
+            if self.config.deadline is None:
+                watched()
+            elif not run_bounded(watched, self.config.deadline, self.__class__.__qualname__):
+                raise exceeded
+        finally:
+            watchdog.stop()
+            self.context.watchdog = None
+
+    def _new_package_batch(self, uninstall: bool, launched: list[InstallStep] | None = None) -> PackageBatch:
+        """Package batch for packages declared by the ``launched`` install steps (default: the install steps
+        to launch)."""
+        steps = [step for _, step in self._get_child()]
+        launched = self._launched_steps() if launched is None else launched
+
+        # packages of install steps which are not launched must not be uninstalled
+        launched_ids = {id(step) for step in launched}
+        kept_packages: dict[str, set[str]] = {}
+        for step in steps:
+            if id(step) not in launched_ids:
+                for manager_name, packages in step.packages.items():
+                    kept_packages.setdefault(manager_name, set()).update(packages)
+
+        # when checking conditions, packages of install steps are installed once they are known to run
+        # (see ``_admit_packages``)
+        return PackageBatch(self.package_managers,
+                            {step: step.packages for step in launched if step.packages},
+                            uninstall,
+                            kept_packages,
+                            admitted=() if self.check_package_conditions and not uninstall else None)
+
+    def _admit_packages(self) -> None:
+        """Admits the install steps to launch whose install condition is met (as well as the install conditions of
+        their groups) to the package batch, so that their packages are installed at once at the first barrier.
+
+        Notes:
+            Exceptions raised by install conditions are propagated: the install fails before any install step starts.
+        """
+        self._package_batch.admit(self._runnable_package_steps())
+
+    def _uninstall_packages(self) -> None:
+        """Uninstall all packages declared by uninstalled steps, at once."""
+        failed_steps = self._package_batch.flush(self.shell)
+        for step in failed_steps:
+            for manager_name, error in self._package_batch.failures(step):
+                self.display.error(f"Packages of {step.name()} could not be uninstalled using {manager_name}: {error}")
+        if failed_steps:
+            raise ValueError(f"Packages of {len(failed_steps)} install step(s) could not be uninstalled")
+
     def _check_root(self) -> None:
-        if not Config.root_required:
+        if not self.config.root_required:
             return
 
         if not "root" == getpass.getuser() or not ctypes.windll.shell32.IsUserAnAdmin():
@@ -725,27 +2248,141 @@ def setup_install(your_install_process: type[InstallProcess],
                              help="If set, only shows install step names, but doesn't install or uninstall anything",
                              default=False, action="store_true", required=False)
     args_parser.add_argument('-t', '--step_to_launch',
-                             help="Name of the InstallStep (or InstallSteps) to launch. "
+                             help="Names of the InstallStep (or InstallSteps) to launch: exact names, glob patterns "
+                                  "(Database.*) or regular expressions prefixed with 're:'. "
                                   "If not set, all steps are launched",
+                             nargs='+', action='extend', default=[], required=False)
+    args_parser.add_argument('--from', dest='from_step',
+                             help="Name of the first InstallStep (or InstallSteps) to launch",
+                             default='', required=False)
+    args_parser.add_argument('--until', dest='until_step',
+                             help="Name of the last InstallStep (or InstallSteps) to launch",
+                             default='', required=False)
+    args_parser.add_argument('-l', '--log_dir',
+                             help="If set, shell commands outputs of the install steps opting in (log_shell) are "
+                                  "written to a log file per install step, in this directory",
+                             default=None, required=False)
+    args_parser.add_argument('-r', '--resource_report',
+                             help="If set, display the resources (CPU, memory, I/O) used by each install step",
+                             default=False, action="store_true", required=False)
+    args_parser.add_argument('--profile',
+                             help="Path of a collapsed stack (flame graph) file. If set, stacks of the running "
+                                  "install steps are sampled, and written to this file",
+                             default=None, required=False)
+    args_parser.add_argument('--hang_timeout',
+                             help="If set, warn when an install step makes no progress for this many seconds",
+                             type=float, default=None, required=False)
+    args_parser.add_argument('--deadline',
+                             help="If set, maximum duration (in seconds) of install/uninstall: install steps still "
+                                  "running are then terminated",
+                             default=None, type=float, required=False)
+    args_parser.add_argument('--on_deadline',
+                             help="What to do when an install step exceeds its deadline: fail, or continue with the "
+                                  "next install steps (default: fail)",
+                             default=None, choices=POLICIES, required=False)
+    args_parser.add_argument('--pipelined',
+                             help="If set, reinstall uninstalls then installs each install step right away, "
+                                  "independent install steps being reinstalled concurrently",
+                             default=False, action="store_true", required=False)
+    args_parser.add_argument('--rollback',
+                             help="If set and install fails, uninstall the install steps completed during this install",
+                             default=False, action="store_true", required=False)
+    args_parser.add_argument('--answers',
+                             help="JSON file providing the values of the inputs declared by install steps, "
+                                  "by input name",
+                             default=None, required=False)
+    args_parser.add_argument('--no_input',
+                             help="If set, never ask inputs: inputs not provided by the answers file or environment "
+                                  "variables take their default value",
+                             default=False, action="store_true", required=False)
+    args_parser.add_argument('--outputs',
+                             help="JSON file the outputs published by install steps are persisted to, "
+                                  "and reused from by later runs",
+                             default=None, required=False)
+    args_parser.add_argument('--manifest_dir',
+                             help="If set, install steps declaring manifest_roots record the files they create to a "
+                                  "manifest in this directory, and uninstall deletes exactly them",
+                             default=None, required=False)
+    args_parser.add_argument('--record',
+                             help="If set, shell commands return codes, outputs and durations are recorded to this "
+                                  "file, to be replayed with --replay",
+                             default='', required=False)
+    args_parser.add_argument('--replay',
+                             help="If set, shell commands are not run: their recordings are replayed from this file "
+                                  "(unrecorded shell commands fail)",
+                             default='', required=False)
+    args_parser.add_argument('--replay_time_scale',
+                             help="Replayed shell commands take their recorded duration multiplied by this factor "
+                                  "(default: 0, instant)",
+                             default=0.0, type=float, required=False)
+    args_parser.add_argument('--watch',
+                             help="If set, keeps running, and re-runs the install steps affected by changes of the "
+                                  "files they consume (see install_process.watch)",
+                             default=False, action="store_true", required=False)
+    args_parser.add_argument('--daemon',
+                             help="Path of a Unix socket. If set, keeps the install process loaded, and serves "
+                                  "install requests on this socket (see install_process.daemon)",
                              default='', required=False)
     args = args_parser.parse_args()
 
+    if args.daemon and (args.step_to_launch or args.from_step or args.until_step or args.pipelined or args.watch):
+        args_parser.error("install steps to launch are chosen by the requests sent to the daemon: "
+                          "--daemon cannot be used with -t, --from, --until, --pipelined or --watch")
+
+    config = Config()
     if args.verbose:
-        Config.verbose = True
+        config.verbose = True
     if args.only_show_names:
-        Config.only_show_names = True
-
-    install = your_install_process(args.step_to_launch)
-
-    if prologue:
-        install._steps = [prologue] + install._steps
-    if epilogue:
-        install._steps = install._steps + [epilogue]
+        config.only_show_names = True
+    if args.log_dir:
+        config.log_dir = args.log_dir
+    if args.resource_report:
+        config.resource_report = True
+    if args.profile:
+        config.profile = args.profile
+    if args.hang_timeout is not None:
+        config.hang_timeout = args.hang_timeout
+    if args.deadline is not None:
+        config.deadline = args.deadline
+    if args.on_deadline:
+        config.deadline_policy = args.on_deadline
+    if args.rollback:
+        config.rollback = True
+    if args.answers:
+        config.answers = args.answers
+    if args.no_input:
+        config.interactive = False
+    if args.outputs:
+        config.outputs = args.outputs
+    if args.manifest_dir:
+        config.manifest_dir = args.manifest_dir
+    if args.record and args.replay:
+        args_parser.error("--record and --replay are mutually exclusive")
+    if args.record:
+        config.shell_backend = RecordingShell(args.record)
+    if args.replay:
+        config.shell_backend = ReplayShell(args.replay, args.replay_time_scale)
+
+    if args.daemon:
+        from install_process.daemon import InstallDaemon  # the daemon module depends on this module
+
+        InstallDaemon(your_install_process, args.daemon, prologue, epilogue, config).serve_forever()
+        return
+
+    if args.watch:
+        from install_process.watch import InstallWatcher  # the watch module depends on this module
+
+        InstallWatcher(your_install_process, config, prologue, epilogue, args.install_type).watch(
+            args.step_to_launch, args.from_step, args.until_step)
+        return
+
+    install = your_install_process(args.step_to_launch, config=config,
+                                   from_step=args.from_step, until_step=args.until_step)
+    install._add_steps(prologue, epilogue)
 
     if args.install_type == "install":
         install.install()
     elif args.install_type == "uninstall":
         install.uninstall()
     else:
-        install.uninstall()
-        install.install()
+        install.reinstall(pipelined=args.pipelined)
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import contextlib
+import os
+import pathlib
+import re
+import tempfile
+import time
+from typing import Callable, Iterable, Iterator
+
+from install_process.deadlines import critical
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+SUPPORTED = fcntl is not None
+"""Whether host locks are available on this platform."""
+
+LOCK_DIR = pathlib.Path(os.environ.get("INSTALL_PROCESS_LOCK_DIR", tempfile.gettempdir())) / "install_process-locks"
+"""Directory of the lock files, shared by all install processes of the host."""
+
+
+class HostLock:
+    """A named lock, shared by all install processes of the host (package manager, shared directory, etc.).
+
+    Install steps declaring the same lock do not run at the same time, whichever install process runs them
+    (install steps declaring a shared lock may run at the same time).
+
+    Examples:
+
+        >>> APT = HostLock("apt")
+        ...
+        ... class InstallCompilers(InstallStep):
+        ...     locks = [APT]
+        ...     def install(self) -> None:
+        ...         '''Install compilers'''
+        ...         self.shell("apt-get install -y gcc")
+    """
+
+    def __init__(self, name: str, shared: bool = False, timeout: float | None = None) -> None:
+        """
+        Args:
+            name: lock name
+            shared: if set, the lock may be held by several install steps at once (but never with an exclusive one)
+            timeout: if set, maximum time (in seconds) to wait for the lock
+        """
+        self.name = name
+        self.shared = shared
+        self.timeout = timeout
+
+    @property
+    def path(self) -> pathlib.Path:
+        """Lock file."""
+        return LOCK_DIR / (re.sub(r"[^\w.-]", "_", self.name) + ".lock")
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}({self.name!r}{', shared=True' if self.shared else ''})"
+
+
+@contextlib.contextmanager
+def hold(locks: Iterable[HostLock], on_wait: Callable[[HostLock], None] | None = None) -> Iterator[None]:
+    """Holds ``locks``, acquired in name order (so that install steps never wait for each other in a cycle).
+
+    Args:
+        locks: locks to hold (exclusive if a lock name is both shared & exclusive)
+        on_wait: called with each lock which is not available right away, before waiting for it
+
+    Raises:
+        ValueError: if a lock could not be acquired before its timeout
+    """
+    by_name: dict[str, HostLock] = {}
+    for lock in locks:
+        if lock.name not in by_name or by_name[lock.name].shared:
+            by_name[lock.name] = lock
+
+    fds: list[int] = []
+    try:
+        for name in sorted(by_name):
+            _acquire(by_name[name], on_wait, fds)
+        yield
+    finally:
+        # lock files are released even if an install step deadline expires meanwhile
+        with critical():
+            for fd in reversed(fds):
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+
+
+def _acquire(lock: HostLock, on_wait: Callable[[HostLock], None] | None, fds: list[int]) -> None:
+    """Acquires ``lock``, adding the file descriptor of its lock file to ``fds`` as soon as it is opened (to be
+    closed by the caller, even if ``lock`` could not be acquired)."""
+    if not SUPPORTED:
+        raise ValueError(f"Host lock {lock.name} requires fcntl, which is not available on this platform")
+
+    LOCK_DIR.mkdir(parents=True, exist_ok=True)
+    with critical():
+        fds.append(os.open(lock.path, os.O_RDWR | os.O_CREAT, 0o666))
+    fd = fds[-1]
+    operation = fcntl.LOCK_SH if lock.shared else fcntl.LOCK_EX
+    deadline = None if lock.timeout is None else time.monotonic() + lock.timeout
+    delay = 0.01
+    while True:
+        try:
+            fcntl.flock(fd, operation | fcntl.LOCK_NB)
+            return
+        except BlockingIOError:
+            pass
+        if on_wait is not None:
+            on_wait(lock)
+            on_wait = None  # only once
+        if deadline is not None and time.monotonic() >= deadline:
+            raise ValueError(f"Host lock {lock.name} could not be acquired within {lock.timeout}s "
+                             f"(lock file: {lock.path})")
+        remaining = None if deadline is None else deadline - time.monotonic()
+        time.sleep(delay if remaining is None else max(min(delay, remaining), 0))
+        delay = min(delay * 2, 0.5)
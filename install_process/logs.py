@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import os
+import pathlib
+import subprocess
+import time
+from typing import Callable, Union
+
+from install_process import resources
+from install_process.resources import ResourceUsage
+
+
+PathLike = Union[str, os.PathLike]
+
+TAIL_INTERVAL = 1.0
+"""Interval (in seconds) between two looks at the end of a log file, while its shell command runs."""
+
+TAIL_BYTES = 4096
+"""Maximum number of bytes read at the end of a log file to get its tail."""
+
+
+def tail(path: PathLike, lines: int = 1) -> str:
+    """Last ``lines`` lines of a (possibly huge) log file: only its end is read."""
+    try:
+        with open(path, "rb") as log_file:
+            size = log_file.seek(0, os.SEEK_END)
+            log_file.seek(max(size - TAIL_BYTES, 0))
+            end = log_file.read(TAIL_BYTES)
+    except FileNotFoundError:
+        return ""
+    return "\n".join(end.decode(errors="replace").strip().splitlines()[-lines:])
+
+
+def run_logged(cmd: str,
+               log_path: PathLike,
+               timeout: float | None = None,
+               on_tail: Callable[[str], None] | None = None,
+               on_start: Callable[[subprocess.Popen], None] | None = None) -> tuple[int, ResourceUsage | None]:
+    """Runs a shell command, its output (stdout & stderr) being appended to a log file.
+
+    The shell command writes directly into the log file (at the file descriptor level): its output is never copied
+    into Python, so that huge outputs cost no CPU nor memory.
+
+    Args:
+        cmd: shell cmd to execute
+        log_path: path of the log file (created, along with its parent directories, if it does not exist)
+        timeout: raises a ``subprocess.TimeoutExpired`` if shell cmd still runs after [timeout] seconds
+        on_tail: called with the last line of the log file, each time it changes while the shell cmd runs
+        on_start: called with the shell cmd process, once started
+
+    Returns:
+        shell cmd return code, and resource usage (None if not supported on this platform)
+    """
+    log_path = pathlib.Path(log_path)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_path, "ab") as log_file:
+        log_file.write(f"$> {cmd}\n".encode())
+        log_file.flush()
+        process = subprocess.Popen(cmd, shell=True, stdout=log_file, stderr=subprocess.STDOUT)
+    if on_start is not None:
+        on_start(process)
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    last_line = ""
+    try:
+        while True:
+            wait = TAIL_INTERVAL if deadline is None else max(min(TAIL_INTERVAL, deadline - time.monotonic()), 0)
+            try:
+                usage = resources.wait(process, timeout=wait)
+                return process.returncode, usage
+            except subprocess.TimeoutExpired:
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise subprocess.TimeoutExpired(cmd, timeout) from None
+            if on_tail is not None:
+                line = tail(log_path)
+                if line and line != last_line:
+                    last_line = line
+                    on_tail(line)
+    finally:
+        if process.returncode is None:
+            process.kill()
+            resources.wait(process)
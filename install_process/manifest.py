@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import concurrent.futures
+import contextlib
+import errno
+import os
+import pathlib
+import threading
+from typing import Iterable, Iterator, Union
+
+from install_process.deadlines import critical
+
+
+PathLike = Union[str, os.PathLike]
+
+_CHUNK = 256
+"""Number of entries deleted per task."""
+
+_held_roots: list[tuple[str, int]] = []
+"""Roots being recorded, with the key of the install step recording them."""
+
+_held_roots_condition = threading.Condition()
+
+
+def snapshot(roots: Iterable[PathLike]) -> set[str]:
+    """Files & directories in ``roots`` (with the roots themselves), directories ending with a separator.
+
+    Symbolic links are recorded as files: they are never followed.
+    """
+    entries: set[str] = set()
+    directories = []
+    for root in roots:
+        root = os.path.abspath(root)
+        if os.path.isdir(root) and not os.path.islink(root):
+            entries.add(root + os.sep)
+            directories.append(root)
+        elif os.path.lexists(root):
+            entries.add(root)
+
+    while directories:
+        try:
+            scanner = os.scandir(directories.pop())
+        except (FileNotFoundError, NotADirectoryError):
+            continue  # removed since
+        with scanner:
+            for entry in scanner:
+                if entry.is_dir(follow_symlinks=False):
+                    entries.add(entry.path + os.sep)
+                    directories.append(entry.path)
+                else:
+                    entries.add(entry.path)
+    return entries
+
+
+@contextlib.contextmanager
+def hold_roots(roots: Iterable[PathLike], owner: int, ancestors: Iterable[int] = ()) -> Iterator[None]:
+    """Holds ``roots`` while the files & directories created in them are recorded: install steps recording
+    overlapping roots (a root, or a directory inside it) run one at a time, so that each install step only records
+    what it created (and not what install steps running in parallel created).
+
+    Args:
+        roots: roots recorded by the install step
+        owner: install step key
+        ancestors: keys of the groups of install steps the install step belongs to: it does not wait for them
+    """
+    roots = [os.path.abspath(root) for root in roots]
+    ancestors = set(ancestors)
+    held = False
+    try:
+        with _held_roots_condition:
+            while any(_overlap(root, held_root) for root in roots for held_root, held_owner in _held_roots
+                      if held_owner not in ancestors):
+                _held_roots_condition.wait()
+            # roots are released even if an install step deadline expires meanwhile
+            with critical():
+                _held_roots.extend((root, owner) for root in roots)
+                held = True
+        yield
+    finally:
+        if held:
+            with critical(), _held_roots_condition:
+                for root in roots:
+                    _held_roots.remove((root, owner))
+                _held_roots_condition.notify_all()
+
+
+def _overlap(root: str, other: str) -> bool:
+    return root == other or root.startswith(other + os.sep) or other.startswith(root + os.sep)
+
+
+class Manifest:
+    """Files & directories created by an install step, one per line (directories ending with a separator).
+
+    Uninstall deletes exactly these entries, without scanning any directory tree: its cost is bounded by the number
+    of installed files, not by the size of the directories they are in. Directories are only deleted once empty, so
+    that files created by others are left in place.
+    """
+
+    def __init__(self, path: PathLike) -> None:
+        """
+        Args:
+            path: manifest file
+        """
+        self.path = pathlib.Path(path)
+
+    def entries(self) -> list[str]:
+        """Recorded files & directories (empty if nothing was recorded)."""
+        try:
+            return self.path.read_text(encoding="utf-8").splitlines()
+        except FileNotFoundError:
+            return []
+
+    def record(self, created: Iterable[str]) -> None:
+        """Records ``created`` files & directories (with the still existing ones of a previous install)."""
+        entries = {entry for entry in self.entries() if os.path.lexists(entry)}
+        entries.update(created)
+        # written atomically: a failing install never leaves a truncated manifest
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        tmp_path.write_text("".join(f"{entry}\n" for entry in sorted(entries)), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def remove(self, workers: int | None = None) -> int:
+        """Deletes the recorded files (in parallel), then the recorded directories (deepest first), then the manifest.
+
+        Args:
+            workers: maximum number of deletion threads
+
+        Returns:
+            number of deleted files & directories
+        """
+        files: list[str] = []
+        directories_by_depth: dict[int, list[str]] = {}
+        for entry in self.entries():
+            if entry.endswith(os.sep):
+                directories_by_depth.setdefault(entry.count(os.sep), []).append(entry)
+            else:
+                files.append(entry)
+
+        with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+            removed = sum(executor.map(_unlink, _chunks(files)))
+            # directories of a level are emptied by deleting the deeper ones first
+            for depth in sorted(directories_by_depth, reverse=True):
+                removed += sum(executor.map(_rmdir, _chunks(directories_by_depth[depth])))
+
+        self.path.unlink(missing_ok=True)
+        return removed
+
+
+def _chunks(entries: list[str]) -> list[list[str]]:
+    return [entries[start:start + _CHUNK] for start in range(0, len(entries), _CHUNK)]
+
+
+def _unlink(paths: list[str]) -> int:
+    removed = 0
+    for path in paths:
+        try:
+            os.unlink(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def _rmdir(paths: list[str]) -> int:
+    removed = 0
+    for path in paths:
+        try:
+            os.rmdir(path)
+            removed += 1
+        except OSError as error:
+            if error.errno not in (errno.ENOENT, errno.ENOTEMPTY, errno.EEXIST):
+                raise
+    return removed
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import collections
+import json
+import os
+import pathlib
+import threading
+import time
+from typing import Any, Hashable, Iterable, Union
+
+
+PathLike = Union[str, os.PathLike]
+
+
+class Output:
+    """A named, typed value published by an install step (detected version, generated path, probed port, etc.),
+    read by later install steps.
+
+    Examples:
+
+        >>> PYTHON_VERSION = Output("python_version", str)
+        ...
+        ... class DetectPython(InstallStep):
+        ...     outputs = [PYTHON_VERSION]
+        ...     def install(self) -> None:
+        ...         '''Detect Python'''
+        ...         self.publish(PYTHON_VERSION, self.shell("python3 --version").split()[1])
+        ...
+        ... class InstallWheels(InstallStep):
+        ...     def install(self) -> None:
+        ...         '''Install wheels'''
+        ...         self.shell(f"pip download --python-version {self.output(PYTHON_VERSION)} ...")
+    """
+
+    def __init__(self, name: str, type_: type = str) -> None:
+        """
+        Args:
+            name: output name
+            type_: type of the output value (JSON types if the output store is persisted: str, int, float, bool,
+                list, dict)
+        """
+        self.name = name
+        self.type = type_
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}({self.name!r}, {self.type.__qualname__})"
+
+
+class OutputStore:
+    """Values published by the install steps of an install process run, shared by install steps running in parallel.
+
+    Reading an output waits until it is published, as long as an install step declaring it may still publish it while
+    running in parallel with the reader.
+    If persisted, values are written to a JSON file as soon as they are published, and values published by previous
+    runs are used when no install step of this run publishes them (``-t`` reruns).
+    """
+
+    def __init__(self, path: PathLike | None = None) -> None:
+        """
+        Args:
+            path: if set, JSON file the values are persisted to
+        """
+        self.path = None if path is None else pathlib.Path(path)
+        self._values: dict[str, Any] = {}
+        self._persisted: dict[str, Any] = self._load() if self.path is not None else {}
+        self._publishers: dict[Hashable, list[str]] = {}
+        self._branches: dict[Hashable, tuple[str, tuple[tuple[int, int], ...]]] = {}
+        self._pending: collections.Counter[str] = collections.Counter()
+        self._condition = threading.Condition()
+        self.readers: dict[str, set[str]] = {}
+        """Names of the install steps which read an output, by output name."""
+
+    def expect(self,
+               publisher: Hashable,
+               outputs: Iterable[Output],
+               branch: tuple[tuple[int, int], ...] = (),
+               name: str = "") -> None:
+        """``publisher`` (an install step of this run) may publish ``outputs``: reading them waits until they are
+        published, or until ``publisher`` is done.
+
+        Args:
+            publisher: install step key
+            outputs: outputs the install step may publish
+            branch: branch the install step runs in (see ``Context.branch``)
+            name: install step name
+        """
+        names = [output.name for output in outputs]
+        if not names:
+            return
+        with self._condition:
+            self._publishers[publisher] = names
+            self._branches[publisher] = (name or str(publisher), branch)
+            self._pending.update(names)
+
+    def done(self, publisher: Hashable) -> None:
+        """``publisher`` ended (or was skipped): it will not publish its outputs anymore."""
+        with self._condition:
+            names = self._publishers.pop(publisher, None)
+            if names is None:
+                return
+            del self._branches[publisher]
+            self._pending.subtract(names)
+            self._condition.notify_all()
+
+    @property
+    def pending(self) -> bool:
+        """Whether install steps may still publish outputs."""
+        return bool(self._publishers)
+
+    def publish(self, output: Output, value: Any) -> None:
+        if not isinstance(value, output.type):
+            raise ValueError(f"Output {output.name} must be a {output.type.__qualname__}, "
+                             f"not a {type(value).__qualname__}")
+        with self._condition:
+            self._values[output.name] = value
+            if self.path is not None:
+                self._persisted[output.name] = value
+                self._save()
+            self._condition.notify_all()
+
+    def get(self,
+            output: Output,
+            timeout: float | None = None,
+            reader: str = "",
+            branch: tuple[tuple[int, int], ...] | None = None) -> Any:
+        """Value of ``output``, waiting until it is published if an install step may still publish it.
+
+        Args:
+            output: output to read
+            timeout: maximum waiting time, in seconds
+            reader: name of the install step reading the output, if any
+            branch: branch the reader runs in (see ``Context.branch``): if set, the reader only waits for install
+                steps which may run in parallel with it
+
+        Raises:
+            ValueError: if the output was not published (or after ``timeout`` seconds), or if the install steps which
+                may still publish it run after the reader
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            if reader:
+                self.readers.setdefault(output.name, set()).add(reader)
+            if branch is not None and output.name not in self._values and self._pending[output.name] > 0:
+                publishers = [self._branches[publisher] for publisher, names in self._publishers.items()
+                              if output.name in names]
+                if not any(_parallel(branch, publisher_branch) for _, publisher_branch in publishers):
+                    # waiting would never end: the publishers run once the reader is done
+                    raise ValueError(f"Output {output.name} is read by {reader or 'an install step'} before being "
+                                     f"published by {', '.join(name for name, _ in publishers)}, which runs after it")
+            while output.name not in self._values and self._pending[output.name] > 0:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise ValueError(f"Output {output.name} was not published within {timeout}s")
+                self._condition.wait(remaining)
+
+            if output.name in self._values:
+                return self._values[output.name]
+            value = self._persisted.get(output.name)
+            if value is not None and isinstance(value, output.type):
+                return value
+        raise ValueError(f"Output {output.name} was not published")
+
+    def _load(self) -> dict[str, Any]:
+        try:
+            with open(self.path, encoding="utf-8") as outputs_file:
+                values = json.load(outputs_file)
+        except FileNotFoundError:
+            return {}
+        return values if isinstance(values, dict) else {}
+
+    def _save(self) -> None:
+        # written atomically: a failing run never leaves a truncated file
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        tmp_path.write_text(json.dumps(self._persisted, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+
+def _parallel(branch: tuple[tuple[int, int], ...], other: tuple[tuple[int, int], ...]) -> bool:
+    """Whether install steps running in ``branch`` & ``other`` branches (see ``Context.branch``) may run in
+    parallel: they run in different members of the same parallel group."""
+    for (group, member), (other_group, other_member) in zip(branch, other):
+        if group != other_group:
+            return False
+        if member != other_member:
+            return True
+    return False
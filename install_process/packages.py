@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import abc
+import shlex
+import sys
+import threading
+from typing import Callable, Hashable, Iterable
+
+
+Shell = Callable[[str], str]
+
+
+class PackageManager(abc.ABC):
+    """Defines how packages are installed/uninstalled, many packages at once."""
+
+    @abc.abstractmethod
+    def install(self, packages: list[str], shell: Shell) -> None:
+        """Install all ``packages`` in a single invocation (raises an Exception on failure)."""
+
+    @abc.abstractmethod
+    def uninstall(self, packages: list[str], shell: Shell) -> None:
+        """Uninstall all ``packages`` in a single invocation (raises an Exception on failure)."""
+
+
+class PipPackageManager(PackageManager):
+    """Python packages, installed with pip."""
+
+    def __init__(self, pip: str = f"{shlex.quote(sys.executable)} -m pip") -> None:
+        self.pip = pip
+
+    def install(self, packages: list[str], shell: Shell) -> None:
+        shell(f"{self.pip} install {shlex.join(packages)}")
+
+    def uninstall(self, packages: list[str], shell: Shell) -> None:
+        shell(f"{self.pip} uninstall -y {shlex.join(packages)}")
+
+
+class AptPackageManager(PackageManager):
+    """Debian packages, installed with apt-get."""
+
+    def install(self, packages: list[str], shell: Shell) -> None:
+        shell(f"DEBIAN_FRONTEND=noninteractive apt-get install -y {shlex.join(packages)}")
+
+    def uninstall(self, packages: list[str], shell: Shell) -> None:
+        shell(f"DEBIAN_FRONTEND=noninteractive apt-get remove -y {shlex.join(packages)}")
+
+
+class FakePackageManager(PackageManager):
+    """Package manager which does not install anything, and records its invocations (useful for tests)."""
+
+    def __init__(self, failing: Iterable[str] = ()) -> None:
+        self.failing = set(failing)
+        """Packages failing to install/uninstall."""
+
+        self.installed: set[str] = set()
+        """Packages currently installed."""
+
+        self.invocations: list[tuple[str, list[str]]] = []
+        """(``"install"`` or ``"uninstall"``, packages) for each invocation."""
+
+    def install(self, packages: list[str], shell: Shell) -> None:
+        self.invocations.append(("install", list(packages)))
+        self._check(packages)
+        self.installed.update(packages)
+
+    def uninstall(self, packages: list[str], shell: Shell) -> None:
+        self.invocations.append(("uninstall", list(packages)))
+        self._check(packages)
+        self.installed.difference_update(packages)
+
+    def _check(self, packages: list[str]) -> None:
+        failing = sorted(self.failing.intersection(packages))
+        if failing:
+            raise ValueError(f"Failed to install/uninstall {', '.join(failing)}")
+
+
+def default_package_managers() -> dict[str, PackageManager]:
+    """Package managers available to install steps, by name."""
+    return {
+        "pip": PipPackageManager(),
+        "apt": AptPackageManager(),
+    }
+
+
+class PackageBatch:
+    """Coalesces the packages declared by install steps, so that each package manager is only invoked once.
+
+    Packages are installed at a barrier: the first time an install step requires packages from a package manager,
+    all packages declared for this package manager by the admitted install steps of the batch (the install steps known
+    to run, see ``admit``) are installed at once.
+    Packages are uninstalled when the batch is flushed, at the end of the uninstall: only packages of install steps
+    which required it (i.e. which were actually uninstalled) are uninstalled.
+
+    If a package manager invocation fails, packages are installed/uninstalled again step by step, to find out which
+    install steps failed.
+    """
+
+    def __init__(self,
+                 managers: dict[str, PackageManager],
+                 steps: dict[Hashable, dict[str, list[str]]],
+                 uninstall: bool = False,
+                 kept_packages: dict[str, set[str]] | None = None,
+                 admitted: Iterable[Hashable] | None = None) -> None:
+        """
+        Args:
+            managers: package managers, by name
+            steps: packages declared by each install step (a step key), by package manager name
+            uninstall: if True, packages are uninstalled rather than installed
+            kept_packages: packages which must not be uninstalled (used by steps outside the batch),
+                           by package manager name
+            admitted: install steps whose packages are installed at barriers (all install steps if None), other
+                      install steps being admitted later (see ``admit``)
+        """
+        unknown = {name for packages in steps.values() for name in packages}.difference(managers)
+        if unknown:
+            raise ValueError(f"Unknown package manager(s): {', '.join(sorted(unknown))}")
+
+        self.managers = managers
+        self.uninstall = uninstall
+        self._kept_packages = kept_packages or {}
+        self._pending: dict[str, dict[Hashable, list[str]]] = {name: {} for name in managers}
+        for step, packages in steps.items():
+            for name, step_packages in packages.items():
+                if step_packages:
+                    self._pending[name][step] = list(step_packages)
+        self._failures: dict[Hashable, list[tuple[str, Exception]]] = {}
+        self._uninstalled_steps: set[Hashable] = set()
+        self._admitted: set[Hashable] | None = None if admitted is None else set(admitted)
+        self._admitted_lock = threading.Lock()
+        self._locks = {name: threading.Lock() for name in managers}
+
+    def admit(self, steps: Iterable[Hashable]) -> None:
+        """Admits install steps known to run: their packages are installed at the next barrier, with the packages of
+        the install step requiring them."""
+        if self._admitted is None:
+            return
+        with self._admitted_lock:
+            self._admitted.update(steps)
+
+    def withdraw(self, steps: Iterable[Hashable]) -> None:
+        """Withdraws install steps known not to run: their packages are not installed (unless already installed)."""
+        steps = set(steps)
+        for name in self._pending:
+            with self._locks[name]:
+                self._pending[name] = {step: packages for step, packages in self._pending[name].items()
+                                       if step not in steps}
+
+    def require(self, step: Hashable, shell: Shell) -> list[tuple[str, Exception]]:
+        """Barrier: makes sure all packages declared by ``step`` are installed/uninstalled.
+
+        Notes:
+            Uninstall is postponed until the batch is flushed.
+
+        Returns:
+            package manager names & errors for packages of ``step`` which could not be installed/uninstalled
+        """
+        if self.uninstall:
+            self._uninstalled_steps.add(step)
+            return []
+
+        self.admit([step])
+        for name in self._pending:
+            with self._locks[name]:
+                if step in self._pending[name]:
+                    self._run(name, shell)
+        return self.failures(step)
+
+    def flush(self, shell: Shell) -> list[Hashable]:
+        """Installs/uninstalls all pending packages.
+
+        Returns:
+            step keys whose packages could not be installed/uninstalled
+        """
+        for name in self._pending:
+            with self._locks[name]:
+                self._run(name, shell)
+        return list(self._failures)
+
+    def failures(self, step: Hashable) -> list[tuple[str, Exception]]:
+        """Package manager names & errors for packages of ``step`` which could not be installed/uninstalled."""
+        return self._failures.get(step, [])
+
+    def _run(self, name: str, shell: Shell) -> None:
+        pending, self._pending[name] = self._pending[name], {}
+        if self._admitted is not None and not self.uninstall:
+            # packages of install steps which are not known to run yet are kept pending
+            with self._admitted_lock:
+                self._pending[name] = {step: packages for step, packages in pending.items()
+                                       if step not in self._admitted}
+            pending = {step: packages for step, packages in pending.items() if step not in self._pending[name]}
+        if not pending:
+            return
+
+        manager = self.managers[name]
+        run = manager.uninstall if self.uninstall else manager.install
+        kept: set[str] = set()
+        if self.uninstall:
+            kept.update(self._kept_packages.get(name, set()))
+            for step in [step for step in pending if step not in self._uninstalled_steps]:
+                kept.update(pending.pop(step))
+            if not pending:
+                return
+
+        def packages_of(steps_packages: Iterable[list[str]]) -> list[str]:
+            # dict keeps declaration order, and removes duplicates
+            return list(dict.fromkeys(package for packages in steps_packages for package in packages
+                                      if package not in kept))
+
+        all_packages = packages_of(pending.values())
+        if not all_packages:
+            return
+        try:
+            run(all_packages, shell)
+            return
+        except Exception as error:  # failure is attributed to steps below
+            if len(pending) == 1:
+                self._failures.setdefault(next(iter(pending)), []).append((name, error))
+                return
+
+        for step, step_packages in pending.items():
+            step_packages = packages_of([step_packages])
+            if not step_packages:
+                continue
+            try:
+                run(step_packages, shell)
+            except Exception as error:
+                self._failures.setdefault(step, []).append((name, error))
+
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import concurrent.futures
+import os
+import pathlib
+import threading
+import time
+from typing import Iterable, Union
+
+from install_process.archive import ProgressCallback
+from install_process.fetch import fetch
+
+
+PathLike = Union[str, os.PathLike]
+
+
+class Prefetch:
+    """A resource required by an install step, fetched in background as soon as the install process starts.
+
+    Examples:
+
+        >>> class InstallSdk(InstallStep):
+        ...     SDK = Prefetch("https://my.mirror/sdk.tar.gz", "/tmp/sdk.tar.gz", checksum="9f86d08...")
+        ...     prefetch = [SDK]
+        ...     def install(self) -> None:
+        ...         '''Install SDK'''
+        ...         self.extract(self.SDK.destination, "/opt/sdk")
+    """
+
+    def __init__(self,
+                 source: PathLike,
+                 destination: PathLike,
+                 checksum: str | None = None,
+                 algorithm: str = "sha256") -> None:
+        """
+        Args:
+            source: local path, ``file://`` URL, or ``http(s)://`` URL (see ``install_process.fetch.fetch``)
+            destination: path of the fetched file
+            checksum: expected hex digest
+            algorithm: any ``hashlib`` algorithm
+        """
+        self.source = source
+        self.destination = pathlib.Path(destination)
+        self.checksum = checksum
+        self.algorithm = algorithm
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}({os.fspath(self.source)!r}, {os.fspath(self.destination)!r})"
+
+
+class PrefetchCancelled(Exception):
+    """The prefetcher was shut down before the resource was fetched."""
+
+
+class _Throttle:
+    """Bandwidth limit shared by all fetching threads."""
+
+    def __init__(self, bandwidth: float) -> None:
+        self.bandwidth = bandwidth
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, size: int) -> None:
+        """Waits until ``size`` bytes can be fetched without exceeding the bandwidth."""
+        with self._lock:
+            now = time.monotonic()
+            self._next = max(self._next, now) + size / self.bandwidth
+            delay = self._next - now - size / self.bandwidth
+        if delay > 0:
+            time.sleep(delay)
+
+
+class Prefetcher:
+    """Fetches resources in background, with bounded concurrency and bandwidth."""
+
+    def __init__(self, max_workers: int = 4, bandwidth: float | None = None) -> None:
+        """
+        Args:
+            max_workers: maximum number of resources fetched concurrently
+            bandwidth: maximum bandwidth (in bytes per second) used by all fetches, if set
+        """
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers,
+                                                               thread_name_prefix="prefetch")
+        self._throttle = _Throttle(bandwidth) if bandwidth else None
+        self._futures: dict[pathlib.Path, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+
+    def start(self, resources: Iterable[Prefetch]) -> None:
+        """Starts fetching ``resources`` in background (resources are identified by their destination)."""
+        with self._lock:
+            for resource in resources:
+                if resource.destination not in self._futures:
+                    self._futures[resource.destination] = self._executor.submit(self._fetch, resource)
+
+    def done(self, resource: Prefetch) -> bool:
+        """Whether ``resource`` fetch is over (successfully or not)."""
+        future = self._futures.get(resource.destination)
+        return future is not None and future.done()
+
+    def wait(self, resource: Prefetch) -> str:
+        """Waits for ``resource`` to be fetched (fetching it now if it was not started).
+
+        Returns:
+            hex digest of the fetched file
+        """
+        self.start([resource])
+        return self._futures[resource.destination].result()
+
+    def shutdown(self) -> None:
+        """Cancels fetches which are not over yet, and waits for fetching threads to stop."""
+        self._cancelled.set()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _fetch(self, resource: Prefetch) -> str:
+        return fetch(resource.source, resource.destination, resource.checksum, resource.algorithm,
+                     progress=self._progress_callback())
+
+    def _progress_callback(self) -> ProgressCallback:
+        last_done = 0
+
+        def progress(done: int, total: int) -> None:
+            nonlocal last_done
+            if self._cancelled.is_set():
+                raise PrefetchCancelled()
+            if self._throttle:
+                self._throttle.consume(done - last_done)
+            last_done = done
+
+        return progress
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import concurrent.futures
+import threading
+from typing import Callable, Iterable, TypeVar
+
+
+T = TypeVar("T")
+
+
+class QueryCache:
+    """Results of read-only shell commands (``uname -r``, ``dpkg-query -W``, etc.), shared by the install steps of an
+    install process run (see ``InstallStep.shell`` ``cache`` parameter).
+
+    Identical queries running concurrently are collapsed into a single run: later ones wait for its result.
+    Failures (exceptions) are not cached.
+    """
+
+    def __init__(self) -> None:
+        self._results: dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+
+    def run(self, cmd: str, run: Callable[[], T]) -> tuple[T, bool]:
+        """Result of ``cmd``: its cached result, the result of its running run, or the result of ``run()``.
+
+        Returns:
+            result of ``cmd``, and whether it was not run by this call
+        """
+        with self._lock:
+            future = self._results.get(cmd)
+            cached = future is not None
+            if not cached:
+                future = self._results[cmd] = concurrent.futures.Future()
+
+        if not cached:
+            try:
+                future.set_result(run())
+            except BaseException as error:
+                with self._lock:
+                    if self._results.get(cmd) is future:
+                        del self._results[cmd]
+                future.set_exception(error)
+                raise
+        return future.result(), cached
+
+    def invalidate(self, cmds: Iterable[str] | None = None) -> None:
+        """Forgets the results of ``cmds`` (of all queries if None): they will be run again."""
+        with self._lock:
+            if cmds is None:
+                self._results.clear()
+                return
+            for cmd in cmds:
+                self._results.pop(cmd, None)
+
+    def __len__(self) -> int:
+        return len(self._results)
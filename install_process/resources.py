@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import locale
+import os
+import selectors
+import subprocess
+import sys
+import time
+from typing import Callable, Iterable
+
+
+SUPPORTED = hasattr(os, "wait4") and hasattr(os, "waitid")
+"""Whether resource usage of shell commands can be collected on this platform."""
+
+
+class ResourceUsage:
+    """Resources used by shell commands (including their own child processes)."""
+
+    __slots__ = ("commands", "user_time", "system_time", "max_rss", "read_blocks", "write_blocks", "read_bytes",
+                 "write_bytes", "voluntary_switches", "involuntary_switches")
+
+    def __init__(self) -> None:
+        self.commands = 0
+        """Number of shell commands."""
+
+        self.user_time = 0.0
+        """CPU time spent in user mode, in seconds."""
+
+        self.system_time = 0.0
+        """CPU time spent in kernel mode, in seconds."""
+
+        self.max_rss = 0
+        """Maximum resident set size of a single process, in bytes."""
+
+        self.read_blocks = 0
+        """Number of block input operations."""
+
+        self.write_blocks = 0
+        """Number of block output operations."""
+
+        self.read_bytes = 0
+        """Bytes read from storage (only if ``/proc/<pid>/io`` is available)."""
+
+        self.write_bytes = 0
+        """Bytes written to storage (only if ``/proc/<pid>/io`` is available)."""
+
+        self.voluntary_switches = 0
+        """Number of voluntary context switches (waiting for I/O, locks, etc.)."""
+
+        self.involuntary_switches = 0
+        """Number of involuntary context switches (preempted, CPU-bound)."""
+
+    @classmethod
+    def from_rusage(cls, rusage: os.struct_rusage, proc_io: dict[str, int] | None = None) -> ResourceUsage:
+        """Resource usage of a single shell command, from ``os.wait4`` rusage and ``/proc/<pid>/io`` counters."""
+        usage = cls()
+        usage.commands = 1
+        usage.user_time = rusage.ru_utime
+        usage.system_time = rusage.ru_stime
+        # ru_maxrss is in kilobytes on Linux, in bytes on macOS
+        usage.max_rss = rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+        usage.read_blocks = rusage.ru_inblock
+        usage.write_blocks = rusage.ru_oublock
+        usage.voluntary_switches = rusage.ru_nvcsw
+        usage.involuntary_switches = rusage.ru_nivcsw
+        if proc_io:
+            usage.read_bytes = proc_io.get("read_bytes", 0)
+            usage.write_bytes = proc_io.get("write_bytes", 0)
+        return usage
+
+    def add(self, other: ResourceUsage) -> None:
+        """Adds resources used by ``other`` shell commands."""
+        for name in self.__slots__:
+            if name == "max_rss":
+                self.max_rss = max(self.max_rss, other.max_rss)
+            else:
+                setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    @property
+    def cpu_time(self) -> float:
+        """Total CPU time, in seconds."""
+        return self.user_time + self.system_time
+
+
+def run(cmd: str,
+        timeout: float | None = None,
+        on_start: Callable[[subprocess.Popen], None] | None = None) -> tuple[int, str, ResourceUsage | None]:
+    """Runs a shell command, capturing its output (stdout & stderr) and its resource usage.
+
+    Args:
+        cmd: shell cmd to execute
+        timeout: raises a ``subprocess.TimeoutExpired`` if shell cmd still runs after [timeout] seconds
+        on_start: called with the shell cmd process, once started
+
+    Returns:
+        shell cmd return code, output, and resource usage (None if not supported on this platform)
+    """
+    if not SUPPORTED:
+        with subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True) as process:
+            if on_start is not None:
+                on_start(process)
+            try:
+                output, _ = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()  # its children may still hold its output open
+                raise subprocess.TimeoutExpired(cmd, timeout) from None
+        return process.returncode, output, None
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    with subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT) as process:
+        if on_start is not None:
+            on_start(process)
+        try:
+            output = _read(process.stdout.fileno(), deadline)
+            usage = wait(process, None if deadline is None else max(deadline - time.monotonic(), 0))
+        except subprocess.TimeoutExpired:
+            process.kill()
+            wait(process)
+            raise subprocess.TimeoutExpired(cmd, timeout) from None
+
+    # same decoding as subprocess text mode
+    text = output.decode(locale.getpreferredencoding(False), errors="replace")
+    return process.returncode, text.replace("\r\n", "\n").replace("\r", "\n"), usage
+
+
+def wait(process: subprocess.Popen, timeout: float | None = None) -> ResourceUsage | None:
+    """Waits for ``process`` to end, and returns its resource usage (None if not supported on this platform).
+
+    Raises a ``subprocess.TimeoutExpired`` if ``process`` still runs after ``timeout`` seconds (it is not killed).
+    """
+    if not SUPPORTED:
+        process.wait(timeout)
+        return None
+    if process.returncode is not None:
+        return None  # already reaped
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    delay = 0.0005
+    # wait for the process to end without reaping it, so that its /proc/<pid>/io counters can still be read
+    flags = os.WEXITED | os.WNOWAIT | (0 if deadline is None else os.WNOHANG)
+    while os.waitid(os.P_PID, process.pid, flags) is None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise subprocess.TimeoutExpired(process.args, timeout)
+        delay = min(delay * 2, remaining, 0.05)
+        time.sleep(delay)
+
+    proc_io = _proc_io(process.pid)
+    _, status, rusage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return ResourceUsage.from_rusage(rusage, proc_io)
+
+
+def format_report(usages: Iterable[tuple[str, ResourceUsage]], total: bool = True) -> str:
+    """Resource usage report table, one line per (name, resource usage), most CPU-consuming first.
+
+    If ``total``, a last line sums all resource usages.
+    """
+    usages = sorted(usages, key=lambda item: item[1].cpu_time, reverse=True)
+    if total:
+        total_usage = ResourceUsage()
+        for _, usage in usages:
+            total_usage.add(usage)
+        usages.append(("Total", total_usage))
+
+    header = ("", "commands", "cpu user", "cpu sys", "max rss", "read", "written", "ctx switches vol/invol")
+    rows = [header]
+    for name, usage in usages:
+        rows.append((
+            name,
+            str(usage.commands),
+            f"{usage.user_time:.2f}s",
+            f"{usage.system_time:.2f}s",
+            _format_bytes(usage.max_rss),
+            _format_bytes(usage.read_bytes or usage.read_blocks * 512),
+            _format_bytes(usage.write_bytes or usage.write_blocks * 512),
+            f"{usage.voluntary_switches}/{usage.involuntary_switches}",
+        ))
+    widths = [max(len(row[column]) for row in rows) for column in range(len(header))]
+    return "\n".join("  ".join(cell.ljust(width) if column == 0 else cell.rjust(width)
+                               for column, (cell, width) in enumerate(zip(row, widths))).rstrip()
+                     for row in rows)
+
+
+def _read(fd: int, deadline: float | None) -> bytes:
+    """Reads ``fd`` until end of file (raises a ``subprocess.TimeoutExpired`` after ``deadline``)."""
+    chunks: list[bytes] = []
+    with selectors.DefaultSelector() as selector:
+        selector.register(fd, selectors.EVENT_READ)
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise subprocess.TimeoutExpired("", 0)
+            if not selector.select(remaining):
+                continue
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                return b"".join(chunks)
+            chunks.append(chunk)
+
+
+def _proc_io(pid: int) -> dict[str, int] | None:
+    """I/O counters of a process (including the child processes it waited for), if ``/proc`` is available."""
+    try:
+        with open(f"/proc/{pid}/io") as proc_io:
+            return {name: int(value) for name, value in (line.split(": ") for line in proc_io if ": " in line)}
+    except (OSError, ValueError):
+        return None
+
+
+def _format_bytes(size: int) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024 or unit == "GiB":
+            return f"{size} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
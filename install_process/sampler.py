@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import collections
+import os
+import pathlib
+import subprocess
+import sys
+import threading
+import time
+from types import FrameType
+from typing import Any, Callable, Union
+
+
+PathLike = Union[str, os.PathLike]
+
+PROCESS_STATES = {"R": "running", "S": "sleeping", "D": "waiting for I/O", "T": "stopped", "Z": "zombie"}
+
+
+class _ThreadState:
+    """Install steps run by a thread, and shell command it waits on."""
+
+    __slots__ = ("steps", "shell", "last_activity", "warned")
+
+    def __init__(self) -> None:
+        self.steps: list[tuple[Any, bool]] = []
+        self.shell: tuple[subprocess.Popen, str] | None = None
+        self.last_activity = time.monotonic()
+        self.warned = False
+
+
+class StackSampler:
+    """Samples the stacks of the threads running install steps, and the shell commands they wait on, in background.
+
+    Samples are aggregated as collapsed stacks, the input format of flame graph tools
+    (``flamegraph.pl``, speedscope, etc.).
+    A thread running an install step which made no progress (step start/end, shell command start/end, progress report)
+    for ``hang_timeout`` seconds is reported as hanging.
+    """
+
+    def __init__(self,
+                 interval: float = 0.05,
+                 hang_timeout: float | None = None,
+                 on_hang: Callable[[Any, str], None] | None = None) -> None:
+        """
+        Args:
+            interval: interval between two samples, in seconds
+            hang_timeout: if set, delay (in seconds) after which an install step making no progress is hanging
+            on_hang: called with the hanging install step, and a report of what its thread is doing
+        """
+        self.interval = interval
+        self.hang_timeout = hang_timeout
+        self.on_hang = on_hang
+        self.samples: collections.Counter[str] = collections.Counter()
+        """Number of samples, by collapsed stack."""
+
+        self._threads: dict[int, _ThreadState] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._sample_forever, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def step_started(self, step: Any, leaf: bool = True) -> None:
+        """The current thread starts running ``step`` (``leaf`` if it is not a group of install steps)."""
+        with self._lock:
+            state = self._threads.setdefault(threading.get_ident(), _ThreadState())
+            state.steps.append((step, leaf))
+        self.activity()
+
+    def step_ended(self) -> None:
+        """The current thread is done with its last started install step."""
+        with self._lock:
+            state = self._threads[threading.get_ident()]
+            state.steps.pop()
+            if not state.steps:
+                del self._threads[threading.get_ident()]
+                return
+        self.activity()
+
+    def shell_started(self, process: subprocess.Popen) -> None:
+        """The current thread waits on a shell command."""
+        state = self._threads.get(threading.get_ident())
+        if state is not None:
+            state.shell = (process, process.args)
+            self.activity()
+
+    def shell_ended(self) -> None:
+        state = self._threads.get(threading.get_ident())
+        if state is not None:
+            state.shell = None
+            self.activity()
+
+    def activity(self) -> None:
+        """The current thread made progress."""
+        state = self._threads.get(threading.get_ident())
+        if state is not None:
+            state.last_activity = time.monotonic()
+            state.warned = False
+
+    def write(self, path: PathLike) -> None:
+        """Writes samples to a collapsed stack file (one ``frame;frame;frame count`` line per stack)."""
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            lines = [f"{stack} {count}\n" for stack, count in sorted(self.samples.items())]
+        path.write_text("".join(lines), encoding="utf-8")
+
+    def _sample_forever(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        """Samples the stacks of all threads running install steps."""
+        frames = sys._current_frames()
+        now = time.monotonic()
+        with self._lock:
+            threads = [(ident, state, list(state.steps), state.shell) for ident, state in self._threads.items()]
+
+        hanging: list[tuple[Any, str]] = []
+        for ident, state, steps, shell in threads:
+            frame = frames.get(ident)
+            if frame is None or not steps:
+                continue
+            step, leaf = steps[-1]
+            stack = [_frame_name(frame) for frame in _frames(frame)]
+            if shell is not None:
+                stack.append(f"$ {_clean(shell[1])}")
+            with self._lock:
+                self.samples[";".join([_clean(step.name() or step.__class__.__qualname__)] + stack)] += 1
+
+            # groups of install steps only wait for their install steps
+            if (leaf and self.hang_timeout is not None and not state.warned
+                    and now - state.last_activity >= self.hang_timeout):
+                state.warned = True
+                hanging.append((step, self._hang_report(step, now - state.last_activity, frame, shell)))
+
+        if self.on_hang is not None:
+            for step, report in hanging:
+                self.on_hang(step, report)
+
+    @staticmethod
+    def _hang_report(step: Any,
+                     duration: float,
+                     frame: FrameType,
+                     shell: tuple[subprocess.Popen, str] | None) -> str:
+        lines = [f"{step.name() or step.__class__.__qualname__} made no progress for {duration:.0f}s"]
+        if shell is not None:
+            process, cmd = shell
+            state = _process_state(process.pid)
+            lines.append(f"waiting on shell command (pid {process.pid}{f', {state}' if state else ''}): {cmd}")
+        lines.extend(f"at {frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+                     for frame in _frames(frame)[-5:][::-1])
+        return "\n".join(lines)
+
+
+def _frames(frame: FrameType) -> list[FrameType]:
+    """Frames of a stack, outermost first."""
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    return frames[::-1]
+
+
+def _frame_name(frame: FrameType) -> str:
+    # no line number: samples of a function are aggregated, whatever line it runs
+    return _clean(f"{frame.f_code.co_name} ({pathlib.Path(frame.f_code.co_filename).name})")
+
+
+def _clean(name: str) -> str:
+    """Frame name, without characters breaking collapsed stack files."""
+    return " ".join(name.replace(";", ",").split())[:120]
+
+
+def _process_state(pid: int) -> str:
+    """State of a process, if ``/proc`` is available."""
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            state = stat.read().rsplit(")", 1)[1].split()[0]
+    except (OSError, IndexError):
+        return ""
+    return PROCESS_STATES.get(state, state)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import functools
+import shlex
+import shutil
+import sys
+from typing import Iterable
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+IO_CLASSES = {"realtime": 1, "best-effort": 2, "idle": 3}
+"""I/O scheduling classes (see ``man ionice``)."""
+
+
+class Scheduling:
+    """CPU & I/O priorities, CPU affinity and resource limits of the shell commands of an install step.
+
+    Lets heavy install steps (compilation, compression) run in parallel with latency-sensitive ones (service restarts,
+    health checks) without slowing them down. Applied on Unix-like systems, I/O priorities, CPU affinity and resource
+    limits on Linux only (using util-linux ``ionice``, ``taskset`` & ``prlimit`` commands).
+
+    Examples:
+
+        >>> class CompileSources(InstallStep):
+        ...     scheduling = Scheduling(nice=19, io_class="idle", rlimits={"as": 8 * 1024 ** 3})
+        ...     def install(self) -> None:
+        ...         '''Compile sources'''
+        ...         self.shell("make -j")
+    """
+
+    def __init__(self,
+                 nice: int | None = None,
+                 io_class: str | None = None,
+                 io_level: int | None = None,
+                 cpus: Iterable[int] | None = None,
+                 rlimits: dict[str, int | tuple[int, int]] | None = None) -> None:
+        """
+        Args:
+            nice: niceness increment (from -20, highest priority, to 19, lowest priority; negative values require
+                privileges)
+            io_class: I/O scheduling class: ``"realtime"`` (requires privileges), ``"best-effort"`` or ``"idle"``
+            io_level: I/O priority within the ``"realtime"`` & ``"best-effort"`` classes (from 0, highest priority,
+                to 7, lowest priority)
+            cpus: CPUs the shell commands may run on
+            rlimits: resource limits, by ``resource.RLIMIT_*`` name without prefix (``"as"``, ``"nofile"``, etc.):
+                soft & hard limit, or (soft, hard) limits
+        """
+        if io_class is not None and io_class not in IO_CLASSES:
+            raise ValueError(f"Unknown I/O scheduling class {io_class!r}, expected one of {', '.join(IO_CLASSES)}")
+        if io_level is not None and not 0 <= io_level <= 7:
+            raise ValueError(f"I/O priority must be from 0 to 7, not {io_level}")
+        if rlimits and resource is not None:
+            for name in rlimits:
+                if not hasattr(resource, f"RLIMIT_{name.upper()}"):
+                    raise ValueError(f"Unknown resource limit {name!r}")
+
+        self.nice = nice
+        self.io_class = io_class
+        self.io_level = io_level
+        self.cpus = None if cpus is None else sorted(cpus)
+        self.rlimits = {name: limits if isinstance(limits, tuple) else (limits, limits)
+                        for name, limits in (rlimits or {}).items()}
+
+    def wrap(self, cmd: str) -> str:
+        """Shell command running ``cmd`` with this scheduling (``cmd`` itself if there is nothing to apply on this
+        platform).
+
+        The scheduling is applied by the ``nice``, ``ionice``, ``taskset`` & ``prlimit`` commands before ``cmd``
+        starts: no Python code runs in the forked process (``subprocess.Popen`` ``preexec_fn`` is not safe while other
+        threads run). Parts of the scheduling whose command is not installed are not applied (see ``missing``).
+        """
+        commands = [command for command in self._commands() if _installed(command[0])]
+        if not commands:
+            return cmd
+        return f"{shlex.join(part for command in commands for part in command)} /bin/sh -c {shlex.quote(cmd)}"
+
+    def missing(self) -> list[str]:
+        """Commands required to apply this scheduling on this platform, which are not installed."""
+        return [command[0] for command in self._commands() if not _installed(command[0])]
+
+    def _commands(self) -> list[list[str]]:
+        """Commands applying this scheduling on this platform, before running a shell command."""
+        if sys.platform == "win32":
+            return []
+
+        linux = sys.platform.startswith("linux")
+        commands: list[list[str]] = []
+        if self.nice:
+            commands.append(["nice", "-n", str(self.nice)])
+        if linux and (self.io_class is not None or self.io_level is not None):
+            io_class = self.io_class or "best-effort"
+            io_level = [] if io_class == "idle" else ["-n", str(4 if self.io_level is None else self.io_level)]
+            commands.append(["ionice", "-c", str(IO_CLASSES[io_class]), *io_level])
+        if linux and self.cpus is not None:
+            commands.append(["taskset", "-c", ",".join(map(str, self.cpus))])
+        if linux and self.rlimits:
+            commands.append(["prlimit", *(f"--{name}={_limit(soft)}:{_limit(hard)}"
+                                          for name, (soft, hard) in self.rlimits.items()), "--"])
+        return commands
+
+    def __str__(self) -> str:
+        parts = []
+        if self.nice is not None:
+            parts.append(f"nice {self.nice}")
+        if self.io_class is not None or self.io_level is not None:
+            io_class = self.io_class or "best-effort"
+            io_level = "" if io_class == "idle" else f" {4 if self.io_level is None else self.io_level}"
+            parts.append(f"io {io_class}{io_level}")
+        if self.cpus is not None:
+            parts.append(f"cpus {','.join(map(str, self.cpus))}")
+        parts.extend(f"{name} {soft}" if soft == hard else f"{name} {soft}/{hard}"
+                     for name, (soft, hard) in self.rlimits.items())
+        return ", ".join(parts) or "default"
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__qualname__}({self})"
+
+
+BACKGROUND = Scheduling(nice=19, io_class="idle")
+"""Lowest CPU & I/O priorities: heavy install steps only use the resources other install steps do not use."""
+
+
+@functools.lru_cache(maxsize=None)
+def _installed(command: str) -> bool:
+    """Whether ``command`` is installed."""
+    return shutil.which(command) is not None
+
+
+def _limit(value: int) -> str:
+    """Resource limit, as expected by ``prlimit``."""
+    return "unlimited" if resource is not None and value == resource.RLIM_INFINITY else str(value)
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import collections
+import json
+import os
+import pathlib
+import subprocess
+import threading
+import time
+from typing import Callable, Union
+
+from install_process import resources
+from install_process.logs import run_logged
+from install_process.resources import ResourceUsage
+
+
+PathLike = Union[str, os.PathLike]
+
+
+class ShellBackend:
+    """Runs the shell commands of install steps (see ``Config.shell_backend``)."""
+
+    def run(self,
+            cmd: str,
+            timeout: float | None = None,
+            on_start: Callable[[subprocess.Popen], None] | None = None) -> tuple[int, str, ResourceUsage | None]:
+        """Runs a shell command, capturing its output (see ``install_process.resources.run``)."""
+        return resources.run(cmd, timeout, on_start=on_start)
+
+    def run_logged(self,
+                   cmd: str,
+                   log_path: PathLike,
+                   timeout: float | None = None,
+                   on_tail: Callable[[str], None] | None = None,
+                   on_start: Callable[[subprocess.Popen], None] | None = None) -> tuple[int, ResourceUsage | None]:
+        """Runs a shell command, its output being appended to a log file (see ``install_process.logs.run_logged``)."""
+        return run_logged(cmd, log_path, timeout, on_tail=on_tail, on_start=on_start)
+
+
+class RecordingShell(ShellBackend):
+    """Runs shell commands, and records their return code, output and duration to a JSON lines file,
+    to be replayed by ``ReplayShell``."""
+
+    def __init__(self, path: PathLike, backend: ShellBackend | None = None) -> None:
+        """
+        Args:
+            path: recording file (overwritten)
+            backend: backend actually running the shell commands
+        """
+        self.path = pathlib.Path(path)
+        self.backend = backend or ShellBackend()
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text("", encoding="utf-8")
+
+    def run(self,
+            cmd: str,
+            timeout: float | None = None,
+            on_start: Callable[[subprocess.Popen], None] | None = None) -> tuple[int, str, ResourceUsage | None]:
+        start = time.perf_counter()
+        try:
+            returncode, output, usage = self.backend.run(cmd, timeout, on_start)
+        except subprocess.TimeoutExpired:
+            self._record(cmd, None, "", time.perf_counter() - start)
+            raise
+        self._record(cmd, returncode, output, time.perf_counter() - start)
+        return returncode, output, usage
+
+    def run_logged(self,
+                   cmd: str,
+                   log_path: PathLike,
+                   timeout: float | None = None,
+                   on_tail: Callable[[str], None] | None = None,
+                   on_start: Callable[[subprocess.Popen], None] | None = None) -> tuple[int, ResourceUsage | None]:
+        log_path = pathlib.Path(log_path)
+        offset = log_path.stat().st_size if log_path.exists() else 0
+        start = time.perf_counter()
+        try:
+            returncode, usage = self.backend.run_logged(cmd, log_path, timeout, on_tail, on_start)
+        except subprocess.TimeoutExpired:
+            returncode, usage = None, None
+            raise
+        finally:
+            # output appended to the log file, without the command line header
+            with open(log_path, "rb") as log_file:
+                log_file.seek(offset)
+                output = log_file.read().decode(errors="replace").split("\n", 1)[-1]
+            self._record(cmd, returncode, output, time.perf_counter() - start)
+        return returncode, usage
+
+    def _record(self, cmd: str, returncode: int | None, output: str, duration: float) -> None:
+        line = json.dumps({"cmd": cmd, "returncode": returncode, "output": output, "duration": round(duration, 6)})
+        with self._lock, open(self.path, "a", encoding="utf-8") as recording:
+            recording.write(line + "\n")
+
+
+class ReplayShell(ShellBackend):
+    """Replays shell commands recorded by ``RecordingShell``, without running anything.
+
+    A shell command run several times replays its recordings in order (the last one is replayed again if it is run
+    more times than it was recorded). Running a shell command which was not recorded raises a ``ValueError``.
+    """
+
+    def __init__(self, path: PathLike, time_scale: float = 0.0) -> None:
+        """
+        Args:
+            path: recording file
+            time_scale: replayed shell commands take their recorded duration multiplied by ``time_scale``
+                (instant if 0)
+        """
+        self.path = pathlib.Path(path)
+        self.time_scale = time_scale
+        self._recordings: dict[str, collections.deque[dict]] = {}
+        with open(self.path, encoding="utf-8") as recording:
+            for line in recording:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._recordings.setdefault(entry["cmd"], collections.deque()).append(entry)
+        self._lock = threading.Lock()
+
+    def run(self,
+            cmd: str,
+            timeout: float | None = None,
+            on_start: Callable[[subprocess.Popen], None] | None = None) -> tuple[int, str, ResourceUsage | None]:
+        entry = self._replay(cmd, timeout)
+        return entry["returncode"], entry["output"], None
+
+    def run_logged(self,
+                   cmd: str,
+                   log_path: PathLike,
+                   timeout: float | None = None,
+                   on_tail: Callable[[str], None] | None = None,
+                   on_start: Callable[[subprocess.Popen], None] | None = None) -> tuple[int, ResourceUsage | None]:
+        log_path = pathlib.Path(log_path)
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(log_path, "a", encoding="utf-8") as log_file:
+            log_file.write(f"$> {cmd}\n")
+        entry = self._replay(cmd, timeout)
+        with open(log_path, "a", encoding="utf-8") as log_file:
+            log_file.write(entry["output"])
+        return entry["returncode"], None
+
+    def _replay(self, cmd: str, timeout: float | None) -> dict:
+        with self._lock:
+            entries = self._recordings.get(cmd)
+            if not entries:
+                raise ValueError(f"Shell command was not recorded in {self.path}: {cmd}")
+            entry = entries.popleft() if len(entries) > 1 else entries[0]
+
+        duration = entry["duration"] * self.time_scale
+        # the recorded run decides whether the shell command times out, whatever the time scale
+        if timeout is not None and (entry["returncode"] is None or entry["duration"] > timeout):
+            time.sleep(min(duration, timeout))
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        if duration:
+            time.sleep(duration)
+        return entry
@@ -0,0 +1,280 @@
+"""Watch mode: re-runs the install steps affected by changes of the files they consume.
+
+Install steps declare the paths they consume using the ``watch_paths`` class attribute. Paths are watched using inotify
+where available (Linux), and by polling their status otherwise. Once changes settle, only the install steps consuming
+the changed paths are re-run, with the install steps reading their outputs (see ``install_process.outputs``).
+
+Start watching with ``setup_install`` ``--watch`` option:
+
+.. code-block:: bash
+
+    python -m my_environment_setup -i reinstall -t Database --watch
+"""
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import pathlib
+import select
+import struct
+import sys
+import time
+from typing import Iterable, Union
+
+from install_process.install import Config, DisplayStdout, InstallProcess, InstallStep
+
+
+PathLike = Union[str, os.PathLike]
+
+DEBOUNCE = 0.2
+"""Delay (in seconds) without changes after which changes are settled."""
+
+POLL_INTERVAL = 0.5
+"""Interval (in seconds) between two status checks of the watched paths, if inotify is not available."""
+
+_IN_MODIFY = 0x2
+_IN_ATTRIB = 0x4
+_IN_CLOSE_WRITE = 0x8
+_IN_MOVED_FROM = 0x40
+_IN_MOVED_TO = 0x80
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_Q_OVERFLOW = 0x4000
+_IN_ISDIR = 0x40000000
+_IN_MASK = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+
+class PathWatcher:
+    """Watches files & directories (with their content) for changes."""
+
+    def __init__(self, paths: Iterable[PathLike], poll_interval: float = POLL_INTERVAL) -> None:
+        """
+        Args:
+            paths: files & directories to watch (they may not exist yet)
+            poll_interval: interval (in seconds) between two status checks, if inotify is not available
+        """
+        self.paths = {pathlib.Path(path).absolute() for path in paths}
+        self._backend = _Inotify(self.paths) if _Inotify.supported() else _StatPoller(self.paths, poll_interval)
+
+    def wait(self, debounce: float = DEBOUNCE, timeout: float | None = None) -> set[pathlib.Path]:
+        """Waits for changes, until no change happened for ``debounce`` seconds.
+
+        Returns:
+            changed paths (empty if nothing changed after ``timeout`` seconds)
+        """
+        changed = self._relevant(self._backend.changes(timeout))
+        while changed:
+            more = self._relevant(self._backend.changes(debounce))
+            if not more:
+                break
+            changed |= more
+        return changed
+
+    def close(self) -> None:
+        self._backend.close()
+
+    def _relevant(self, changed: set[pathlib.Path]) -> set[pathlib.Path]:
+        """Changed paths which are (or are in) watched paths: other files of watched files directories are ignored."""
+        return {path for path in changed if path in self.paths or not self.paths.isdisjoint(path.parents)}
+
+
+class _Inotify:
+    """Linux inotify backend: watches the directories of watched files, and watched directories recursively."""
+
+    _libc: ctypes.CDLL | None = None
+
+    @classmethod
+    def supported(cls) -> bool:
+        if not sys.platform.startswith("linux"):
+            return False
+        if cls._libc is None:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            if not hasattr(libc, "inotify_init1"):
+                return False
+            cls._libc = libc
+        return True
+
+    def __init__(self, paths: set[pathlib.Path]) -> None:
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+        self._paths = paths
+        self._directories: dict[int, pathlib.Path] = {}
+        for path in paths:
+            if path.is_dir():
+                self._watch_tree(path)
+            else:
+                # editors replace files (write then rename): watch their directory
+                self._watch(next(parent for parent in path.parents if parent.is_dir()))
+
+    def changes(self, timeout: float | None) -> set[pathlib.Path]:
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        changed: set[pathlib.Path] = set()
+        try:
+            data = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].split(b"\0", 1)[0]
+            offset += _EVENT.size + length
+            if mask & _IN_Q_OVERFLOW:
+                return set(self._paths)  # events were lost
+            directory = self._directories.get(wd)
+            if directory is None:
+                continue
+            path = directory / os.fsdecode(name) if name else directory
+            changed.add(path)
+            if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                self._watch_tree(path)
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+    def _watch_tree(self, directory: pathlib.Path) -> None:
+        for root, _, _ in os.walk(directory):
+            self._watch(pathlib.Path(root))
+
+    def _watch(self, directory: pathlib.Path) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _IN_MASK)
+        if wd < 0:
+            if ctypes.get_errno() in (errno.ENOENT, errno.ENOTDIR):
+                return  # removed since
+            raise OSError(ctypes.get_errno(), f"Cannot watch {directory}: {os.strerror(ctypes.get_errno())}")
+        self._directories[wd] = directory
+
+
+class _StatPoller:
+    """Fallback backend: compares the status (modification time, size) of watched files at regular intervals."""
+
+    def __init__(self, paths: set[pathlib.Path], poll_interval: float) -> None:
+        self._paths = paths
+        self._poll_interval = poll_interval
+        self._snapshot = self._take_snapshot()
+
+    def changes(self, timeout: float | None) -> set[pathlib.Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self._poll_interval if deadline is None else min(self._poll_interval, deadline - time.monotonic())
+            time.sleep(max(delay, 0))
+            snapshot = self._take_snapshot()
+            changed = {path for path in snapshot.keys() | self._snapshot.keys()
+                       if snapshot.get(path) != self._snapshot.get(path)}
+            self._snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self) -> None:
+        pass
+
+    def _take_snapshot(self) -> dict[pathlib.Path, tuple[int, int]]:
+        snapshot: dict[pathlib.Path, tuple[int, int]] = {}
+        for path in self._paths:
+            if path.is_dir():
+                for root, _, files in os.walk(path):
+                    for name in files:
+                        self._stat(pathlib.Path(root) / name, snapshot)
+            else:
+                self._stat(path, snapshot)
+        return snapshot
+
+    @staticmethod
+    def _stat(path: pathlib.Path, snapshot: dict[pathlib.Path, tuple[int, int]]) -> None:
+        try:
+            stat = path.stat()
+        except OSError:
+            return
+        snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+
+
+class InstallWatcher:
+    """Runs an install process, then re-runs the install steps affected by changes of the paths they consume."""
+
+    def __init__(self,
+                 your_install_process: type[InstallProcess],
+                 config: Config | None = None,
+                 prologue: InstallStep | None = None,
+                 epilogue: InstallStep | None = None,
+                 install_type: str = "install") -> None:
+        """
+        Args:
+            your_install_process: your installation process
+            config: configuration of the install process runs
+            prologue: install steps to add before your installation process ones
+            epilogue: install steps to add after your installation process ones
+            install_type: ``"install"``, ``"uninstall"`` or ``"reinstall"``
+        """
+        self.process_class = your_install_process
+        self.config = config or Config()
+        self.prologue = prologue
+        self.epilogue = epilogue
+        self.install_type = install_type
+        self.display = DisplayStdout()
+
+        self._paths: dict[str, list[pathlib.Path]] = {}
+        """Paths consumed by the watched install steps, by install step name."""
+
+        self._dependents: dict[str, set[str]] = {}
+        """Install steps reading the outputs published by an install step, by install step name."""
+
+    def watch(self,
+              install_step_name: str | list[str] = "",
+              from_step: str = "",
+              until_step: str = "",
+              debounce: float = DEBOUNCE) -> None:
+        """Runs the selected install steps, then re-runs the affected ones on changes (until interrupted)."""
+        self.run(install_step_name, from_step, until_step)
+        if not self._paths:
+            raise ValueError(f"No install step of {self.process_class.__qualname__} declares paths to watch")
+
+        watcher = PathWatcher(path for paths in self._paths.values() for path in paths)
+        self.display.msg(f"Watching {len(watcher.paths)} path(s), press Ctrl+C to stop")
+        try:
+            while True:
+                affected = self.affected(watcher.wait(debounce))
+                if affected:
+                    self.display.msg(f"Changes detected, re-running {', '.join(affected)}")
+                    self.run(affected)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watcher.close()
+
+    def run(self, install_step_name: str | list[str] = "", from_step: str = "", until_step: str = "") -> InstallProcess:
+        """Runs the selected install steps (errors are displayed, they do not stop watching)."""
+        process = self.process_class(install_step_name, config=self.config, from_step=from_step, until_step=until_step)
+        process._add_steps(self.prologue, self.epilogue)
+        try:
+            if self.install_type in ("uninstall", "reinstall"):
+                process.uninstall()
+            if self.install_type in ("install", "reinstall"):
+                process.install()
+        except Exception as error:
+            self.display.error(f"{error.__class__.__qualname__}: {error}")
+
+        self._paths.update((step.name(), [pathlib.Path(path).absolute() for path in step.watch_paths])
+                           for step in process._launched_steps() if step.watch_paths)
+
+        # install steps reading outputs depend on the install steps publishing them
+        publishers = {output.name: step.name() for step in process._launched_steps() for output in step.outputs}
+        for output_name, readers in process.context.outputs.readers.items():
+            if output_name in publishers:
+                self._dependents.setdefault(publishers[output_name], set()).update(readers)
+        return process
+
+    def affected(self, changed: set[pathlib.Path]) -> list[str]:
+        """Names of the install steps consuming ``changed`` paths, and of the install steps depending on them."""
+        affected = [name for name, paths in self._paths.items()
+                    if any(path == watched or watched in path.parents for path in changed for watched in paths)]
+        for name in affected:  # grows while iterating: dependents of dependents
+            affected.extend(dependent for dependent in sorted(self._dependents.get(name, ()))
+                            if dependent not in affected)
+        return affected
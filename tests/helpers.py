@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+import io
+from typing import Any, TextIO
+
+from install_process import InstallProcess, DisplayStdout
+
+
+def make_process(process_class: type[InstallProcess],
+                 *args: Any,
+                 output: TextIO | None = None,
+                 **kwargs: Any) -> InstallProcess:
+    """Install process displaying to ``output`` (discarded if not set), with the step counters & indentation of its
+    context."""
+    process = process_class(*args, **kwargs)
+    process.display = DisplayStdout(io.StringIO() if output is None else output, context=process.context)
+    return process
@@ -0,0 +1,112 @@
+import io
+import os
+import pathlib
+import tarfile
+import tempfile
+import zipfile
+from unittest import TestCase
+
+from install_process import InstallStep, DisplayStdout
+from install_process.archive import extract_archive, CHUNK_SIZE
+
+
+FILES = {
+    "root.txt": b"root file",
+    "sub/dir/small.txt": b"small file",
+    "sub/big.bin": os.urandom(3 * CHUNK_SIZE + 123),
+    "sub/empty.txt": b"",
+}
+
+
+class StepExtract(InstallStep):
+    def install(self) -> None:
+        """Extract"""
+
+    def uninstall(self) -> None:
+        """Remove"""
+
+
+class TestExtractArchive(TestCase):
+    def setUp(self) -> None:
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp = pathlib.Path(self._tmp_dir.name)
+        self.destination = self.tmp / "out"
+
+    def tearDown(self) -> None:
+        self._tmp_dir.cleanup()
+
+    def _make_zip(self, compression: int = zipfile.ZIP_DEFLATED) -> pathlib.Path:
+        path = self.tmp / "archive.zip"
+        with zipfile.ZipFile(path, "w", compression=compression) as zip_file:
+            zip_file.writestr("sub/", b"")
+            for name, content in FILES.items():
+                zip_file.writestr(name, content)
+        return path
+
+    def _make_tar(self, mode: str, suffix: str) -> pathlib.Path:
+        path = self.tmp / f"archive{suffix}"
+        with tarfile.open(path, mode) as tar:
+            for name, content in FILES.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(content)
+                tar.addfile(info, io.BytesIO(content))
+        return path
+
+    def _check_extracted(self) -> None:
+        for name, content in FILES.items():
+            self.assertEqual(content, (self.destination / name).read_bytes(), name)
+
+    def test_extract_zip(self) -> None:
+        extracted = extract_archive(self._make_zip(), self.destination, workers=3)
+        self._check_extracted()
+        self.assertIn((self.destination / "sub/big.bin").resolve(), extracted)
+
+    def test_extract_tar(self) -> None:
+        for mode, suffix in (("w", ".tar"), ("w:gz", ".tar.gz"), ("w:bz2", ".tar.bz2"), ("w:xz", ".tar.xz")):
+            with self.subTest(suffix):
+                extract_archive(self._make_tar(mode, suffix), self.destination, workers=2)
+                self._check_extracted()
+
+    def test_progress(self) -> None:
+        for archive in (self._make_zip(), self._make_tar("w:gz", ".tar.gz")):
+            with self.subTest(archive.name):
+                progress: list[tuple[int, int]] = []
+                extract_archive(archive, self.destination, progress=lambda done, total: progress.append((done, total)))
+                self.assertTrue(progress)
+                self.assertEqual(progress[-1][0], progress[-1][1])
+                self.assertEqual(sorted(progress), progress)
+
+    def test_corrupted_zip(self) -> None:
+        archive = self._make_zip(compression=zipfile.ZIP_STORED)
+        data = bytearray(archive.read_bytes())
+        offset = data.index(b"root file")
+        data[offset] ^= 0xFF
+        archive.write_bytes(bytes(data))
+
+        with self.assertRaises(zipfile.BadZipFile):
+            extract_archive(archive, self.destination)
+
+    def test_member_outside_destination(self) -> None:
+        path = self.tmp / "evil.zip"
+        with zipfile.ZipFile(path, "w") as zip_file:
+            zip_file.writestr("../evil.txt", b"evil")
+
+        with self.assertRaises(ValueError):
+            extract_archive(path, self.destination)
+        self.assertFalse((self.tmp / "evil.txt").exists())
+
+    def test_not_an_archive(self) -> None:
+        path = self.tmp / "not_an_archive.txt"
+        path.write_bytes(b"hello" * 1000)
+
+        with self.assertRaises(tarfile.TarError):
+            extract_archive(path, self.destination)
+
+    def test_install_step_extract(self) -> None:
+        step = StepExtract()
+        output = io.StringIO()
+        step.display = DisplayStdout(output)
+
+        step.extract(self._make_tar("w:gz", ".tar.gz"), self.destination)
+        self._check_extracted()
+        self.assertIn("Extracting archive.tar.gz: 100%", output.getvalue())
@@ -0,0 +1,69 @@
+import gc
+import io
+import tracemalloc
+from unittest import TestCase
+
+from install_process import InstallStep, InstallSteps, InstallProcess, DisplayStdout
+
+
+STEPS_COUNT = 10_000
+
+
+class GeneratedStep(InstallStep):
+    def install(self) -> None:
+        """Install generated step"""
+
+    def uninstall(self) -> None:
+        """Uninstall generated step"""
+
+
+def _generated_process() -> type[InstallProcess]:
+    groups = [
+        type(f"GeneratedSteps{group}", (InstallSteps,), {
+            "__doc__": f"Generated steps {group}",
+            "steps": [GeneratedStep() for _ in range(STEPS_COUNT // 100)],
+        })()
+        for group in range(100)
+    ]
+    return type("GeneratedProcess", (InstallProcess,), {"__doc__": "GENERATED", "steps": groups})
+
+
+def _allocated(function) -> tuple[object, int]:
+    """Result of ``function``, and memory it allocated (which is still in use), in bytes."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = function()
+        gc.collect()
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+class TestStepsMemory(TestCase):
+    def test_memory_per_step(self) -> None:
+        steps, steps_memory = _allocated(lambda: [GeneratedStep() for _ in range(STEPS_COUNT)])
+        process_class = _generated_process()
+        process, process_memory = _allocated(process_class)
+
+        # install steps are compact: no display, context or attributes dict allocated per install step
+        print(f"\n{steps_memory / STEPS_COUNT:.0f} bytes per install step, "
+              f"{process_memory / STEPS_COUNT:.0f} bytes per install step in install process")
+        self.assertLess(steps_memory / STEPS_COUNT, 256)
+        self.assertLess(process_memory / STEPS_COUNT, 256)
+
+        output = io.StringIO()
+        process.display = DisplayStdout(output, context=process.context)
+        process.install()
+        self.assertIn(f"[{STEPS_COUNT + 100}/{STEPS_COUNT + 100}] Install generated step", output.getvalue()[-200:])
+
+    def test_display_context_config_shared(self) -> None:
+        process = _generated_process()()
+        for _, step in process._get_child():
+            self.assertIsNone(step._display)
+            self.assertIsNone(step._context)
+            self.assertIsNone(step._config)
+            self.assertIs(process.display, step.display)
+            self.assertIs(process.context, step.context)
+            self.assertIs(process.config, step.config)
@@ -0,0 +1,141 @@
+import concurrent.futures
+import importlib
+import os
+import pathlib
+import socket
+import sys
+import tempfile
+import textwrap
+import threading
+import time
+from unittest import TestCase, skipUnless
+
+from install_process.daemon import InstallDaemon, send_request
+from install_process.hooks import Hooks
+from install_process.install import Config
+
+
+PROCESS_SOURCE = textwrap.dedent('''
+    import time
+
+    from install_process import InstallStep, InstallProcess
+
+
+    class SlowStep1(InstallStep):
+        def install(self) -> None:
+            """Install slow step 1"""
+            time.sleep(0.5)
+
+        def uninstall(self) -> None:
+            """Uninstall slow step 1"""
+
+
+    class SlowStep2(InstallStep):
+        def install(self) -> None:
+            """Install slow step 2"""
+            time.sleep(0.5)
+
+        def uninstall(self) -> None:
+            """Uninstall slow step 2"""
+
+
+    class DaemonProcess(InstallProcess):
+        """DAEMON PROCESS"""
+        steps = [SlowStep1(), SlowStep2()]
+''')
+
+
+@skipUnless(hasattr(socket, "AF_UNIX"), "Unix sockets are required")
+class TestInstallDaemon(TestCase):
+    def setUp(self) -> None:
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp = pathlib.Path(self._tmp_dir.name)
+        self.module_file = self.tmp / "daemon_process_module.py"
+        self.module_file.write_text(PROCESS_SOURCE)
+        sys.path.insert(0, str(self.tmp))
+        module = importlib.import_module("daemon_process_module")
+
+        self.socket_path = self.tmp / "daemon.sock"
+        self.daemon = InstallDaemon(module.DaemonProcess, self.socket_path)
+        self.thread = threading.Thread(target=self.daemon.serve_forever, daemon=True)
+        self.thread.start()
+        while not self.socket_path.exists():
+            time.sleep(0.01)
+
+    def tearDown(self) -> None:
+        self.daemon.shutdown()
+        self.thread.join()
+        sys.path.remove(str(self.tmp))
+        del sys.modules["daemon_process_module"]
+        self._tmp_dir.cleanup()
+
+    def test_install(self) -> None:
+        response = send_request(self.socket_path, "install", "SlowStep1")
+        self.assertTrue(response["ok"], response)
+        self.assertIn("Install slow step 1", response["output"])
+        self.assertNotIn("Install slow step 2", response["output"])
+
+    def test_install_targets(self) -> None:
+        response = send_request(self.socket_path, "install", ["SlowStep1", "re:Slow.*2"])
+        self.assertTrue(response["ok"], response)
+        self.assertIn("Install slow step 1", response["output"])
+        self.assertIn("Install slow step 2", response["output"])
+
+    def test_config(self) -> None:
+        ended = []
+        hooks = Hooks()
+        hooks.register("step_end", lambda step, **_: ended.append(step.name()))
+        self.daemon.config = Config(hooks=hooks)
+
+        response = send_request(self.socket_path, "install", "SlowStep1", verbose=True)
+        self.assertTrue(response["ok"], response)
+        self.assertEqual(["SlowStep1"], ended)
+        # requests do not change the daemon configuration
+        self.assertFalse(self.daemon.config.verbose)
+        self.assertTrue(self.daemon.config.interactive)
+
+    def test_plan(self) -> None:
+        start = time.monotonic()
+        response = send_request(self.socket_path, "plan")
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertIn("SlowStep1", response["output"])
+        self.assertIn("SlowStep2", response["output"])
+
+    def test_status(self) -> None:
+        send_request(self.socket_path, "uninstall", "SlowStep2")
+        response = send_request(self.socket_path, "status")
+        self.assertEqual("DaemonProcess", response["install_process"])
+        self.assertEqual(1, response["requests"])
+        self.assertEqual([], response["running"])
+
+    def test_errors(self) -> None:
+        self.assertFalse(send_request(self.socket_path, "unknown")["ok"])
+        response = send_request(self.socket_path, "install", "NonExistentStep")
+        self.assertFalse(response["ok"])
+        self.assertIn("ValueError", response["error"])
+
+    def test_concurrent_requests(self) -> None:
+        start = time.monotonic()
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            futures = [executor.submit(send_request, self.socket_path, "install", step)
+                       for step in ("SlowStep1", "SlowStep2")]
+            self.assertTrue(all(future.result()["ok"] for future in futures))
+        self.assertLess(time.monotonic() - start, 0.9)
+
+    def test_conflicting_requests(self) -> None:
+        start = time.monotonic()
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            futures = [executor.submit(send_request, self.socket_path, "install", step)
+                       for step in ("SlowStep1", "")]
+            self.assertTrue(all(future.result()["ok"] for future in futures))
+        # the entire install process shares SlowStep1 with the other request
+        self.assertGreater(time.monotonic() - start, 1.4)
+
+    def test_reload(self) -> None:
+        self.module_file.write_text(PROCESS_SOURCE.replace("Install slow step 1", "Install reloaded step 1"))
+        mtime = self.module_file.stat().st_mtime + 10
+        os.utime(self.module_file, (mtime, mtime))
+
+        response = send_request(self.socket_path, "plan")
+        self.assertIn("Install reloaded step 1", response["output"])
+        self.assertEqual(1, send_request(self.socket_path, "status")["reloads"])
@@ -0,0 +1,228 @@
+import io
+import os
+import pathlib
+import tempfile
+import threading
+import time
+from unittest import TestCase
+
+from install_process import InstallStep, InstallSteps, InstallProcess
+from install_process.deadlines import DeadlineExceeded, Watchdog, critical
+from install_process.install import Config
+
+from tests.helpers import make_process
+
+
+events: list[str] = []
+tmp = pathlib.Path(tempfile.gettempdir())
+
+
+class StepHangingShell(InstallStep):
+    deadline = 0.3
+
+    def install(self) -> None:
+        """Install hanging shell"""
+        pid_file = tmp / f"install_process-deadline-{os.getpid()}.pid"
+        self.shell(f"sleep 30 & echo $! > {pid_file}; wait")
+
+    def uninstall(self) -> None:
+        """Uninstall hanging shell"""
+
+
+class StepHangingPython(InstallStep):
+    deadline = 0.3
+
+    def install(self) -> None:
+        """Install hanging python"""
+        while True:
+            pass
+
+    def uninstall(self) -> None:
+        """Uninstall hanging python"""
+
+
+class StepBlockingWait(InstallStep):
+    deadline = 0.3
+
+    def install(self) -> None:
+        """Install blocking wait"""
+        threading.Event().wait(4)  # blocked in C: cannot be interrupted
+
+    def uninstall(self) -> None:
+        """Uninstall blocking wait"""
+
+
+class StepWaiting(InstallStep):
+    def install(self) -> None:
+        """Install waiting"""
+        threading.Event().wait(4)
+
+    def uninstall(self) -> None:
+        """Uninstall waiting"""
+
+
+class StepLast(InstallStep):
+    def install(self) -> None:
+        """Install last"""
+        events.append("install last")
+
+    def uninstall(self) -> None:
+        """Uninstall last"""
+
+
+class StepSlow(InstallStep):
+    def install(self) -> None:
+        """Install slow"""
+        self.shell("sleep 30")
+
+    def uninstall(self) -> None:
+        """Uninstall slow"""
+
+
+class StepsWaiting(InstallSteps):
+    """Waiting group"""
+    deadline = 0.3
+    steps = [StepWaiting()]
+
+
+class HangingShellProcess(InstallProcess):
+    """HANGING SHELL"""
+    steps = [StepHangingShell(), StepLast()]
+
+
+class HangingPythonProcess(InstallProcess):
+    """HANGING PYTHON"""
+    steps = [StepHangingPython(), StepLast()]
+
+
+class BlockingWaitProcess(InstallProcess):
+    """BLOCKING WAIT"""
+    steps = [StepBlockingWait(), StepLast()]
+
+
+class WaitingProcess(InstallProcess):
+    """WAITING"""
+    steps = [StepWaiting(), StepLast()]
+
+
+class WaitingGroupProcess(InstallProcess):
+    """WAITING GROUP"""
+    steps = [StepsWaiting(), StepLast()]
+
+
+class SlowProcess(InstallProcess):
+    """SLOW"""
+    steps = [StepSlow() | StepSlow(), StepLast()]
+
+
+class TestDeadlines(TestCase):
+    def setUp(self) -> None:
+        events.clear()
+        self.output = io.StringIO()
+
+    def test_step_deadline_kills_shell_tree(self) -> None:
+        start = time.monotonic()
+        with self.assertRaisesRegex(DeadlineExceeded, "StepHangingShell did not end within its deadline of 0.3s"):
+            make_process(HangingShellProcess, output=self.output).install()
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertEqual([], events)
+
+        pid_file = tmp / f"install_process-deadline-{os.getpid()}.pid"
+        self.addCleanup(pid_file.unlink)
+        pid = int(pid_file.read_text())
+        time.sleep(0.1)
+        try:
+            state = pathlib.Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()[0]
+        except FileNotFoundError:
+            state = "gone"
+        self.assertIn(state, ("gone", "Z"))
+
+    def test_step_deadline_python_hang(self) -> None:
+        with self.assertRaises(DeadlineExceeded):
+            make_process(HangingPythonProcess, output=self.output).install()
+
+    def test_step_deadline_blocking_wait(self) -> None:
+        for policy in ("fail", "continue"):
+            events.clear()
+            start = time.monotonic()
+            try:
+                make_process(BlockingWaitProcess, output=self.output, config=Config(deadline_policy=policy)).install()
+            except DeadlineExceeded:
+                self.assertEqual("fail", policy)
+            # the blocked install step is abandoned
+            self.assertLess(time.monotonic() - start, 2)
+            self.assertEqual(["install last"] if policy == "continue" else [], events)
+
+    def test_process_deadline_blocking_wait(self) -> None:
+        start = time.monotonic()
+        with self.assertRaisesRegex(DeadlineExceeded, "WaitingProcess did not end within its deadline of 0.3s"):
+            make_process(WaitingProcess, output=self.output, config=Config(deadline=0.3)).install()
+        self.assertLess(time.monotonic() - start, 2)
+
+    def test_continue_policy(self) -> None:
+        make_process(HangingPythonProcess, output=self.output, config=Config(deadline_policy="continue")).install()
+        self.assertEqual(["install last"], events)
+        output = self.output.getvalue()
+        self.assertIn("StepHangingPython did not end within its deadline of 0.3s: abandoned", output)
+        # the next install step is counted & displayed as usual
+        self.assertIn("┃   \x1b[1m[2/2] Install last", output)
+
+    def test_abandoned_group_display(self) -> None:
+        make_process(WaitingGroupProcess, output=self.output, config=Config(deadline_policy="continue")).install()
+        self.assertEqual(["install last"], events)
+        # the abandoned group does not indent the next install steps
+        self.assertIn("\n┃   \x1b[1m[3/3] Install last", self.output.getvalue())
+
+    def test_critical_section(self) -> None:
+        watchdog = Watchdog()
+        watchdog.start()
+        self.addCleanup(watchdog.stop)
+        deadline = watchdog.watch("step", 0.05)
+        try:
+            with self.assertRaises(DeadlineExceeded):
+                with critical():
+                    start = time.monotonic()
+                    while time.monotonic() - start < 0.3:
+                        pass
+                    # not interrupted while running the critical section
+                    events.append("critical section done")
+        finally:
+            watchdog.unwatch(deadline)
+        self.assertTrue(deadline.expired)
+        self.assertEqual(["critical section done"], events)
+
+    def test_unwatch_clears_interruption(self) -> None:
+        watchdog = Watchdog()
+        watchdog.start()
+        self.addCleanup(watchdog.stop)
+        deadlines = []
+        watched = threading.Event()
+
+        def run() -> None:
+            deadlines.append(watchdog.watch("step", 0.05))
+            watched.set()
+            time.sleep(0.5)  # blocked in C: gets the DeadlineExceeded once the sleep ends
+            events.append("not interrupted")
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        watched.wait()
+        while not deadlines[0].expired:
+            time.sleep(0.01)
+        # the install step ended meanwhile: the DeadlineExceeded it did not get yet is cleared
+        watchdog.unwatch(deadlines[0])
+        thread.join()
+        self.assertEqual(["not interrupted"], events)
+
+    def test_process_deadline(self) -> None:
+        start = time.monotonic()
+        with self.assertRaisesRegex(DeadlineExceeded, "SlowProcess did not end within its deadline of 0.3s"):
+            # the process deadline is never continued
+            make_process(SlowProcess, output=self.output,
+                         config=Config(deadline=0.3, deadline_policy="continue")).install()
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertEqual([], events)
+
+    def test_invalid_policy(self) -> None:
+        with self.assertRaisesRegex(ValueError, "Unknown deadline policy 'retry'"):
+            Config(deadline_policy="retry")
@@ -0,0 +1,132 @@
+import hashlib
+import http.server
+import io
+import os
+import pathlib
+import tempfile
+import threading
+from unittest import TestCase
+
+from install_process import InstallStep, DisplayStdout
+from install_process.fetch import fetch, hash_file, CHUNK_SIZE
+
+
+CONTENT = os.urandom(3 * CHUNK_SIZE + 456)
+CONTENT_SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+
+class RangeHandler(http.server.BaseHTTPRequestHandler):
+    """Serves ``CONTENT``, supporting ranged reads (unlike ``http.server.SimpleHTTPRequestHandler``)."""
+
+    ranges_supported = True
+    requested_ranges: list = []
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_HEAD(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(CONTENT)))
+        if self.ranges_supported:
+            self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+
+    def do_GET(self) -> None:
+        content_range = self.headers.get("Range")
+        if content_range and self.ranges_supported:
+            start, end = (int(bound) for bound in content_range.removeprefix("bytes=").split("-"))
+            self.requested_ranges.append((start, end))
+            body = CONTENT[start:end + 1]
+            self.send_response(206)
+        else:
+            body = CONTENT
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StepFetch(InstallStep):
+    def install(self) -> None:
+        """Fetch"""
+
+    def uninstall(self) -> None:
+        """Remove"""
+
+
+class TestFetch(TestCase):
+    def setUp(self) -> None:
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp = pathlib.Path(self._tmp_dir.name)
+        self.source = self.tmp / "source.bin"
+        self.source.write_bytes(CONTENT)
+        self.destination = self.tmp / "sub" / "destination.bin"
+
+        RangeHandler.ranges_supported = True
+        RangeHandler.requested_ranges = []
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/source.bin"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self._tmp_dir.cleanup()
+
+    def test_hash_file(self) -> None:
+        self.assertEqual(CONTENT_SHA256, hash_file(self.source))
+        empty = self.tmp / "empty"
+        empty.write_bytes(b"")
+        self.assertEqual(hashlib.md5(b"").hexdigest(), hash_file(empty, "md5"))
+
+    def test_fetch_local(self) -> None:
+        for source in (self.source, self.source.as_uri()):
+            with self.subTest(source):
+                self.assertEqual(CONTENT_SHA256, fetch(source, self.destination, CONTENT_SHA256))
+                self.assertEqual(CONTENT, self.destination.read_bytes())
+                self.destination.unlink()
+
+    def test_fetch_local_parallel(self) -> None:
+        progress: list[tuple[int, int]] = []
+        digest = fetch(self.source, self.destination, CONTENT_SHA256, workers=3, parallel_threshold=0,
+                       progress=lambda done, total: progress.append((done, total)))
+        self.assertEqual(CONTENT_SHA256, digest)
+        self.assertEqual(CONTENT, self.destination.read_bytes())
+        self.assertEqual((len(CONTENT), len(CONTENT)), progress[-1])
+
+    def test_fetch_http(self) -> None:
+        self.assertEqual(CONTENT_SHA256, fetch(self.url, self.destination, CONTENT_SHA256))
+        self.assertEqual(CONTENT, self.destination.read_bytes())
+        self.assertEqual([], RangeHandler.requested_ranges)
+
+    def test_fetch_http_parallel(self) -> None:
+        self.assertEqual(CONTENT_SHA256, fetch(self.url, self.destination, CONTENT_SHA256,
+                                               workers=3, parallel_threshold=0))
+        self.assertEqual(CONTENT, self.destination.read_bytes())
+        self.assertEqual(3, len(RangeHandler.requested_ranges))
+
+    def test_fetch_http_parallel_ranges_not_supported(self) -> None:
+        RangeHandler.ranges_supported = False
+        self.assertEqual(CONTENT_SHA256, fetch(self.url, self.destination, CONTENT_SHA256,
+                                               workers=3, parallel_threshold=0))
+        self.assertEqual(CONTENT, self.destination.read_bytes())
+
+    def test_checksum_mismatch(self) -> None:
+        with self.assertRaises(ValueError):
+            fetch(self.source, self.destination, "0" * 64)
+        self.assertEqual([], list(self.destination.parent.iterdir()))
+
+    def test_skip_up_to_date(self) -> None:
+        fetch(self.source, self.destination, CONTENT_SHA256)
+        self.source.unlink()
+
+        # source does not exist anymore, but is not required
+        self.assertEqual(CONTENT_SHA256, fetch(self.source, self.destination, CONTENT_SHA256.upper()))
+
+    def test_install_step_fetch(self) -> None:
+        step = StepFetch()
+        output = io.StringIO()
+        step.display = DisplayStdout(output)
+
+        self.assertEqual(CONTENT_SHA256, step.fetch(self.url, self.destination, CONTENT_SHA256))
+        self.assertIn("Fetching source.bin: 100%", output.getvalue())
@@ -0,0 +1,134 @@
+import io
+import pathlib
+import tempfile
+import time
+from unittest import TestCase
+
+from install_process import InstallStep, InstallSteps, InstallProcess, DisplayStdout
+from install_process.history import ProgressEstimator, TimingHistory
+
+
+class StepLong(InstallStep):
+    def install(self) -> None:
+        """Install long"""
+        for done in range(5):
+            time.sleep(0.01)
+            self.progress(done + 1, 5)
+
+    def uninstall(self) -> None:
+        """Uninstall long"""
+
+
+class StepShort(InstallStep):
+    def install(self) -> None:
+        """Install short"""
+
+    def uninstall(self) -> None:
+        """Uninstall short"""
+
+
+class StepSkipped(InstallStep):
+    def install_condition(self) -> bool:
+        """Never installed"""
+        return False
+
+    def install(self) -> None:
+        """Install skipped"""
+
+    def uninstall(self) -> None:
+        """Uninstall skipped"""
+
+
+class StepsLongShort(InstallSteps):
+    """Long & short"""
+    steps = [StepLong(), StepShort()]
+
+
+class HistoryProcess(InstallProcess):
+    """HISTORY"""
+    steps = [StepsLongShort(), StepSkipped()]
+
+
+class NamedStep:
+    def __init__(self, name: str) -> None:
+        self._name = name
+
+    def name(self) -> str:
+        return self._name
+
+
+class TestTimingHistory(TestCase):
+    def setUp(self) -> None:
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self._tmp_dir.name) / "sub" / "history.sqlite"
+
+    def tearDown(self) -> None:
+        self._tmp_dir.cleanup()
+
+    def test_estimates(self) -> None:
+        history = TimingHistory(self.path, max_runs=3)
+        self.assertEqual({}, history.estimates("install"))
+
+        for duration in (100.0, 1.0, 2.0, 3.0):
+            history.record([("A", "install", duration), ("B", "uninstall", duration * 10)])
+
+        # only the last 3 runs are kept
+        self.assertEqual({"A": 2.0}, history.estimates("install"))
+        self.assertEqual({"B": 20.0}, history.estimates("uninstall"))
+
+    def test_estimator(self) -> None:
+        TimingHistory(self.path).record([("A", "install", 30.0), ("B", "install", 10.0)])
+        step_a, step_b, step_c = NamedStep("A"), NamedStep("B"), NamedStep("C")
+        estimator = ProgressEstimator(TimingHistory(self.path), [step_a, step_b, step_c], "install")
+
+        # C has no history: it is assumed to last as long as a typical step (20s)
+        self.assertEqual(0.0, estimator.fraction())
+        self.assertEqual(60.0, estimator.remaining())
+
+        estimator.start(step_a)
+        estimator.update(step_a, 1, 2)
+        self.assertAlmostEqual(0.25, estimator.fraction())
+
+        estimator.end(step_a, 25.0)
+        estimator.skip([step_b])
+        self.assertAlmostEqual(20.0, estimator.remaining())
+        self.assertAlmostEqual(2 / 3, estimator.fraction())
+
+        estimator.save()
+        self.assertEqual({"A": 27.5, "B": 10.0}, TimingHistory(self.path).estimates("install"))
+
+    def test_estimator_without_history(self) -> None:
+        estimator = ProgressEstimator(TimingHistory(self.path), [NamedStep("A")], "install")
+        self.assertIsNone(estimator.remaining())
+
+    def test_install_process(self) -> None:
+        class TimedHistoryProcess(HistoryProcess):
+            """TIMED HISTORY"""
+            timing_history = self.path
+
+        outputs = []
+        for _ in range(2):
+            output = io.StringIO()
+            process = TimedHistoryProcess()
+            process.display = DisplayStdout(output, context=process.context)
+            process.install()
+            self.assertIsNone(process.context.eta)
+            outputs.append(output.getvalue())
+
+        # no history yet: progress is displayed, remaining time is not
+        self.assertIn("[1/4 0%] Install # Long & short", outputs[0])
+        self.assertIn("100% (5 / 5) - overall", outputs[0])
+        self.assertNotIn("ETA", outputs[0])
+        self.assertIn("ETA 0s] Install long", outputs[1])
+
+        estimates = TimingHistory(self.path).estimates("install")
+        self.assertEqual({"StepsLongShort.StepLong", "StepsLongShort.StepShort"}, set(estimates))
+        self.assertGreaterEqual(estimates["StepsLongShort.StepLong"], 0.05)
+
+    def test_progress_without_install_process(self) -> None:
+        step = StepLong()
+        output = io.StringIO()
+        step.display = DisplayStdout(output)
+        step.install()
+        self.assertIn("20% (1 / 5)", output.getvalue())
+        self.assertIn("100% (5 / 5)", output.getvalue())
@@ -0,0 +1,165 @@
+import pathlib
+import tempfile
+from unittest import TestCase
+
+from install_process import InstallStep, InstallSteps, InstallProcess
+from install_process.hooks import Hooks, PrometheusExporter
+from install_process.install import Config
+
+from tests.helpers import make_process
+
+
+class StepShell(InstallStep):
+    def install(self) -> None:
+        """Install shell"""
+        self.shell("echo installed")
+
+    def uninstall(self) -> None:
+        """Uninstall shell"""
+
+
+class StepSkipped(InstallStep):
+    def install_condition(self) -> bool:
+        """Never installed"""
+        return False
+
+    def install(self) -> None:
+        """Install skipped"""
+
+    def uninstall(self) -> None:
+        """Uninstall skipped"""
+
+
+class StepFailing(InstallStep):
+    def install(self) -> None:
+        """Install failing"""
+        raise ValueError("failing")
+
+    def uninstall(self) -> None:
+        """Uninstall failing"""
+
+
+class StepsShellSkipped(InstallSteps):
+    """Shell & skipped"""
+    steps = [StepShell(), StepSkipped()]
+
+
+class HooksProcess(InstallProcess):
+    """HOOKS"""
+    steps = [StepsShellSkipped()]
+
+
+class FailingHooksProcess(InstallProcess):
+    """FAILING HOOKS"""
+    steps = [StepShell(), StepFailing()]
+
+
+class TestHooks(TestCase):
+    def setUp(self) -> None:
+        self.hooks = Hooks()
+        self.events: list[tuple[str, dict]] = []
+        for event in ("process_start", "process_end", "step_start", "step_end", "step_skip", "step_fail",
+                      "condition_start", "condition_end", "shell_start", "shell_end"):
+            self.hooks.register(event, lambda _event=event, **data: self.events.append((_event, data)))
+
+    def _process(self, process_class: type[InstallProcess], **config) -> InstallProcess:
+        return make_process(process_class, config=Config(hooks=self.hooks, **config))
+
+    def test_events(self) -> None:
+        process = self._process(HooksProcess)
+        process.install()
+
+        self.assertEqual([
+            ("process_start", ""),
+            ("step_start", "StepsShellSkipped"),
+            ("condition_start", "StepsShellSkipped"),
+            ("condition_end", "StepsShellSkipped"),
+            ("step_start", "StepsShellSkipped.StepShell"),
+            ("condition_start", "StepsShellSkipped.StepShell"),
+            ("condition_end", "StepsShellSkipped.StepShell"),
+            ("shell_start", "StepsShellSkipped.StepShell"),
+            ("shell_end", "StepsShellSkipped.StepShell"),
+            ("step_end", "StepsShellSkipped.StepShell"),
+            ("step_start", "StepsShellSkipped.StepSkipped"),
+            ("condition_start", "StepsShellSkipped.StepSkipped"),
+            ("condition_end", "StepsShellSkipped.StepSkipped"),
+            ("step_skip", "StepsShellSkipped.StepSkipped"),
+            ("step_end", "StepsShellSkipped"),
+            ("process_end", ""),
+        ], [(event, data.get("step", process).name()) for event, data in self.events])
+
+        for event, data in self.events:
+            self.assertIs(process, data["process"])
+            if event.endswith("_end") or event == "step_skip":
+                self.assertGreaterEqual(data["duration"], 0)
+        shell_end = next(data for event, data in self.events if event == "shell_end")
+        self.assertEqual(("echo installed", 0), (shell_end["cmd"], shell_end["returncode"]))
+        self.assertIsNone(self.events[-1][1]["error"])
+
+    def test_failure_events(self) -> None:
+        process = self._process(FailingHooksProcess)
+        with self.assertRaises(ValueError):
+            process.install()
+
+        step_fail = next(data for event, data in self.events if event == "step_fail")
+        self.assertEqual("StepFailing", step_fail["step"].name())
+        self.assertEqual(("process_end", "failing"), (self.events[-1][0], str(self.events[-1][1]["error"])))
+
+    def test_only_show_names(self) -> None:
+        self._process(HooksProcess, only_show_names=True).install()
+        self.assertEqual([], self.events)
+
+    def test_register(self) -> None:
+        hooks = Hooks()
+        self.assertFalse(hooks)
+        with self.assertRaises(ValueError):
+            hooks.register("unknown", print)
+
+        hooks.register("step_end", print)
+        self.assertTrue(hooks)
+        hooks.unregister("step_end", print)
+        self.assertFalse(hooks)
+
+    def test_hooks_per_config(self) -> None:
+        Config.hooks.register("step_end", print)
+        self.addCleanup(Config.hooks.unregister, "step_end", print)
+        config, other_config = Config(), Config()
+        self.assertIsNot(config.hooks, other_config.hooks)
+        self.assertTrue(config.hooks)  # copy of the callbacks registered on Config.hooks
+
+        config.hooks.register("step_start", print)
+        self.assertEqual(["step_end"], list(other_config.hooks._callbacks))
+        self.assertEqual(["step_end"], list(Config.hooks._callbacks))
+
+    def test_no_hooks(self) -> None:
+        # default configuration has no hooks registered
+        self.assertFalse(Config().hooks)
+        make_process(HooksProcess).install()
+
+
+class TestPrometheusExporter(TestCase):
+    def test_metrics_file(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / "metrics" / "install_process.prom"
+            hooks = Hooks()
+            PrometheusExporter(path).register(hooks)
+
+            for process_class in (HooksProcess, FailingHooksProcess):
+                try:
+                    make_process(process_class, config=Config(hooks=hooks)).install()
+                except ValueError:
+                    pass
+
+            metrics = path.read_text()
+            self.assertIn("# TYPE install_process_step_duration_seconds gauge", metrics)
+            self.assertIn('install_process_step_runs_total{process="HooksProcess",'
+                          'step="StepsShellSkipped.StepShell",action="install",outcome="done"} 1', metrics)
+            self.assertIn('install_process_step_runs_total{process="HooksProcess",'
+                          'step="StepsShellSkipped.StepSkipped",action="install",outcome="skipped"} 1', metrics)
+            self.assertIn('install_process_step_failures_total{process="FailingHooksProcess",'
+                          'step="StepFailing",action="install"} 1', metrics)
+            self.assertIn('install_process_runs_total{process="FailingHooksProcess",action="install",'
+                          'outcome="failed"} 1', metrics)
+            self.assertIn('install_process_runs_total{process="HooksProcess",action="install",'
+                          'outcome="done"} 1', metrics)
+            self.assertEqual(["install_process.prom"], [file.name for file in path.parent.iterdir()])
@@ -0,0 +1,140 @@
+import io
+import json
+import pathlib
+import tempfile
+import threading
+from unittest import TestCase, mock
+
+from install_process import InstallStep, InstallProcess, DisplayStdout
+from install_process.inputs import Input, collect
+from install_process.install import Config
+
+
+USER_NAME = Input("user_name", "Enter user name: ", default="admin")
+PASSWORD = Input("user_password", "Enter user password: ", secret=True)
+LICENSE_KEY = Input("license_key", "Enter license key: ", secret=True, actions=["install"])
+answers: dict[str, str] = {}
+
+
+class StepUser(InstallStep):
+    inputs = [USER_NAME]
+
+    def install(self) -> None:
+        """Install user"""
+        answers["user"] = self.answer(USER_NAME)
+
+    def uninstall(self) -> None:
+        """Uninstall user"""
+
+
+class StepPassword(InstallStep):
+    inputs = [USER_NAME, PASSWORD]
+
+    def install(self) -> None:
+        """Install password"""
+        answers["password"] = f"{self.answer('user_name')}:{self.answer(PASSWORD)}"
+        answers["thread"] = threading.current_thread().name
+
+    def uninstall(self) -> None:
+        """Uninstall password"""
+
+
+class StepLicense(InstallStep):
+    inputs = [USER_NAME, LICENSE_KEY]
+
+    def install(self) -> None:
+        """Install license"""
+        answers["license"] = self.answer(LICENSE_KEY)
+
+    def uninstall(self) -> None:
+        """Uninstall license"""
+        answers["user"] = self.answer(USER_NAME)
+
+
+class InputsProcess(InstallProcess):
+    """INPUTS"""
+    steps = [StepUser() | StepPassword()]
+
+
+class LicenseProcess(InstallProcess):
+    """LICENSE"""
+    steps = [StepLicense()]
+
+
+class TestInputs(TestCase):
+    def setUp(self) -> None:
+        answers.clear()
+
+    def test_collect(self) -> None:
+        asked: list[str] = []
+
+        def ask(input_: Input) -> str:
+            asked.append(input_.name)
+            return ""
+
+        values = collect([USER_NAME, PASSWORD, USER_NAME], answers={"user_password": "secret"}, ask=ask, environ={})
+        self.assertEqual({"user_name": "admin", "user_password": "secret"}, values)
+        self.assertEqual(["user_name"], asked)
+
+        values = collect([USER_NAME], environ={"INSTALL_PROCESS_USER_NAME": "root"})
+        self.assertEqual({"user_name": "root"}, values)
+
+        with self.assertRaisesRegex(ValueError, "No value for input.* user_password.*INSTALL_PROCESS_USER_PASSWORD"):
+            collect([USER_NAME, PASSWORD], environ={})
+
+    def test_install_process(self) -> None:
+        # inputs are asked once, up front: never by the parallel install steps
+        process = InputsProcess()
+        process.display = DisplayStdout(io.StringIO(), context=process.context)
+        with mock.patch("builtins.input", return_value="") as input_mock, \
+                mock.patch("getpass.getpass", return_value="secret") as getpass_mock:
+            process.install()
+        self.assertEqual(1, input_mock.call_count)
+        self.assertEqual(1, getpass_mock.call_count)
+        self.assertEqual(("admin", "admin:secret"), (answers["user"], answers["password"]))
+        self.assertNotEqual(threading.current_thread().name, answers["thread"])
+
+    def test_install_only_input(self) -> None:
+        # install-only inputs are not asked on uninstall
+        process = LicenseProcess()
+        process.display = DisplayStdout(io.StringIO(), context=process.context)
+        with mock.patch("builtins.input", return_value="") as input_mock, \
+                mock.patch("getpass.getpass", return_value="key") as getpass_mock:
+            process.uninstall()
+        self.assertEqual(1, input_mock.call_count)
+        self.assertEqual(0, getpass_mock.call_count)
+        self.assertEqual("admin", answers["user"])
+
+        with mock.patch("builtins.input", return_value=""), \
+                mock.patch("getpass.getpass", return_value="key") as getpass_mock:
+            process.install()
+        self.assertEqual(1, getpass_mock.call_count)
+        self.assertEqual("key", answers["license"])
+
+        with self.assertRaisesRegex(ValueError, "Unknown action.* upgrade"):
+            Input("license_key", "Enter license key: ", actions=["upgrade"])
+
+    def test_answers_file(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            answers_file = pathlib.Path(tmp) / "answers.json"
+            answers_file.write_text(json.dumps({"user_name": "root", "user_password": "secret"}))
+            process = InputsProcess(config=Config(answers=answers_file, interactive=False))
+            process.display = DisplayStdout(io.StringIO(), context=process.context)
+            with mock.patch("builtins.input", side_effect=AssertionError("input asked")):
+                process.install()
+        self.assertEqual("root:secret", answers["password"])
+
+    def test_not_interactive(self) -> None:
+        process = InputsProcess(config=Config(interactive=False))
+        process.display = DisplayStdout(io.StringIO(), context=process.context)
+        with mock.patch.dict("os.environ", {}, clear=True), self.assertRaisesRegex(ValueError, "user_password"):
+            process.install()
+        self.assertEqual({}, answers)
+
+    def test_standalone_step(self) -> None:
+        step = StepUser()
+        with mock.patch("builtins.input", return_value="alice"):
+            step.install()
+        self.assertEqual("alice", answers["user"])
+        with self.assertRaisesRegex(ValueError, "Input user_password is not declared by StepUser"):
+            step.answer(PASSWORD)
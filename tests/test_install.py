@@ -1,4 +1,6 @@
+import concurrent.futures
 import io
+import time
 from unittest import TestCase, mock
 
 from install_process.install import InstallProcess, InstallStep, DisplayStdout, InstallSteps, Config
@@ -432,3 +434,48 @@ class TestTopInstall(TestCase):
         top_install.uninstall()
         self.assertFalse(TestInstallStep.InstallStepSimple._uninstall_flag)
         self.assertFalse(TestInstallStep.InstallStepConditionFalse._uninstall_flag)
+
+
+class TestConcurrentInstallProcesses(TestCase):
+    class PrefixConfig(Config):
+        prefix = ""
+
+    class StepRecordingPrefix(InstallStep):
+        seen_prefixes: dict = {}
+
+        def install(self) -> None:
+            """Record prefix"""
+            time.sleep(0.01)
+            self.seen_prefixes[self.config.prefix] = id(self)
+
+        def uninstall(self) -> None:
+            """Uninstall"""
+
+    class InstallProcessPrefix(InstallProcess):
+        """PREFIX INSTALL"""
+
+    InstallProcessPrefix.steps = [StepRecordingPrefix()]
+
+    def test_step_instances_are_not_shared(self) -> None:
+        first = self.InstallProcessPrefix()
+        second = self.InstallProcessPrefix()
+        self.assertIsNot(first._steps[0], second._steps[0])
+        self.assertIs(first, first._steps[0].father)
+
+    def test_concurrent_install_processes(self) -> None:
+        processes = []
+        for prefix_num in range(20):
+            config = self.PrefixConfig(verbose=True)
+            config.prefix = f"/prefix/{prefix_num}"
+            process = self.InstallProcessPrefix(config=config)
+            process.display = DisplayStdout(io.StringIO(), context=process.context)
+            processes.append(process)
+
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            for future in [executor.submit(process.install) for process in processes]:
+                future.result()
+
+        self.assertEqual({f"/prefix/{prefix_num}" for prefix_num in range(20)},
+                         set(self.StepRecordingPrefix.seen_prefixes))
+        self.assertEqual(20, len(set(self.StepRecordingPrefix.seen_prefixes.values())))
+        self.assertFalse(Config.verbose)
@@ -0,0 +1,151 @@
+import io
+import pathlib
+import tempfile
+import threading
+import time
+from unittest import TestCase, mock
+
+from install_process import InstallStep, InstallSteps, InstallProcess, DisplayStdout
+from install_process import locks
+from install_process.install import Config
+from install_process.locks import HostLock
+
+
+EXCLUSIVE = HostLock("shared-dir")
+SHARED = HostLock("shared-dir", shared=True)
+running: list[str] = []
+rolled_back: list[tuple[tuple[str, ...], bool]] = []
+overlaps: list[tuple[str, ...]] = []
+lock = threading.Lock()
+
+
+class RecordedStep(InstallStep):
+    def install(self) -> None:
+        """Install recorded"""
+        with lock:
+            running.append(self.__class__.__qualname__)
+            overlaps.append(tuple(running))
+        time.sleep(0.1)
+        with lock:
+            running.remove(self.__class__.__qualname__)
+
+    def uninstall(self) -> None:
+        """Uninstall recorded"""
+
+
+class StepExclusive(RecordedStep):
+    locks = [EXCLUSIVE]
+
+
+class StepOtherExclusive(RecordedStep):
+    locks = [EXCLUSIVE]
+
+
+class StepReader(RecordedStep):
+    locks = [SHARED]
+
+
+class StepOtherReader(RecordedStep):
+    locks = [SHARED]
+
+
+class StepRolledBack(InstallStep):
+    locks = [EXCLUSIVE]
+
+    def install(self) -> None:
+        """Install rolled back"""
+
+    def uninstall(self) -> None:
+        """Uninstall rolled back"""
+        try:
+            with locks.hold([HostLock("shared-dir", timeout=0.05)]):
+                held = False
+        except ValueError:
+            held = True
+        rolled_back.append((self.context.host_locks, held))
+
+
+class StepFailing(InstallStep):
+    def install(self) -> None:
+        """Install failing"""
+        raise RuntimeError("failed")
+
+    def uninstall(self) -> None:
+        """Uninstall failing"""
+
+
+class StepsLocked(InstallSteps):
+    """Locked group"""
+    locks = [EXCLUSIVE]
+    steps = [StepExclusive()]
+
+
+class ExclusiveProcess(InstallProcess):
+    """EXCLUSIVE"""
+    steps = [StepExclusive() | StepOtherExclusive()]
+
+
+class SharedProcess(InstallProcess):
+    """SHARED"""
+    steps = [StepReader() | StepOtherReader()]
+
+
+class NestedProcess(InstallProcess):
+    """NESTED"""
+    steps = [StepsLocked()]
+
+
+class RollbackProcess(InstallProcess):
+    """ROLLBACK"""
+    steps = [StepRolledBack(), StepFailing()]
+
+
+class TestLocks(TestCase):
+    def setUp(self) -> None:
+        running.clear()
+        overlaps.clear()
+        rolled_back.clear()
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(locks, "LOCK_DIR", pathlib.Path(self._tmp_dir.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.output = io.StringIO()
+
+    def tearDown(self) -> None:
+        self._tmp_dir.cleanup()
+
+    def install(self, process: InstallProcess) -> None:
+        process.display = DisplayStdout(self.output, context=process.context)
+        process.install()
+
+    def test_exclusive(self) -> None:
+        self.install(ExclusiveProcess())
+        self.assertTrue(all(len(running_steps) == 1 for running_steps in overlaps))
+        output = self.output.getvalue()
+        self.assertRegex(output, r"Step(Other)?Exclusive: waiting for host lock shared-dir \(exclusive\)")
+        # displayed while waiting, not once the parallel group is done
+        self.assertLess(output.index("waiting for host lock"), output.index("Install recorded"))
+
+    def test_shared(self) -> None:
+        self.install(SharedProcess())
+        self.assertIn(2, [len(running_steps) for running_steps in overlaps])
+
+    def test_nested(self) -> None:
+        # install steps of a group holding a lock do not wait for it
+        self.install(NestedProcess())
+        self.assertEqual([("StepExclusive",)], overlaps)
+
+    def test_rollback(self) -> None:
+        # rolled back install steps hold their host locks while uninstalled: others cannot acquire them
+        with self.assertRaises(RuntimeError):
+            self.install(RollbackProcess(config=Config(rollback=True)))
+        self.assertEqual([(("shared-dir",), True)], rolled_back)
+        self.assertIn("rolled back.", self.output.getvalue())
+
+    def test_timeout(self) -> None:
+        with locks.hold([EXCLUSIVE]):
+            with self.assertRaisesRegex(ValueError, "Host lock shared-dir could not be acquired within 0.05s"):
+                with locks.hold([HostLock("shared-dir", timeout=0.05)]):
+                    pass
+        with locks.hold([HostLock("shared-dir", timeout=0.05)]):
+            pass
@@ -0,0 +1,114 @@
+import io
+import pathlib
+import subprocess
+import tempfile
+from unittest import TestCase, mock
+
+from install_process import InstallStep, InstallSteps, InstallProcess, DisplayStdout
+from install_process import logs
+from install_process.install import Config
+
+
+class StepLogged(InstallStep):
+    log_shell = True
+
+    def install(self) -> None:
+        """Install logged"""
+        self.shell("for i in $(seq 1 1000); do echo line $i; done")
+        self.shell("echo to stderr >&2")
+
+    def uninstall(self) -> None:
+        """Uninstall logged"""
+        self.shell("echo uninstalled")
+
+
+class StepFailing(InstallStep):
+    log_shell = True
+
+    def install(self) -> None:
+        """Install failing"""
+        self.shell("echo first line; echo last line; exit 3")
+
+    def uninstall(self) -> None:
+        """Uninstall failing"""
+
+
+class StepsLogged(InstallSteps):
+    """Logged steps"""
+    steps = [StepLogged()]
+
+
+class LogsProcess(InstallProcess):
+    """LOGS"""
+    steps = [StepsLogged()]
+
+
+class TestLogs(TestCase):
+    def setUp(self) -> None:
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp = pathlib.Path(self._tmp_dir.name)
+
+    def tearDown(self) -> None:
+        self._tmp_dir.cleanup()
+
+    def test_tail(self) -> None:
+        path = self.tmp / "big.log"
+        path.write_text("".join(f"line {num}\n" for num in range(100_000)))
+        self.assertEqual("line 99998\nline 99999", logs.tail(path, lines=2))
+        self.assertEqual("", logs.tail(self.tmp / "missing.log"))
+
+    def test_run_logged(self) -> None:
+        path = self.tmp / "sub" / "cmd.log"
+        self.assertEqual(0, logs.run_logged("echo out; echo err >&2", path)[0])
+        self.assertEqual(2, logs.run_logged("exit 2", path)[0])
+        self.assertEqual("$> echo out; echo err >&2\nout\nerr\n$> exit 2\n", path.read_text())
+
+    def test_run_logged_live_tail(self) -> None:
+        lines: list[str] = []
+        with mock.patch.object(logs, "TAIL_INTERVAL", 0.01):
+            logs.run_logged("echo first; sleep 0.3; echo second; sleep 0.3", self.tmp / "cmd.log",
+                            on_tail=lines.append)
+        self.assertEqual(["first", "second"], lines)
+
+    def test_run_logged_timeout(self) -> None:
+        with self.assertRaises(subprocess.TimeoutExpired):
+            logs.run_logged("sleep 10", self.tmp / "cmd.log", timeout=0.1)
+
+    def test_install_process(self) -> None:
+        output = io.StringIO()
+        process = LogsProcess(config=Config(log_dir=self.tmp, verbose=True))
+        process.display = DisplayStdout(output, context=process.context)
+        process.install()
+
+        log_file = self.tmp / "StepsLogged.StepLogged.log"
+        self.assertIn("line 1000\n$> echo to stderr >&2\nto stderr\n", log_file.read_text())
+        self.assertIn(f"Full output: {log_file}", output.getvalue())
+        self.assertNotIn("line 500", output.getvalue())
+
+    def test_failure(self) -> None:
+        step = StepFailing()
+        step.config = Config(log_dir=self.tmp)
+        output = io.StringIO()
+        step.display = DisplayStdout(output)
+
+        with self.assertRaises(subprocess.CalledProcessError) as error:
+            step.install()
+        self.assertEqual(3, error.exception.returncode)
+        self.assertIn("last line", output.getvalue())
+        self.assertIn(f"Full output: {self.tmp / 'StepFailing.log'}", output.getvalue())
+
+    def test_not_logged(self) -> None:
+        step = StepLogged()
+        step.config = Config(log_dir=self.tmp)
+        self.assertEqual("", step.shell("echo logged"))
+        self.assertEqual("not logged", step.shell("echo not logged", log=False))
+        self.assertEqual("$> echo logged\nlogged\n", (self.tmp / "StepLogged.log").read_text())
+
+    def test_log_opt_in(self) -> None:
+        step = StepFailing()
+        step.log_shell = False
+        step.config = Config(log_dir=self.tmp)
+        # setting a log directory does not change the outputs of install steps which did not opt in
+        self.assertEqual("5.15.0", step.shell("echo 5.15.0"))
+        self.assertEqual("", step.shell("echo logged", log=True))
+        self.assertEqual("$> echo logged\nlogged\n", (self.tmp / "StepFailing.log").read_text())
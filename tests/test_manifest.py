@@ -0,0 +1,114 @@
+import io
+import os
+import pathlib
+import tempfile
+from unittest import TestCase
+
+from install_process import InstallStep, InstallProcess
+from install_process.install import Config
+from install_process.manifest import Manifest, snapshot
+
+from tests.helpers import make_process
+
+
+class StepDeploy(InstallStep):
+    manifest_roots: list = []  # set by tests
+
+    def install(self) -> None:
+        """Install deploy"""
+        root = pathlib.Path(self.manifest_roots[0])
+        (root / "app" / "lib").mkdir(parents=True)
+        for index in range(600):
+            (root / "app" / "lib" / f"module_{index}.py").write_text("")
+        self.shell(f"echo config > '{root}/app/app.conf'; ln -s app/app.conf '{root}/app.conf'")
+
+    def uninstall(self) -> None:
+        """Uninstall deploy"""
+
+
+class StepWriteA(InstallStep):
+    manifest_roots: list = []  # set by tests
+
+    def install(self) -> None:
+        """Install write A"""
+        self.shell(f"sleep 0.2; touch '{self.manifest_roots[0]}/a.txt'")
+
+    def uninstall(self) -> None:
+        """Uninstall write A"""
+
+
+class StepWriteB(StepWriteA):
+    def install(self) -> None:
+        """Install write B"""
+        self.shell(f"touch '{self.manifest_roots[0]}/b.txt'; sleep 0.2")
+
+
+class DeployProcess(InstallProcess):
+    """DEPLOY"""
+    steps = [StepDeploy()]
+
+
+class ParallelDeployProcess(InstallProcess):
+    """PARALLEL DEPLOY"""
+    steps = [StepWriteA() | StepWriteB()]
+
+
+class TestManifest(TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = pathlib.Path(self._tmp.name)
+        self.addCleanup(self._tmp.cleanup)
+        self.root = self.tmp / "opt"
+        self.root.mkdir()
+        (self.root / "existing.txt").write_text("not installed")
+        StepDeploy.manifest_roots = [self.root]
+        self.addCleanup(setattr, StepDeploy, "manifest_roots", [])
+        self.output = io.StringIO()
+
+    def _process(self, process_class: type[InstallProcess] = DeployProcess, *args: str) -> InstallProcess:
+        return make_process(process_class, *args, output=self.output,
+                            config=Config(manifest_dir=self.tmp / "manifests"))
+
+    def test_install_uninstall(self) -> None:
+        self._process().install()
+        manifest = Manifest(self.tmp / "manifests" / "StepDeploy.manifest")
+        entries = manifest.entries()
+        self.assertEqual(604, len(entries))  # 2 directories, 600 modules, config & link
+        self.assertIn(f"{self.root / 'app'}{os.sep}", entries)
+        self.assertIn(str(self.root / "app.conf"), entries)
+        self.assertNotIn(str(self.root / "existing.txt"), entries)
+
+        (self.root / "app" / "user.conf").write_text("created by the user")
+        process = self._process()
+        process.config.verbose = True
+        process.uninstall()
+        self.assertEqual({str(self.root / "existing.txt"), f"{self.root}{os.sep}", f"{self.root / 'app'}{os.sep}",
+                          str(self.root / "app" / "user.conf")},
+                         snapshot([self.root]) - {f"{self.root / 'app' / 'lib'}{os.sep}"})
+        self.assertFalse((self.root / "app" / "lib").exists())
+        self.assertFalse(manifest.path.exists())
+        self.assertIn("[1/1] Uninstall deploy", self.output.getvalue())
+        self.assertIn("┃   ┃   Removed 603 file(s) & directories recorded in", self.output.getvalue())  # wrapped
+
+    def test_parallel_steps_sharing_roots(self) -> None:
+        StepWriteA.manifest_roots = [self.root]
+        self.addCleanup(setattr, StepWriteA, "manifest_roots", [])
+        self._process(ParallelDeployProcess).install()
+        # each install step only records the files it created
+        self.assertEqual([str(self.root / "a.txt")], Manifest(self.tmp / "manifests" / "StepWriteA.manifest").entries())
+        self.assertEqual([str(self.root / "b.txt")], Manifest(self.tmp / "manifests" / "StepWriteB.manifest").entries())
+
+        self._process(ParallelDeployProcess, "StepWriteA").uninstall()
+        self.assertFalse((self.root / "a.txt").exists())
+        self.assertTrue((self.root / "b.txt").exists())
+
+    def test_disabled(self) -> None:
+        process = make_process(DeployProcess)
+        process.install()
+        self.assertIsNone(process._steps_dict["StepDeploy"].manifest)
+
+    def test_record_merges_previous_install(self) -> None:
+        manifest = Manifest(self.tmp / "step.manifest")
+        manifest.record([str(self.root / "existing.txt"), str(self.root / "removed.txt")])
+        manifest.record([str(self.root / "new.txt")])
+        self.assertEqual([str(self.root / "existing.txt"), str(self.root / "new.txt")], manifest.entries())
@@ -0,0 +1,106 @@
+import io
+import threading
+import time
+from unittest import TestCase
+
+from install_process import InstallStep, InstallProcess, MatrixInstallSteps
+from install_process.install import Config
+
+from tests.helpers import make_process
+
+
+events: list[str] = []
+lock = threading.Lock()
+running = 0
+max_running = 0
+
+
+class CreateAccount(InstallStep):
+    def install(self) -> None:
+        """Create account"""
+        global running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+            events.append(f"install {self.parameter['user']}")
+        if self.parameter["user"] in ("carol", "erin"):
+            raise ValueError(f"{self.parameter['user']} already exists")
+
+    def uninstall(self) -> None:
+        """Delete account"""
+        with lock:
+            events.append(f"uninstall {self.parameter['user']}")
+
+
+class Accounts(MatrixInstallSteps):
+    """Accounts"""
+    step = CreateAccount
+    parameters = [{"user": user} for user in ("alice", "bob", "dave", "frank")]
+    max_workers = 2
+
+    def key(self, parameter: dict) -> str:
+        return parameter["user"]
+
+
+class FailingAccounts(Accounts):
+    """Failing accounts"""
+    parameters = [{"user": user} for user in ("alice", "carol", "erin")]
+
+
+class AccountsProcess(InstallProcess):
+    """ACCOUNTS"""
+    steps = [Accounts()]
+
+
+class FailingAccountsProcess(InstallProcess):
+    """FAILING ACCOUNTS"""
+    steps = [FailingAccounts()]
+
+
+class TestMatrix(TestCase):
+    def setUp(self) -> None:
+        global max_running
+        events.clear()
+        max_running = 0
+        self.output = io.StringIO()
+
+    def test_install(self) -> None:
+        process = make_process(AccountsProcess, output=self.output)
+        process.install()
+        self.assertEqual(["install alice", "install bob", "install dave", "install frank"], sorted(events))
+        self.assertEqual(2, max_running)
+        self.assertEqual(["Accounts", "Accounts[alice]", "Accounts[bob]", "Accounts[dave]", "Accounts[frank]"],
+                         [name for name, _ in process._get_child()])
+        output = self.output.getvalue()
+        self.assertIn("[1/5] Install # Accounts", output)
+        # runs progress is displayed within the matrix group
+        self.assertIn("┃   ┃   [4/4] ", output)
+        self.assertIn(" done.", output)
+
+    def test_target_single_run(self) -> None:
+        make_process(AccountsProcess, "Accounts[bob]", output=self.output).install()
+        self.assertEqual(["install bob"], events)
+        self.assertIn("[1/1] bob done.", self.output.getvalue())
+
+    def test_failures(self) -> None:
+        with self.assertRaisesRegex(ValueError, "2/3 runs of FailingAccounts failed: carol, erin") as raised:
+            make_process(FailingAccountsProcess, output=self.output).install()
+        self.assertIsInstance(raised.exception.__cause__, ValueError)
+        self.assertEqual(3, len(events))  # all runs ended
+        self.assertIn("already exists", self.output.getvalue())
+
+    def test_rollback(self) -> None:
+        with self.assertRaises(ValueError):
+            make_process(FailingAccountsProcess, output=self.output, config=Config(rollback=True)).install()
+        self.assertEqual("uninstall alice", events[-1])
+
+    def test_duplicate_keys(self) -> None:
+        class DuplicateAccounts(Accounts):
+            """Duplicate accounts"""
+            parameters = [{"user": "alice"}, {"user": "alice"}]
+
+        with self.assertRaisesRegex(ValueError, "alice is duplicated"):
+            DuplicateAccounts()
@@ -0,0 +1,109 @@
+import io
+import pathlib
+import tempfile
+import time
+from unittest import TestCase
+
+from install_process import InstallStep, InstallSteps, InstallProcess, DisplayStdout
+from install_process.install import Config
+from install_process.outputs import Output, OutputStore
+
+
+PORT = Output("port", int)
+read: list[int] = []
+
+
+class StepReader(InstallStep):
+    def install(self) -> None:
+        """Install reader"""
+        read.append(self.output(PORT, timeout=5))
+
+    def uninstall(self) -> None:
+        """Uninstall reader"""
+
+
+class StepPublisher(InstallStep):
+    outputs = [PORT]
+
+    def install(self) -> None:
+        """Install publisher"""
+        time.sleep(0.1)
+        self.publish(PORT, 8080)
+
+    def uninstall(self) -> None:
+        """Uninstall publisher"""
+
+
+class StepsSkipped(InstallSteps):
+    """Skipped"""
+    steps = [StepPublisher()]
+
+    def install_condition(self) -> bool:
+        """Never installed"""
+        return False
+
+
+class ParallelOutputsProcess(InstallProcess):
+    """PARALLEL OUTPUTS"""
+    steps = [StepReader() | StepPublisher()]
+
+
+class SkippedOutputsProcess(InstallProcess):
+    """SKIPPED OUTPUTS"""
+    steps = [StepsSkipped(), StepReader()]
+
+
+class ReaderFirstOutputsProcess(InstallProcess):
+    """READER FIRST OUTPUTS"""
+    steps = [StepReader(), StepPublisher()]
+
+
+class TestOutputs(TestCase):
+    def setUp(self) -> None:
+        read.clear()
+
+    def install(self, process: InstallProcess) -> None:
+        process.display = DisplayStdout(io.StringIO(), context=process.context)
+        process.install()
+
+    def test_parallel(self) -> None:
+        # the reader waits for the install step publishing the output, running in parallel
+        self.install(ParallelOutputsProcess())
+        self.assertEqual([8080], read)
+
+    def test_not_published(self) -> None:
+        # the install step declaring the output was skipped: the reader does not wait for it
+        start = time.monotonic()
+        with self.assertRaisesRegex(ValueError, "Output port was not published"):
+            self.install(SkippedOutputsProcess())
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_published_later(self) -> None:
+        # the install step publishing the output runs after the reader: the reader does not wait for it
+        start = time.monotonic()
+        with self.assertRaisesRegex(ValueError, "Output port is read by StepReader before being published by "
+                                                "StepPublisher, which runs after it"):
+            self.install(ReaderFirstOutputsProcess())
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_persisted(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            outputs_file = pathlib.Path(tmp) / "outputs.json"
+            self.install(ParallelOutputsProcess(config=Config(outputs=outputs_file)))
+            self.assertIn('"port": 8080', outputs_file.read_text())
+
+            # reruns of the reader only reuse the persisted value
+            self.install(ParallelOutputsProcess("StepReader", config=Config(outputs=outputs_file)))
+        self.assertEqual([8080, 8080], read)
+
+    def test_typed(self) -> None:
+        store = OutputStore()
+        with self.assertRaisesRegex(ValueError, "Output port must be a int, not a str"):
+            store.publish(PORT, "8080")
+        with self.assertRaisesRegex(ValueError, "Output port was not published within 0.01s"):
+            store.expect("publisher", [PORT])
+            store.get(PORT, timeout=0.01)
+
+    def test_not_declared(self) -> None:
+        with self.assertRaisesRegex(ValueError, "Output port is not declared by StepReader"):
+            StepReader().publish(PORT, 8080)
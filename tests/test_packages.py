@@ -0,0 +1,208 @@
+from unittest import TestCase
+
+from install_process import InstallStep, InstallSteps, InstallProcess
+from install_process.packages import FakePackageManager
+
+
+FAKE_MANAGER = FakePackageManager(failing=["broken"])
+CONDITION_CALLS: list[str] = []
+
+
+class StepA(InstallStep):
+    packages = {"fake": ["a", "common"]}
+
+    def install(self) -> None:
+        """Install A"""
+        assert {"a", "common"}.issubset(FAKE_MANAGER.installed)
+
+    def uninstall(self) -> None:
+        """Uninstall A"""
+
+
+class StepB(InstallStep):
+    packages = {"fake": ["b", "common"]}
+
+    def install(self) -> None:
+        """Install B"""
+
+    def uninstall(self) -> None:
+        """Uninstall B"""
+
+
+class StepC(InstallStep):
+    packages = {"fake": ["c"]}
+
+    def install_condition(self) -> bool:
+        """Never uninstalled"""
+        return True
+
+    def uninstall_condition(self) -> bool:
+        """Never uninstalled"""
+        return False
+
+    def install(self) -> None:
+        """Install C"""
+
+    def uninstall(self) -> None:
+        """Uninstall C"""
+
+
+class StepBroken(InstallStep):
+    packages = {"fake": ["broken"]}
+
+    def install(self) -> None:
+        """Install broken"""
+
+    def uninstall(self) -> None:
+        """Uninstall broken"""
+
+
+class StepSkipped(InstallStep):
+    packages = {"fake": ["huge-sdk"]}
+
+    def install_condition(self) -> bool:
+        """Not applicable"""
+        CONDITION_CALLS.append(self.name())
+        return False
+
+    def install(self) -> None:
+        """Install skipped"""
+
+    def uninstall(self) -> None:
+        """Uninstall skipped"""
+
+
+class StepsSkipped(InstallSteps):
+    """Skipped group"""
+    steps = [StepB()]
+
+    def install_condition(self) -> bool:
+        """Not applicable"""
+        return False
+
+
+class StepConditionBroken(InstallStep):
+    packages = {"fake": ["d"]}
+
+    def install_condition(self) -> bool:
+        """Cannot be checked"""
+        raise RuntimeError("not checkable yet")
+
+    def install(self) -> None:
+        """Install D"""
+
+    def uninstall(self) -> None:
+        """Uninstall D"""
+
+
+class StepsAB(InstallSteps):
+    """A & B"""
+    steps = [StepA(), StepB()]
+
+
+class FakePackagesProcess(InstallProcess):
+    """FAKE PACKAGES"""
+    package_managers = {"fake": FAKE_MANAGER}
+    steps = [StepsAB() | StepC()]
+
+
+class FakeBrokenPackagesProcess(InstallProcess):
+    """FAKE BROKEN PACKAGES"""
+    package_managers = {"fake": FAKE_MANAGER}
+    steps = [StepA(), StepBroken(), StepC()]
+
+
+class FakeSkippedPackagesProcess(InstallProcess):
+    """FAKE SKIPPED PACKAGES"""
+    package_managers = {"fake": FAKE_MANAGER}
+    steps = [StepSkipped(), StepsSkipped(), StepA(), StepC()]
+
+
+class FakeCheckedPackagesProcess(InstallProcess):
+    """FAKE CHECKED PACKAGES"""
+    package_managers = {"fake": FAKE_MANAGER}
+    check_package_conditions = True
+    steps = [StepA(), StepSkipped(), StepsSkipped(), StepC()]
+
+
+class FakeConditionBrokenProcess(InstallProcess):
+    """FAKE CONDITION BROKEN"""
+    package_managers = {"fake": FAKE_MANAGER}
+    check_package_conditions = True
+    steps = [StepA(), StepConditionBroken()]
+
+
+class FakeReinstallPackagesProcess(InstallProcess):
+    """FAKE REINSTALL PACKAGES"""
+    package_managers = {"fake": FAKE_MANAGER}
+    steps = [StepA(), StepB()]
+
+
+class UnknownManagerProcess(InstallProcess):
+    """UNKNOWN PACKAGE MANAGER"""
+    steps = [StepA()]
+
+
+class TestPackages(TestCase):
+    def setUp(self) -> None:
+        print("")
+        FAKE_MANAGER.installed.clear()
+        FAKE_MANAGER.invocations.clear()
+        CONDITION_CALLS.clear()
+
+    def test_install_coalesced(self) -> None:
+        FakePackagesProcess().install()
+        self.assertEqual([("install", ["a", "common", "b", "c"])], FAKE_MANAGER.invocations)
+
+    def test_uninstall_coalesced(self) -> None:
+        FAKE_MANAGER.installed.update(["a", "b", "c", "common"])
+        FakePackagesProcess().uninstall()
+        # packages of StepC are kept, as StepC is not uninstalled
+        self.assertEqual([("uninstall", ["a", "common", "b"])], FAKE_MANAGER.invocations)
+        self.assertEqual({"c"}, FAKE_MANAGER.installed)
+
+    def test_uninstall_specific_step(self) -> None:
+        FakePackagesProcess("StepsAB.StepA").uninstall()
+        # "common" is still required by StepB
+        self.assertEqual([("uninstall", ["a"])], FAKE_MANAGER.invocations)
+
+    def test_failure_attributed_to_step(self) -> None:
+        with self.assertRaises(ValueError) as error:
+            FakeBrokenPackagesProcess().install()
+        self.assertIn("StepBroken", str(error.exception))
+        self.assertEqual([("install", ["a", "common", "broken", "c"]),
+                          ("install", ["a", "common"]),
+                          ("install", ["broken"]),
+                          ("install", ["c"])],
+                         FAKE_MANAGER.invocations)
+
+    def test_skipped_steps_packages_not_installed(self) -> None:
+        FakeSkippedPackagesProcess().install()
+        # steps skipped before the first barrier are withdrawn, conditions being only checked once
+        self.assertEqual([("install", ["a", "common", "c"])], FAKE_MANAGER.invocations)
+        self.assertEqual(["StepSkipped"], CONDITION_CALLS)
+
+    def test_checked_conditions_packages_not_installed(self) -> None:
+        FakeCheckedPackagesProcess().install()
+        self.assertEqual([("install", ["a", "common", "c"])], FAKE_MANAGER.invocations)
+
+    def test_checked_condition_failure(self) -> None:
+        with self.assertRaises(RuntimeError):
+            FakeConditionBrokenProcess().install()
+        self.assertEqual([], FAKE_MANAGER.invocations)
+
+    def test_pipelined_reinstall_coalesced(self) -> None:
+        FAKE_MANAGER.installed.update(["a", "b", "common"])
+        FakeReinstallPackagesProcess().reinstall(pipelined=True)
+        # packages are kept installed by the uninstall half, then installed at once
+        self.assertEqual([("install", ["a", "common", "b"])], FAKE_MANAGER.invocations)
+
+    def test_unknown_package_manager(self) -> None:
+        with self.assertRaises(ValueError):
+            UnknownManagerProcess().install()
+
+    def test_standalone_step(self) -> None:
+        step = StepB()
+        with self.assertRaises(ValueError):
+            # "fake" is not a default package manager
+            step._process_install()
@@ -0,0 +1,76 @@
+import os
+import pathlib
+import shutil
+import tempfile
+import time
+from unittest import TestCase
+
+from install_process import InstallStep, InstallProcess
+from install_process.prefetch import Prefetch, Prefetcher, PrefetchCancelled
+
+
+TMP_DIR = pathlib.Path(tempfile.mkdtemp())
+SOURCE = TMP_DIR / "source.bin"
+SOURCE.write_bytes(os.urandom(3 * 1024 * 1024 + 10))
+RESOURCE = Prefetch(SOURCE, TMP_DIR / "prefetched.bin")
+
+
+def tearDownModule() -> None:
+    shutil.rmtree(TMP_DIR)
+
+
+class SlowStep(InstallStep):
+    def install(self) -> None:
+        """Slow step"""
+        time.sleep(0.5)
+        SlowStep.resource_ready = RESOURCE.destination.exists()
+
+    def uninstall(self) -> None:
+        """Slow step"""
+
+
+class ConsumingStep(InstallStep):
+    prefetch = [RESOURCE]
+
+    def install(self) -> None:
+        """Consuming step"""
+        assert RESOURCE.destination.read_bytes() == SOURCE.read_bytes()
+
+    def uninstall(self) -> None:
+        """Consuming step"""
+
+
+class PrefetchProcess(InstallProcess):
+    """PREFETCH"""
+    steps = [SlowStep(), ConsumingStep()]
+
+
+class TestPrefetch(TestCase):
+    def setUp(self) -> None:
+        print("")
+        RESOURCE.destination.unlink(missing_ok=True)
+
+    def test_prefetch_during_previous_steps(self) -> None:
+        PrefetchProcess().install()
+        self.assertTrue(SlowStep.resource_ready)
+
+    def test_prefetch_standalone_step(self) -> None:
+        ConsumingStep()._process_install()
+        self.assertTrue(RESOURCE.destination.exists())
+
+    def test_bandwidth(self) -> None:
+        prefetcher = Prefetcher(bandwidth=6 * 1024 * 1024)
+        start = time.monotonic()
+        prefetcher.wait(RESOURCE)
+        self.assertGreater(time.monotonic() - start, 0.4)
+        prefetcher.shutdown()
+
+    def test_shutdown(self) -> None:
+        prefetcher = Prefetcher(bandwidth=1024 * 1024)
+        prefetcher.start([RESOURCE])
+        time.sleep(0.1)
+        prefetcher.shutdown()
+        with self.assertRaises(PrefetchCancelled):
+            prefetcher.wait(RESOURCE)
+        self.assertFalse(RESOURCE.destination.exists())
+        self.assertFalse(RESOURCE.destination.with_name("prefetched.bin.part").exists())
@@ -0,0 +1,92 @@
+import io
+import pathlib
+import tempfile
+import threading
+from unittest import TestCase
+
+from install_process import InstallStep, InstallProcess, DisplayStdout
+from install_process.queries import QueryCache
+
+
+COUNTER = pathlib.Path(tempfile.gettempdir()) / "install_process-queries.counter"
+
+
+class StepQuery(InstallStep):
+    def install(self) -> None:
+        """Install query"""
+        self.shell(f"echo run >> {COUNTER}; sleep 0.2; echo 5.15", cache=True)
+
+    def uninstall(self) -> None:
+        """Uninstall query"""
+
+
+class StepInvalidating(InstallStep):
+    def install(self) -> None:
+        """Install invalidating"""
+        self.invalidate_queries(f"echo run >> {COUNTER}; sleep 0.2; echo 5.15")
+
+    def uninstall(self) -> None:
+        """Uninstall invalidating"""
+
+
+class QueryProcess(InstallProcess):
+    """QUERY"""
+    steps = [StepQuery() | StepQuery() | StepQuery(), StepQuery(), StepInvalidating(), StepQuery()]
+
+
+class TestQueries(TestCase):
+    def setUp(self) -> None:
+        COUNTER.write_text("")
+        self.addCleanup(COUNTER.unlink)
+
+    def test_shared_across_steps(self) -> None:
+        process = QueryProcess()
+        process.display = DisplayStdout(io.StringIO())
+        process.install()
+        # concurrent queries collapsed, then cached until invalidated
+        self.assertEqual(2, len(COUNTER.read_text().splitlines()))
+
+        process.install()  # a new run queries again
+        self.assertEqual(4, len(COUNTER.read_text().splitlines()))
+
+    def test_output_and_errors(self) -> None:
+        step = StepQuery()
+        step.display = DisplayStdout(io.StringIO())
+        self.assertEqual("5.15", step.shell("echo 5.15", cache=True))
+        self.assertEqual("", step.shell("exit 2", check_error=False, cache=True))
+        with self.assertRaises(Exception):
+            step.shell("exit 2", cache=True)  # failed return codes are cached, checked by each caller
+
+    def test_failures_not_cached(self) -> None:
+        cache = QueryCache()
+        calls = []
+
+        def failing() -> str:
+            calls.append(1)
+            raise OSError("cannot run")
+
+        for _ in range(2):
+            with self.assertRaises(OSError):
+                cache.run("query", failing)
+        self.assertEqual(2, len(calls))
+        self.assertEqual(0, len(cache))
+
+    def test_concurrent_waiters(self) -> None:
+        cache = QueryCache()
+        started, release = threading.Event(), threading.Event()
+
+        def slow() -> str:
+            started.set()
+            release.wait(5)
+            return "result"
+
+        results = []
+        owner = threading.Thread(target=lambda: results.append(cache.run("query", slow)))
+        owner.start()
+        started.wait(5)
+        waiter = threading.Thread(target=lambda: results.append(cache.run("query", lambda: "other")))
+        waiter.start()
+        release.set()
+        owner.join()
+        waiter.join()
+        self.assertCountEqual([("result", False), ("result", True)], results)
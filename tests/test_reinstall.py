@@ -0,0 +1,210 @@
+import io
+import threading
+import time
+from unittest import TestCase
+
+from install_process import InstallStep, InstallProcess
+
+from tests.helpers import make_process
+
+
+events: list[str] = []
+barrier = threading.Barrier(2, timeout=5)
+
+
+class StepDatabase(InstallStep):
+    def install(self) -> None:
+        """Install database"""
+        events.append("install database")
+
+    def uninstall(self) -> None:
+        """Uninstall database"""
+        events.append("uninstall database")
+
+
+class StepApplication(InstallStep):
+    depends_on = [StepDatabase]
+
+    def install(self) -> None:
+        """Install application"""
+        events.append("install application")
+
+    def uninstall(self) -> None:
+        """Uninstall application"""
+        barrier.wait()  # with the cache uninstall: independent subtrees are reinstalled concurrently
+        events.append("uninstall application")
+
+
+class StepCache(InstallStep):
+    def install(self) -> None:
+        """Install cache"""
+        events.append("install cache")
+
+    def uninstall(self) -> None:
+        """Uninstall cache"""
+        barrier.wait()
+        events.append("uninstall cache")
+
+
+class StepFrontend(InstallStep):
+    def install(self) -> None:
+        """Install frontend"""
+        events.append("install frontend")
+
+    def uninstall(self) -> None:
+        """Uninstall frontend"""
+        events.append("uninstall frontend")
+
+
+class StepIndependent(InstallStep):
+    depends_on = []
+
+    def install(self) -> None:
+        """Install independent"""
+        events.append("install independent")
+
+    def uninstall(self) -> None:
+        """Uninstall independent"""
+        barrier.wait()  # with the database uninstall: declares it depends on no other install step
+        events.append("uninstall independent")
+
+
+class StepDatabaseWaiting(StepDatabase):
+    def uninstall(self) -> None:
+        """Uninstall database"""
+        barrier.wait()
+        super().uninstall()
+
+
+class StepDatabaseSlow(StepDatabaseWaiting):
+    def install(self) -> None:
+        """Install database"""
+        time.sleep(0.2)
+        super().install()
+
+
+class StepFailing(InstallStep):
+    def install(self) -> None:
+        """Install failing"""
+        raise ValueError("failing install")
+
+    def uninstall(self) -> None:
+        """Uninstall failing"""
+        events.append("uninstall failing")
+
+
+class StepDependingOnFailing(InstallStep):
+    depends_on = [StepFailing]
+
+    def install(self) -> None:
+        """Install depending on failing"""
+        events.append("install depending on failing")
+
+    def uninstall(self) -> None:
+        """Uninstall depending on failing"""
+        events.append("uninstall depending on failing")
+
+
+class StepCycleA(InstallStep):
+    def install(self) -> None:
+        """Install cycle A"""
+
+    def uninstall(self) -> None:
+        """Uninstall cycle A"""
+
+
+class StepCycleB(InstallStep):
+    depends_on = [StepCycleA]
+
+    def install(self) -> None:
+        """Install cycle B"""
+
+    def uninstall(self) -> None:
+        """Uninstall cycle B"""
+
+
+StepCycleA.depends_on = [StepCycleB]
+
+
+class ServicesProcess(InstallProcess):
+    """SERVICES"""
+    steps = [StepDatabase(), StepApplication() | StepCache()]
+
+
+class SequentialProcess(InstallProcess):
+    """SEQUENTIAL"""
+    steps = [StepDatabase(), StepFrontend()]
+
+
+class IndependentProcess(InstallProcess):
+    """INDEPENDENT"""
+    steps = [StepDatabaseWaiting(), StepIndependent()]
+
+
+class MixedProcess(InstallProcess):
+    """MIXED"""
+    steps = [StepDatabaseSlow(), StepIndependent(), StepFrontend()]
+
+
+class FailingProcess(InstallProcess):
+    """FAILING"""
+    steps = [StepFailing(), StepDependingOnFailing()]
+
+
+class CycleProcess(InstallProcess):
+    """CYCLE"""
+    steps = [StepCycleA(), StepCycleB()]
+
+
+class TestReinstall(TestCase):
+    def setUp(self) -> None:
+        events.clear()
+        barrier.reset()
+        self.output = io.StringIO()
+
+    def test_pipelined(self) -> None:
+        make_process(ServicesProcess, output=self.output).reinstall(pipelined=True)
+        self.assertCountEqual(["uninstall database", "uninstall application", "uninstall cache",
+                               "install database", "install application", "install cache"], events)
+        # dependents are uninstalled first, and installed last
+        self.assertLess(events.index("uninstall application"), events.index("uninstall database"))
+        self.assertLess(events.index("uninstall database"), events.index("install database"))
+        self.assertLess(events.index("install database"), events.index("install application"))
+        self.assertLess(events.index("uninstall cache"), events.index("install cache"))
+        # uninstalls are counted first, then installs
+        output = self.output.getvalue()
+        self.assertIn("[1/6] Uninstall database", output)
+        self.assertIn("[6/6] Install cache", output)
+
+    def test_pipelined_sequential_order(self) -> None:
+        # install steps declaring no dependencies keep the install process order
+        make_process(SequentialProcess, output=self.output).reinstall(pipelined=True)
+        self.assertEqual(["uninstall frontend", "uninstall database", "install database", "install frontend"], events)
+
+    def test_pipelined_independent(self) -> None:
+        make_process(IndependentProcess, output=self.output).reinstall(pipelined=True)
+        self.assertCountEqual(["uninstall database", "uninstall independent", "install database",
+                               "install independent"], events)
+
+    def test_pipelined_mixed_dependencies(self) -> None:
+        # install steps declaring no dependencies depend on all the install steps before them, including those
+        # declaring their own dependencies
+        make_process(MixedProcess, output=self.output).reinstall(pipelined=True)
+        self.assertLess(events.index("uninstall frontend"), events.index("uninstall database"))
+        self.assertLess(events.index("uninstall frontend"), events.index("uninstall independent"))
+        self.assertLess(events.index("install database"), events.index("install frontend"))
+        self.assertLess(events.index("install independent"), events.index("install frontend"))
+
+    def test_not_pipelined(self) -> None:
+        make_process(ServicesProcess, output=self.output).reinstall()
+        self.assertEqual(["uninstall application", "uninstall cache", "uninstall database"], sorted(events[:3]))
+        self.assertEqual(["install application", "install cache", "install database"], sorted(events[3:]))
+
+    def test_failure_stops_dependents(self) -> None:
+        with self.assertRaisesRegex(ValueError, "failing install"):
+            make_process(FailingProcess, output=self.output).reinstall(pipelined=True)
+        self.assertEqual(["uninstall depending on failing", "uninstall failing"], events)
+
+    def test_dependency_cycle(self) -> None:
+        with self.assertRaisesRegex(ValueError, "depend on each other in a cycle: StepCycleA, StepCycleB"):
+            make_process(CycleProcess, output=self.output).reinstall(pipelined=True)
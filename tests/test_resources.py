@@ -0,0 +1,96 @@
+import io
+import subprocess
+import sys
+import unittest
+from unittest import TestCase, mock
+
+from install_process import InstallStep, InstallProcess, DisplayStdout
+from install_process import resources
+from install_process.install import Config
+from install_process.resources import ResourceUsage
+
+
+BURN_CPU = f"{sys.executable} -c 'sum(range(3_000_000))'"
+ALLOCATE = f"{sys.executable} -c 'data = bytearray(64 * 1024 * 1024)'"
+
+
+class StepCpu(InstallStep):
+    def install(self) -> None:
+        """Install CPU hungry"""
+        self.shell(BURN_CPU)
+        self.shell(BURN_CPU)
+
+    def uninstall(self) -> None:
+        """Uninstall CPU hungry"""
+
+
+class StepMemory(InstallStep):
+    def install(self) -> None:
+        """Install memory hungry"""
+        self.shell(ALLOCATE)
+
+    def uninstall(self) -> None:
+        """Uninstall memory hungry"""
+
+
+class ResourcesProcess(InstallProcess):
+    """RESOURCES"""
+    steps = [StepCpu(), StepMemory()]
+
+
+@unittest.skipUnless(resources.SUPPORTED, "resource usage is not supported on this platform")
+class TestResources(TestCase):
+    def test_run(self) -> None:
+        returncode, output, usage = resources.run(f"echo out; echo err >&2; {ALLOCATE}; exit 4")
+        self.assertEqual((4, "out\nerr\n"), (returncode, output))
+        self.assertEqual(1, usage.commands)
+        self.assertGreater(usage.max_rss, 64 * 1024 * 1024)
+        self.assertGreater(usage.cpu_time, 0)
+
+    def test_run_timeout(self) -> None:
+        with self.assertRaises(subprocess.TimeoutExpired):
+            resources.run("sleep 10", timeout=0.1)
+
+    def test_add(self) -> None:
+        first, second = ResourceUsage(), ResourceUsage()
+        first.commands, first.user_time, first.max_rss = 1, 1.5, 100
+        second.commands, second.user_time, second.max_rss = 2, 0.5, 50
+        first.add(second)
+        self.assertEqual((3, 2.0, 100), (first.commands, first.user_time, first.max_rss))
+
+    def test_install_process(self) -> None:
+        output = io.StringIO()
+        process = ResourcesProcess(config=Config(resource_report=True))
+        process.display = DisplayStdout(output, context=process.context)
+        process.install()
+
+        usages = process.resource_usage()
+        self.assertEqual({"StepCpu", "StepMemory"}, set(usages))
+        self.assertEqual(2, usages["StepCpu"].commands)
+        self.assertGreater(usages["StepMemory"].max_rss, 64 * 1024 * 1024)
+
+        report = output.getvalue().splitlines()
+        header = next(num for num, line in enumerate(report) if "cpu user" in line)
+        self.assertEqual(["StepCpu", "StepMemory", "Total"], [line.split()[0] for line in report[header + 1:]])
+
+    def test_format_report(self) -> None:
+        usage = ResourceUsage()
+        usage.commands, usage.user_time, usage.max_rss, usage.write_bytes = 3, 1.25, 3 * 1024 * 1024, 2048
+        usage.voluntary_switches, usage.involuntary_switches = 10, 2
+        report = resources.format_report([("Step", usage)], total=False)
+        self.assertEqual(["Step", "3", "1.25s", "0.00s", "3.0", "MiB", "0", "B", "2.0", "KiB", "10/2"],
+                         report.splitlines()[1].split())
+        self.assertTrue(report.splitlines()[0].endswith("ctx switches vol/invol"))
+
+
+class TestResourcesFallback(TestCase):
+    def test_run(self) -> None:
+        # without resource usage support, shell commands are still reported once started (for deadlines)
+        started = []
+        with mock.patch.object(resources, "SUPPORTED", False):
+            returncode, output, usage = resources.run("echo out; echo err >&2; exit 4", on_start=started.append)
+            with self.assertRaises(subprocess.TimeoutExpired):
+                resources.run("sleep 10", timeout=0.1)
+        self.assertEqual((4, "out\nerr\n", None), (returncode, output, usage))
+        self.assertEqual(1, len(started))
+        self.assertIsInstance(started[0], subprocess.Popen)
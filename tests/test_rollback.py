@@ -0,0 +1,136 @@
+import io
+import threading
+from unittest import TestCase
+
+from install_process import InstallStep, InstallSteps, InstallProcess, DisplayStdout
+from install_process.install import Config
+
+
+events: list[str] = []
+barrier = threading.Barrier(2, timeout=5)
+
+
+class StepFirst(InstallStep):
+    def install(self) -> None:
+        """Install first"""
+        events.append("install first")
+
+    def uninstall(self) -> None:
+        """Uninstall first"""
+        events.append("uninstall first")
+
+
+class StepSecond(InstallStep):
+    def install(self) -> None:
+        """Install second"""
+        events.append("install second")
+
+    def uninstall(self) -> None:
+        """Uninstall second"""
+        events.append("uninstall second")
+
+
+class StepNotCompleted(InstallStep):
+    def install_condition(self) -> bool:
+        """Never installed"""
+        return False
+
+    def install(self) -> None:
+        """Install not completed"""
+
+    def uninstall(self) -> None:
+        """Uninstall not completed"""
+        events.append("uninstall not completed")
+
+
+class StepParallelLeft(InstallStep):
+    def install(self) -> None:
+        """Install parallel left"""
+
+    def uninstall(self) -> None:
+        """Uninstall parallel left"""
+        barrier.wait()  # only passes if the other parallel install step is uninstalled concurrently
+        events.append("uninstall parallel left")
+
+
+class StepParallelRight(InstallStep):
+    def install(self) -> None:
+        """Install parallel right"""
+
+    def uninstall(self) -> None:
+        """Uninstall parallel right"""
+        barrier.wait()
+        events.append("uninstall parallel right")
+
+
+class StepFailing(InstallStep):
+    def install(self) -> None:
+        """Install failing"""
+        raise ValueError("failing")
+
+    def uninstall(self) -> None:
+        """Uninstall failing"""
+        events.append("uninstall failing")
+
+
+class StepRollbackFailing(InstallStep):
+    def install(self) -> None:
+        """Install rollback failing"""
+
+    def uninstall(self) -> None:
+        """Uninstall rollback failing"""
+        raise ValueError("rollback failing")
+
+
+class StepsFirstSecond(InstallSteps):
+    """First & second"""
+    steps = [StepFirst(), StepNotCompleted(), StepSecond()]
+
+
+class RollbackProcess(InstallProcess):
+    """ROLLBACK"""
+    steps = [StepsFirstSecond(), StepFailing()]
+
+
+class ParallelRollbackProcess(InstallProcess):
+    """PARALLEL ROLLBACK"""
+    steps = [StepFirst(), StepParallelLeft() | StepParallelRight(), StepFailing()]
+
+
+class FailingRollbackProcess(InstallProcess):
+    """FAILING ROLLBACK"""
+    steps = [StepFirst(), StepRollbackFailing(), StepFailing()]
+
+
+class TestRollback(TestCase):
+    def setUp(self) -> None:
+        events.clear()
+        barrier.reset()
+        self.output = io.StringIO()
+
+    def install(self, process_class: type[InstallProcess], rollback: bool = True) -> None:
+        process = process_class(config=Config(rollback=rollback))
+        process.display = DisplayStdout(self.output, context=process.context)
+        with self.assertRaisesRegex(ValueError, "^failing$"):
+            process.install()
+
+    def test_rollback(self) -> None:
+        self.install(RollbackProcess)
+        self.assertEqual(["install first", "install second", "uninstall second", "uninstall first"], events)
+        self.assertIn("Rollback of 2 install step(s)", self.output.getvalue())
+
+    def test_no_rollback(self) -> None:
+        self.install(RollbackProcess, rollback=False)
+        self.assertEqual(["install first", "install second"], events)
+
+    def test_parallel_rollback(self) -> None:
+        self.install(ParallelRollbackProcess)
+        self.assertEqual({"uninstall parallel left", "uninstall parallel right"}, set(events[1:3]))
+        self.assertEqual(["install first", "uninstall first"], [events[0], events[3]])
+        self.assertNotIn("could not be rolled back", self.output.getvalue())
+
+    def test_rollback_failure(self) -> None:
+        self.install(FailingRollbackProcess)
+        self.assertEqual(["install first", "uninstall first"], events)
+        self.assertIn("StepRollbackFailing could not be rolled back: rollback failing", self.output.getvalue())
+        self.assertIn("Rollback incomplete: 1 failure(s)", self.output.getvalue())
@@ -0,0 +1,121 @@
+import io
+import pathlib
+import tempfile
+import threading
+import time
+from unittest import TestCase
+
+from install_process import InstallStep, InstallProcess, DisplayStdout
+from install_process.install import Config
+from install_process.sampler import StackSampler
+
+
+def spin(seconds: float) -> None:
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        pass
+
+
+class StepSpinning(InstallStep):
+    def install(self) -> None:
+        """Install spinning"""
+        spin(0.3)
+
+    def uninstall(self) -> None:
+        """Uninstall spinning"""
+
+
+class StepWaitingShell(InstallStep):
+    def install(self) -> None:
+        """Install waiting on shell"""
+        self.shell("sleep 0.5")
+
+    def uninstall(self) -> None:
+        """Uninstall waiting on shell"""
+
+
+class StepProgressing(InstallStep):
+    def install(self) -> None:
+        """Install progressing"""
+        for done in range(10):
+            time.sleep(0.05)
+            self.progress(done + 1, 10)
+
+    def uninstall(self) -> None:
+        """Uninstall progressing"""
+
+
+class SamplerProcess(InstallProcess):
+    """SAMPLER"""
+    steps = [StepSpinning() | StepWaitingShell(), StepProgressing()]
+
+
+class NamedStep:
+    def name(self) -> str:
+        return "Named"
+
+
+class TestStackSampler(TestCase):
+    def test_sample(self) -> None:
+        sampler = StackSampler()
+        lock = threading.Lock()
+        lock.acquire()
+
+        def blocked() -> None:
+            sampler.step_started(NamedStep())
+            with lock:
+                pass
+            sampler.step_ended()
+
+        thread = threading.Thread(target=blocked)
+        thread.start()
+        time.sleep(0.05)
+        sampler.sample()
+        lock.release()
+        thread.join()
+
+        (stack, count), = sampler.samples.items()
+        self.assertEqual(1, count)
+        self.assertTrue(stack.startswith("Named;"))
+        self.assertTrue(stack.endswith(";blocked (test_sampler.py)"))
+
+    def test_hang(self) -> None:
+        hanging = []
+        sampler = StackSampler(hang_timeout=0.1, on_hang=lambda step, report: hanging.append(report))
+        sampler.step_started(NamedStep(), leaf=False)
+        sampler.step_started(NamedStep())
+        sampler.sample()
+        self.assertEqual([], hanging)
+
+        time.sleep(0.1)
+        sampler.sample()
+        sampler.sample()  # reported once
+        self.assertEqual(1, len(hanging))
+        self.assertTrue(hanging[0].startswith("Named made no progress for 0s\nat "))
+
+        # groups of install steps only wait for their install steps
+        sampler.step_ended()
+        time.sleep(0.1)
+        sampler.sample()
+        self.assertEqual(1, len(hanging))
+
+    def test_install_process(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            profile = pathlib.Path(tmp) / "install.folded"
+            output = io.StringIO()
+            process = SamplerProcess(config=Config(profile=profile, hang_timeout=0.2))
+            process.display = DisplayStdout(output, context=process.context)
+            process.install()
+            self.assertIsNone(process.context.sampler)
+
+            stacks = {line.rsplit(" ", 1)[0] for line in profile.read_text().splitlines()}
+            self.assertTrue(any(stack.startswith("StepSpinning;") and stack.endswith(";spin (test_sampler.py)")
+                                for stack in stacks))
+            self.assertTrue(any(stack.startswith("StepWaitingShell;") and stack.endswith(";$ sleep 0.5")
+                                for stack in stacks))
+
+            # the spinning step, and the step waiting on its shell command, are hanging: not the progressing one
+            self.assertIn("StepSpinning made no progress", output.getvalue())
+            self.assertIn("StepWaitingShell made no progress", output.getvalue())
+            self.assertIn("waiting on shell command (pid ", output.getvalue())
+            self.assertNotIn("StepProgressing made no progress", output.getvalue())
@@ -0,0 +1,74 @@
+import io
+import os
+import shutil
+import sys
+import unittest
+from unittest import TestCase, mock
+
+from install_process import InstallStep, DisplayStdout
+from install_process.install import Config
+from install_process import scheduling
+from install_process.scheduling import BACKGROUND, Scheduling
+
+
+PROBE = (f"{sys.executable} -c 'import os, resource; "
+         f"print(os.nice(0), sorted(os.sched_getaffinity(0)), resource.getrlimit(resource.RLIMIT_NOFILE))'")
+
+
+class StepBackground(InstallStep):
+    scheduling = Scheduling(nice=5, io_class="idle", cpus=[0], rlimits={"nofile": 256})
+
+    def install(self) -> None:
+        """Install background"""
+
+    def uninstall(self) -> None:
+        """Uninstall background"""
+
+
+def _installed(*commands: str) -> bool:
+    return all(shutil.which(command) is not None for command in commands)
+
+
+class TestScheduling(TestCase):
+    @unittest.skipUnless(hasattr(os, "sched_getaffinity"), "CPU affinity is not supported on this platform")
+    @unittest.skipUnless(_installed("nice", "ionice", "taskset", "prlimit"), "scheduling commands are not installed")
+    def test_shell(self) -> None:
+        step = StepBackground()
+        step.config = Config(verbose=True)
+        output = io.StringIO()
+        step.display = DisplayStdout(output)
+
+        self.assertEqual(f"{os.nice(0) + 5} [0] (256, 256)", step.shell(PROBE))
+        self.assertIn("(nice 5, io idle, cpus 0,", output.getvalue())  # wrapped to the terminal width
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "applied on Linux only")
+    @unittest.skipUnless(_installed("nice", "ionice", "prlimit"), "scheduling commands are not installed")
+    def test_wrap(self) -> None:
+        self.assertEqual("nice -n 19 ionice -c 3 /bin/sh -c 'make -j'", BACKGROUND.wrap("make -j"))
+        self.assertEqual("ionice -c 2 -n 4 prlimit --nofile=256:256 -- /bin/sh -c 'ulimit -n'",
+                         Scheduling(io_class="best-effort", rlimits={"nofile": 256}).wrap("ulimit -n"))
+        self.assertEqual("echo default", Scheduling().wrap("echo default"))
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "applied on Linux only")
+    def test_missing_command(self) -> None:
+        # scheduling parts whose command is not installed are not applied, and a warning is displayed
+        with mock.patch.object(scheduling, "_installed", lambda command: command != "ionice"):
+            self.assertEqual(["ionice"], BACKGROUND.missing())
+            self.assertEqual("nice -n 19 /bin/sh -c 'make -j'", BACKGROUND.wrap("make -j"))
+
+            step = StepBackground()
+            step.config = Config()
+            output = io.StringIO()
+            step.display = DisplayStdout(output)
+            step.shell("true")
+        self.assertIn("ionice command is not installed", output.getvalue())
+
+    def test_invalid(self) -> None:
+        with self.assertRaisesRegex(ValueError, "Unknown I/O scheduling class 'low'"):
+            Scheduling(io_class="low")
+        with self.assertRaisesRegex(ValueError, "I/O priority must be from 0 to 7, not 8"):
+            Scheduling(io_level=8)
+
+    def test_str(self) -> None:
+        self.assertEqual("io best-effort 7, as 1024/2048", str(Scheduling(io_level=7, rlimits={"as": (1024, 2048)})))
+        self.assertEqual("default", str(Scheduling()))
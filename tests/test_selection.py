@@ -0,0 +1,128 @@
+import io
+from unittest import TestCase
+
+from install_process import InstallStep, InstallSteps, InstallProcess, DisplayStdout
+
+
+events: list[str] = []
+
+
+class RecordedStep(InstallStep):
+    def install(self) -> None:
+        """Install recorded"""
+        events.append(self.__class__.__qualname__)
+
+    def uninstall(self) -> None:
+        """Uninstall recorded"""
+        events.append(f"un{self.__class__.__qualname__}")
+
+
+class StepA1(RecordedStep):
+    pass
+
+
+class StepA2(RecordedStep):
+    pass
+
+
+class StepB(RecordedStep):
+    pass
+
+
+class StepC(RecordedStep):
+    pass
+
+
+class StepD1(RecordedStep):
+    pass
+
+
+class StepD2(RecordedStep):
+    pass
+
+
+class StepE(RecordedStep):
+    pass
+
+
+class GroupA(InstallSteps):
+    """Group A"""
+    steps = [StepA1(), StepA2()]
+
+    def install_condition(self) -> bool:
+        """Never installed as a whole"""
+        return False
+
+
+class GroupD(InstallSteps):
+    """Group D"""
+    steps = [StepD1(), StepD2()]
+
+
+class SelectionProcess(InstallProcess):
+    """SELECTION"""
+    steps = [GroupA(), StepB() | StepC(), GroupD(), StepE()]
+
+
+class TestSelection(TestCase):
+    def setUp(self) -> None:
+        events.clear()
+        self.output = io.StringIO()
+
+    def install(self, *targets: str, from_step: str = "", until_step: str = "") -> InstallProcess:
+        process = SelectionProcess(list(targets), from_step=from_step, until_step=until_step)
+        process.display = DisplayStdout(self.output, context=process.context)
+        process.install()
+        return process
+
+    def test_all(self) -> None:
+        process = self.install()
+        self.assertIsNone(process.context.selection)
+        self.assertEqual(["StepB", "StepC", "StepD1", "StepD2", "StepE"], sorted(events))
+
+    def test_multiple_targets(self) -> None:
+        process = self.install("GroupA.StepA2", "StepE")
+        # the condition of a partially selected group of install steps is not checked
+        self.assertEqual(["StepA2", "StepE"], events)
+        self.assertEqual(3, process.context.step_count)
+        self.assertNotIn("Never installed as a whole", self.output.getvalue())
+
+    def test_glob(self) -> None:
+        self.install("GroupD.*")
+        self.assertEqual(["StepD1", "StepD2"], events)
+
+    def test_regex(self) -> None:
+        self.install(r"re:.*\.StepA1|Step[BE]")
+        self.assertEqual(["StepA1", "StepB", "StepE"], events)
+
+    def test_parallel_grouping(self) -> None:
+        self.install("StepE", "StepC", "StepB")
+        self.assertEqual({"StepB", "StepC"}, set(events[:2]))
+        self.assertEqual("StepE", events[2])
+        self.assertIn("StepB | StepC", self.output.getvalue())
+
+    def test_range(self) -> None:
+        self.install(from_step="StepC", until_step="GroupD")
+        self.assertEqual(["StepC", "StepD1", "StepD2"], events)
+
+        events.clear()
+        self.install(from_step="GroupD.StepD2")
+        self.assertEqual(["StepD2", "StepE"], events)
+
+    def test_range_and_targets(self) -> None:
+        self.install("re:Step.*", until_step="StepC")
+        self.assertEqual({"StepB", "StepC"}, set(events))
+
+    def test_uninstall(self) -> None:
+        process = SelectionProcess(["GroupD.StepD1", "StepE"])
+        process.display = DisplayStdout(self.output, context=process.context)
+        process.uninstall()
+        self.assertEqual(["unStepE", "unStepD1"], events)
+
+    def test_invalid(self) -> None:
+        with self.assertRaisesRegex(ValueError, "Test step Missing.* does not exist"):
+            SelectionProcess(["StepE", "Missing.*"])
+        with self.assertRaisesRegex(ValueError, "Test step Missing does not exist"):
+            SelectionProcess(from_step="Missing")
+        with self.assertRaisesRegex(ValueError, "Test step StepB is before StepE"):
+            SelectionProcess(from_step="StepE", until_step="StepB")
@@ -0,0 +1,86 @@
+import io
+import pathlib
+import subprocess
+import tempfile
+import time
+from unittest import TestCase
+
+from install_process import InstallStep, DisplayStdout
+from install_process.install import Config
+from install_process.shells import RecordingShell, ReplayShell
+
+
+class StepCounting(InstallStep):
+    def install(self) -> None:
+        """Install counting"""
+        self.shell("echo $((1 + 1))")
+        self.shell("sleep 0.2; echo slept")
+        self.shell("exit 3", check_error=False)
+
+    def uninstall(self) -> None:
+        """Uninstall counting"""
+
+
+class StepCountingLogged(StepCounting):
+    log_shell = True
+
+
+class TestShells(TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = pathlib.Path(self._tmp.name)
+        self.addCleanup(self._tmp.cleanup)
+
+    def _step(self, config: Config, step_class: type[StepCounting] = StepCounting) -> StepCounting:
+        step = step_class()
+        step.config = config
+        step.display = DisplayStdout(io.StringIO())
+        return step
+
+    def test_record_replay(self) -> None:
+        recording = self.tmp / "recording.jsonl"
+        self._step(Config(shell_backend=RecordingShell(recording))).install()
+        self.assertEqual(3, len(recording.read_text().splitlines()))
+
+        replay = ReplayShell(recording)
+        step = self._step(Config(shell_backend=replay))
+        start = time.perf_counter()
+        step.install()
+        self.assertLess(time.perf_counter() - start, 0.1)
+        self.assertEqual("2", step.shell("echo $((1 + 1))"))  # last recording replayed again
+        with self.assertRaises(subprocess.CalledProcessError):
+            step.shell("exit 3")
+
+    def test_replay_time_scale(self) -> None:
+        recording = self.tmp / "recording.jsonl"
+        self._step(Config(shell_backend=RecordingShell(recording))).install()
+
+        step = self._step(Config(shell_backend=ReplayShell(recording, time_scale=0.5)))
+        start = time.perf_counter()
+        self.assertEqual("slept", step.shell("sleep 0.2; echo slept"))
+        self.assertGreaterEqual(time.perf_counter() - start, 0.1)
+
+    def test_replay_unrecorded(self) -> None:
+        recording = self.tmp / "recording.jsonl"
+        recording.write_text("")
+        step = self._step(Config(shell_backend=ReplayShell(recording)))
+        with self.assertRaisesRegex(ValueError, "Shell command was not recorded in .*: rm -rf build"):
+            step.shell("rm -rf build")
+
+    def test_replay_timeout(self) -> None:
+        recording = self.tmp / "recording.jsonl"
+        self._step(Config(shell_backend=RecordingShell(recording))).install()
+
+        step = self._step(Config(shell_backend=ReplayShell(recording)))
+        with self.assertRaises(subprocess.TimeoutExpired):
+            step.shell("sleep 0.2; echo slept", timeout=0.05)  # timeouts are checked against recorded durations
+
+    def test_record_replay_logged(self) -> None:
+        recording = self.tmp / "recording.jsonl"
+        config = Config(shell_backend=RecordingShell(recording), log_dir=self.tmp / "record")
+        self._step(config, StepCountingLogged).install()
+
+        config = Config(shell_backend=ReplayShell(recording), log_dir=self.tmp / "replay")
+        self._step(config, StepCountingLogged).install()
+        self.assertEqual((self.tmp / "record" / "StepCountingLogged.log").read_text(),
+                         (self.tmp / "replay" / "StepCountingLogged.log").read_text())
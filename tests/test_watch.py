@@ -0,0 +1,119 @@
+import io
+import pathlib
+import tempfile
+import threading
+import time
+from unittest import TestCase, mock
+
+from install_process import InstallStep, InstallProcess, DisplayStdout
+from install_process.outputs import Output
+from install_process.watch import InstallWatcher, PathWatcher, _Inotify
+
+
+CONFIG_VERSION = Output("config_version", str)
+events: list[str] = []
+
+
+class StepConfig(InstallStep):
+    outputs = [CONFIG_VERSION]
+
+    def install(self) -> None:
+        """Install config"""
+        events.append("StepConfig")
+        self.publish(CONFIG_VERSION, "1")
+
+    def uninstall(self) -> None:
+        """Uninstall config"""
+
+
+class StepService(InstallStep):
+    def install(self) -> None:
+        """Install service"""
+        events.append(f"StepService {self.output(CONFIG_VERSION)}")
+
+    def uninstall(self) -> None:
+        """Uninstall service"""
+
+
+class StepOther(InstallStep):
+    def install(self) -> None:
+        """Install other"""
+        events.append("StepOther")
+
+    def uninstall(self) -> None:
+        """Uninstall other"""
+
+
+class WatchProcess(InstallProcess):
+    """WATCH"""
+    steps = [StepConfig(), StepOther(), StepService()]
+
+
+def write_later(path: pathlib.Path, delay: float = 0.05) -> threading.Thread:
+    thread = threading.Thread(target=lambda: (time.sleep(delay), path.write_text("changed")))
+    thread.start()
+    return thread
+
+
+class TestPathWatcher(TestCase):
+    def setUp(self) -> None:
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp = pathlib.Path(self._tmp_dir.name)
+        (self.tmp / "config").mkdir()
+        (self.tmp / "watched.conf").write_text("initial")
+
+    def tearDown(self) -> None:
+        self._tmp_dir.cleanup()
+
+    def check_watcher(self) -> None:
+        watcher = PathWatcher([self.tmp / "watched.conf", self.tmp / "config"], poll_interval=0.01)
+        try:
+            write_later(self.tmp / "watched.conf").join()
+            self.assertEqual({self.tmp / "watched.conf"}, watcher.wait(debounce=0.1, timeout=2))
+
+            # other files of the directory of a watched file are not watched
+            write_later(self.tmp / "other.conf").join()
+            self.assertEqual(set(), watcher.wait(debounce=0.1, timeout=0.2))
+
+            (self.tmp / "config" / "sub").mkdir()
+            watcher.wait(debounce=0.1, timeout=0.2)
+            write_later(self.tmp / "config" / "sub" / "nested.conf").join()
+            self.assertIn(self.tmp / "config" / "sub" / "nested.conf", watcher.wait(debounce=0.1, timeout=2))
+        finally:
+            watcher.close()
+
+    def test_watcher(self) -> None:
+        self.check_watcher()
+
+    def test_watcher_polling(self) -> None:
+        with mock.patch.object(_Inotify, "supported", return_value=False):
+            self.check_watcher()
+
+
+class TestInstallWatcher(TestCase):
+    def setUp(self) -> None:
+        events.clear()
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.config_path = pathlib.Path(self._tmp_dir.name) / "app.conf"
+        patcher = mock.patch.object(StepConfig, "watch_paths", [self.config_path])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self) -> None:
+        self._tmp_dir.cleanup()
+
+    def test_affected(self) -> None:
+        watcher = InstallWatcher(WatchProcess)
+        watcher.display = DisplayStdout(io.StringIO())
+        with mock.patch("sys.stdout", io.StringIO()):
+            watcher.run()
+        self.assertEqual(["StepConfig", "StepOther", "StepService 1"], events)
+
+        # install steps reading outputs of the affected install step are affected too
+        self.assertEqual(["StepConfig", "StepService"], watcher.affected({self.config_path}))
+        self.assertEqual([], watcher.affected({self.config_path.with_name("other.conf")}))
+
+        events.clear()
+        with mock.patch("sys.stdout", io.StringIO()):
+            watcher.run(watcher.affected({self.config_path}))
+        self.assertEqual(["StepConfig", "StepService 1"], events)